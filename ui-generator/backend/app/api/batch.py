@@ -0,0 +1,73 @@
+"""API endpoints for batch UI generation."""
+from typing import AsyncIterator
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.models.schemas import BatchGenerateRequest, BatchItemResult, BatchJobStatus
+from app.services.batch import get_batch_manager
+
+router = APIRouter()
+
+
+@router.post("/generate/batch", response_model=BatchJobStatus, status_code=202)
+async def submit_batch(request: BatchGenerateRequest):
+    """Submit a batch of generation requests as a background job.
+
+    Args:
+        request: List of generation requests
+
+    Returns:
+        Initial job status, including the job id
+
+    Raises:
+        HTTPException: If the batch is too large or contains an empty prompt
+    """
+    if len(request.requests) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds the maximum of {settings.batch_max_items} requests"
+        )
+    if any(not item.prompt.strip() for item in request.requests):
+        raise HTTPException(status_code=400, detail="Prompt cannot be empty")
+
+    batch_manager = get_batch_manager()
+    job_id = await batch_manager.submit([item.model_dump() for item in request.requests])
+    return BatchJobStatus(**await batch_manager.get_job(job_id))
+
+
+@router.get("/generate/batch/{job_id}", response_model=BatchJobStatus)
+async def get_batch(job_id: str):
+    """Get the status of a batch job.
+
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    job = await get_batch_manager().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return BatchJobStatus(**job)
+
+
+@router.get("/generate/batch/{job_id}/results")
+async def stream_batch_results(job_id: str):
+    """Stream item results as newline-delimited JSON until the job finishes.
+
+    Items already completed are sent immediately; the rest are sent as they
+    complete, in completion order. Each line is a BatchItemResult.
+
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    batch_manager = get_batch_manager()
+    if await batch_manager.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+
+    async def result_lines() -> AsyncIterator[str]:
+        async for item in batch_manager.stream_results(job_id, settings.batch_results_poll_interval):
+            yield BatchItemResult(**item).model_dump_json() + "\n"
+
+    return StreamingResponse(
+        result_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,338 @@
+"""API endpoint for UI generation."""
+import asyncio
+import hashlib
+import math
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Dict, Set, Type
+import orjson
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from app.config import settings
+from app.services import lifecycle, metrics
+from app.services.admission import QueueFullError, coalesce_key, get_admission_controller
+from app.services.claude_client import get_claude_client
+from app.services.history_store import load_generation
+from app.models.schemas import GenerateRequest, GenerateResponse, RefineRequest, RefineResponse, ResponseOptions
+
+router = APIRouter()
+
+
+async def _cancel_on_disconnect(http_request: Request, awaitable: Awaitable[Any]) -> Any:
+    """Await a coroutine, cancelling it if the HTTP client goes away.
+
+    Args:
+        http_request: Incoming request used to poll for disconnects
+        awaitable: Work to run on behalf of the request
+
+    Returns:
+        Result of the awaitable
+
+    Raises:
+        HTTPException: 499 if the client disconnected before completion
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=settings.disconnect_poll_interval)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _raise_for_failure(result: Dict) -> None:
+    """Turn a failed generation result into an HTTP error.
+
+    Raises:
+        HTTPException: 503 with Retry-After if upstream was unavailable, else 500
+    """
+    if result["success"]:
+        return
+    error_msg = result.get("error", "Unknown error occurred")
+    if "retry_after" in result:
+        # Upstream is overloaded or down: tell the client when to come back
+        retry_after = math.ceil(result["retry_after"] or settings.retry_max_delay)
+        raise HTTPException(
+            status_code=503,
+            detail=error_msg,
+            headers={"Retry-After": str(retry_after)}
+        )
+    raise HTTPException(status_code=500, detail=error_msg)
+
+
+def _lean_file(file: Dict, known: Set[str]) -> Dict:
+    """Add a file's content hash, dropping its content if the hash is in ``known``."""
+    digest = hashlib.sha256(file["content"].encode("utf-8")).hexdigest()
+    content = None if digest in known else file["content"]
+    return {"path": file["path"], "content": content, "hash": digest}
+
+
+def _lean_result(result: Dict, options: ResponseOptions) -> Dict:
+    """Apply a request's response options to a result.
+
+    Every file gets its content hash; files whose hash the client sent in
+    ``known_hashes`` lose their content. The preview is dropped or replaced
+    by the URL of the generation's preview as requested.
+
+    Args:
+        result: Successful result from the Claude client
+        options: Preview mode and known hashes from the request
+
+    Returns:
+        Result dictionary ready for the response model
+    """
+    known = set(options.known_hashes)
+    lean = {**result, "files": [_lean_file(file, known) for file in result["files"]]}
+    if options.preview != "inline":
+        lean["preview_html"] = None
+    if options.preview == "lazy" and result.get("generation_id"):
+        lean["preview_url"] = f"/api/history/{result['generation_id']}/preview"
+    return lean
+
+
+def _json_body(model: Type[BaseModel], result: Dict) -> bytes:
+    """Validate a result against a response model and serialize it with orjson.
+
+    Dumping the validated model to a dict and encoding with orjson is several
+    times faster than pydantic's own JSON encoder for large file lists.
+    """
+    return orjson.dumps(model(**result).model_dump())
+
+
+def _client_id(http_request: Request) -> str:
+    """Identify the client a request is queued under: its client id header, else its address."""
+    client = http_request.headers.get(settings.admission_client_header, "").strip()
+    if client:
+        return client
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def _queue_full_response(error: QueueFullError) -> JSONResponse:
+    """Build the 429 returned when a generation cannot be queued."""
+    eta = math.ceil(error.eta)
+    return JSONResponse(
+        status_code=429,
+        content={
+            "detail": f"Too many queued generations; retry in about {eta} seconds",
+            "queue_position": error.position,
+            "eta_seconds": eta,
+        },
+        headers={"Retry-After": str(eta)}
+    )
+
+
+@router.post("/generate", response_model=GenerateResponse)
+async def generate_ui(request: GenerateRequest, http_request: Request):
+    """Generate React UI code from natural language prompt.
+
+    Requests pass through the admission controller: an identical request
+    already in flight is joined rather than repeated, and the rest wait in
+    a per-client queue served round-robin. When the queue is full the
+    request is rejected at once.
+
+    Args:
+        request: Generation request with prompt and optional page type
+        http_request: Raw HTTP request, used to detect client disconnects
+            and identify the client
+
+    Returns:
+        Generated files, preview HTML and token usage, or a 429 with the
+        queue position and estimated wait if the queue is full
+
+    Raises:
+        HTTPException: If prompt is empty or generation fails
+    """
+    if not request.prompt or not request.prompt.strip():
+        raise HTTPException(status_code=400, detail="Prompt cannot be empty")
+
+    try:
+        claude_client = get_claude_client()
+
+        def generate() -> Awaitable[Dict]:
+            return claude_client.generate_code(user_prompt=request.prompt, page_type=request.page_type)
+
+        admission = get_admission_controller()
+        if admission is None:
+            result = await _cancel_on_disconnect(http_request, generate())
+        else:
+            client = _client_id(http_request)
+            key = coalesce_key(client, request.prompt, request.page_type)
+            result, coalesced = await _cancel_on_disconnect(
+                http_request,
+                admission.run(client, key, generate, request.page_type)
+            )
+            if coalesced:
+                # Served from another request's generation, as with the response cache
+                result = {**result, "cached": True}
+
+        _raise_for_failure(result)
+
+        with metrics.stage_timer("serialize", request.page_type, result.get("model") or settings.claude_model):
+            body = _json_body(GenerateResponse, _lean_result(result, request))
+        return Response(content=body, media_type="application/json")
+
+    except QueueFullError as e:
+        return _queue_full_response(e)
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except Exception as e:
+        # Handle unexpected errors
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate UI: {str(e)}"
+        )
+
+
+@router.post("/refine", response_model=RefineResponse)
+async def refine_ui(request: RefineRequest, http_request: Request):
+    """Apply a change to an existing generation without regenerating it.
+
+    The model returns only the files that change, as search/replace edits
+    or whole files, and they are merged into the current set. The response
+    carries the full merged set and a new generation id, so refinements
+    can be chained.
+
+    Args:
+        request: Instruction plus a generation id or the current files
+        http_request: Raw HTTP request, used to detect client disconnects
+
+    Returns:
+        Merged files, preview HTML, token usage and the changed paths
+
+    Raises:
+        HTTPException: If the instruction is empty, the generation id is
+            unknown or the refinement fails
+    """
+    if not request.instruction.strip():
+        raise HTTPException(status_code=400, detail="Instruction cannot be empty")
+
+    page_type = request.page_type
+    if request.generation_id is not None:
+        stored = await load_generation(request.generation_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Generation not found or expired")
+        files = stored["files"]
+        page_type = page_type or stored["page_type"]
+    else:
+        files = [file.model_dump() for file in request.files]
+
+    try:
+        claude_client = get_claude_client()
+        result = await _cancel_on_disconnect(
+            http_request,
+            claude_client.refine_code(
+                files, request.instruction, page_type, parent_id=request.generation_id
+            )
+        )
+        _raise_for_failure(result)
+
+        with metrics.stage_timer("serialize", page_type, settings.claude_model):
+            body = _json_body(RefineResponse, _lean_result(result, request))
+        return Response(content=body, media_type="application/json")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to refine UI: {str(e)}"
+        )
+
+
+@router.post("/generate/stream")
+async def generate_ui_stream(request: GenerateRequest, http_request: Request):
+    """Stream UI generation as newline-delimited JSON events.
+
+    Each line is one event: ``delta`` (raw text), ``file`` (a parsed file,
+    emitted as soon as its closing fence arrives) and a final ``done`` event
+    carrying the preview HTML and token usage. File events carry the
+    file's hash, and no content if the hash is in the request's
+    ``known_hashes``; the ``preview`` option applies to the ``done`` event.
+
+    Streams pass through the admission controller like /generate. A
+    request identical to a stream already in flight joins it and is sent
+    every event from the first. A full queue is reported as a 429 before
+    streaming starts. The upstream call is cancelled once every client
+    following it has disconnected.
+
+    Args:
+        request: Generation request with prompt and optional page type
+        http_request: Raw HTTP request, used to identify the client
+
+    Returns:
+        Streaming NDJSON response, or a 429 with the queue position and
+        estimated wait if the queue is full
+
+    Raises:
+        HTTPException: If prompt is empty
+    """
+    if not request.prompt or not request.prompt.strip():
+        raise HTTPException(status_code=400, detail="Prompt cannot be empty")
+
+    claude_client = get_claude_client()
+
+    def produce() -> AsyncGenerator[Dict, None]:
+        return claude_client.stream_code(user_prompt=request.prompt, page_type=request.page_type)
+
+    admission = get_admission_controller()
+    coalesced = False
+    if admission is None:
+        events = produce()
+    else:
+        client = _client_id(http_request)
+        key = coalesce_key(client, request.prompt, request.page_type, stream=True)
+        try:
+            events, coalesced = admission.stream(client, key, produce, request.page_type)
+        except QueueFullError as e:
+            return _queue_full_response(e)
+
+    known = set(request.known_hashes)
+
+    async def event_lines() -> AsyncIterator[bytes]:
+        async for event in events:
+            if event["type"] == "file":
+                event = {**event, "file": _lean_file(event["file"], known)}
+            elif event["type"] == "done":
+                if coalesced:
+                    # Served from another request's generation, as with the response cache
+                    event = {**event, "cached": True}
+                if request.preview != "inline":
+                    event = {**event, "preview_html": None}
+                    if request.preview == "lazy" and event.get("generation_id"):
+                        event["preview_url"] = f"/api/history/{event['generation_id']}/preview"
+            yield orjson.dumps(event) + b"\n"
+
+    return StreamingResponse(
+        event_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also runs if the client left before the first event was read
+        background=BackgroundTask(events.aclose)
+    )
+
+
+@router.get("/health")
+async def health_check():
+    """Health check endpoint."""
+    return {"status": "healthy", "service": "ui-generator"}
+
+
+@router.get("/ready")
+async def readiness_check():
+    """Readiness endpoint for load balancers.
+
+    Unlike /health, which only reports that the process is alive, this
+    returns 503 until the worker has warmed up and again once it starts
+    draining for shutdown.
+    """
+    state = lifecycle.get_state()
+    return JSONResponse(
+        status_code=200 if state == lifecycle.READY else 503,
+        content={"status": state, "service": "ui-generator"}
+    )
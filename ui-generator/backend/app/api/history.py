@@ -0,0 +1,85 @@
+"""API endpoints for browsing and downloading past generations."""
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import HTMLResponse, StreamingResponse
+from app.config import settings
+from app.models.schemas import HistoryEntry, HistoryPage
+from app.services import metrics
+from app.services.history_store import get_history_store
+from app.services.preview import get_preview_renderer
+
+router = APIRouter()
+
+
+@router.get("/history", response_model=HistoryPage)
+async def list_history(
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[int] = Query(None, description="Cursor from the previous page")
+):
+    """List stored generations, newest first.
+
+    Args:
+        limit: Page size
+        before: next_cursor of the previous page, or omitted for the first page
+
+    Returns:
+        Generation summaries and the cursor for the next page
+    """
+    items, next_cursor = await asyncio.to_thread(get_history_store().list_generations, limit, before)
+    return HistoryPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/history/{generation_id}", response_model=HistoryEntry)
+async def get_history_entry(generation_id: str):
+    """Get a stored generation with its files.
+
+    Raises:
+        HTTPException: If the generation does not exist
+    """
+    entry = await asyncio.to_thread(get_history_store().get_generation, generation_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Generation not found")
+    return HistoryEntry(**entry)
+
+
+@router.get("/history/{generation_id}/download")
+async def download_history_entry(generation_id: str):
+    """Download a stored generation's files as a zip archive.
+
+    The archive is built from the stored blobs while it is sent, so it is
+    never held in memory as a whole.
+
+    Raises:
+        HTTPException: If the generation does not exist
+    """
+    store = get_history_store()
+    if await asyncio.to_thread(store.get_summary, generation_id) is None:
+        raise HTTPException(status_code=404, detail="Generation not found")
+
+    # A sync iterator: Starlette reads it from a worker thread, off the event loop
+    return StreamingResponse(
+        store.iter_zip(generation_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="generated-ui-{generation_id[:8]}.zip"'}
+    )
+
+
+@router.get("/history/{generation_id}/preview", response_class=HTMLResponse)
+async def preview_history_entry(generation_id: str):
+    """Render the preview of a stored generation.
+
+    This is the ``preview_url`` of responses requested with ``preview: lazy``.
+    Transpiled modules are cached by content, so rendering files that were
+    just generated is cheap. The document is served sandboxed, as in the
+    frontend's preview iframe, so its scripts never run with the API's origin.
+
+    Raises:
+        HTTPException: If the generation does not exist
+    """
+    entry = await asyncio.to_thread(get_history_store().get_generation, generation_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Generation not found")
+    with metrics.stage_timer("preview", entry["page_type"], entry["model"] or settings.claude_model):
+        html = await asyncio.to_thread(get_preview_renderer().render, entry["files"])
+    return HTMLResponse(html, headers={"Content-Security-Policy": "sandbox allow-scripts"})
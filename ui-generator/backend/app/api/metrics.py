@@ -0,0 +1,12 @@
+"""Prometheus scrape endpoint."""
+from fastapi import APIRouter, Response
+from app.services.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Return pipeline and HTTP metrics in Prometheus text format."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,22 @@
+"""API endpoints for inspecting and reloading skill data."""
+from fastapi import APIRouter
+from app.services.skill_loader import SKILL_FILES, get_skill_loader
+
+router = APIRouter()
+
+
+@router.get("/skills")
+async def get_skills():
+    """Return the content hash and file list of the active skill set."""
+    skill_loader = get_skill_loader()
+    return {
+        "content_hash": skill_loader.content_hash,
+        "files": [filename for filename, _ in SKILL_FILES]
+    }
+
+
+@router.post("/skills/reload")
+async def reload_skills():
+    """Re-read skill files and drop cached system prompts."""
+    skill_loader = get_skill_loader()
+    return {"content_hash": skill_loader.reload()}
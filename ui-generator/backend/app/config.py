@@ -9,6 +9,7 @@ class Settings(BaseSettings):
 
     # API Configuration
     anthropic_api_key: str = os.getenv("ANTHROPIC_API_KEY", "")
+    anthropic_base_url: str = ""  # Override, e.g. to point at a local fake server
 
     # CORS Configuration
     cors_origins: str = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000")
@@ -16,16 +17,104 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = os.getenv("LOG_LEVEL", "info")
 
+    # Server (python -m app.server)
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1  # 0 starts one worker per available CPU
+    shutdown_drain_delay: float = 0.0  # Seconds readiness reports draining before the listener closes
+    graceful_shutdown_timeout: float = 130.0  # Wait for in-flight requests before cancelling them
+
     # Claude API Settings
     claude_model: str = "claude-sonnet-4-5-20250929"
     max_tokens: int = 8000
     temperature: float = 0.0
+    prompt_caching: bool = True
+
+    # Model Routing (simple pages go to a fast model; bad output escalates to claude_model)
+    routing_fast_model: str = "claude-haiku-4-5-20251001"  # Empty sends everything to claude_model
+    routing_fast_max_tokens: int = 4000
+    routing_fast_page_types: str = "form,detail"
+    routing_max_prompt_chars: int = 400  # Longer prompts go to claude_model
+    routing_complex_keywords: str = "chart,graph,wizard,multi-step,drag,kanban,calendar,map,editor,realtime"
+    routing_escalate_on_violations: bool = True  # Escalate fast-model output with unfixed design errors
+
+    # Design-System Validation (rules compiled from the skill files)
+    validation_enabled: bool = True
+    validation_autofix: bool = False  # Rewrite violations that have an exact design-token equivalent
+
+    # Upstream Concurrency & Timeouts
+    max_concurrent_generations: int = 32
+    request_timeout: float = 120.0
+    connect_timeout: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    disconnect_poll_interval: float = 1.0
+    event_loop_lag_interval: float = 0.25  # Seconds between event loop lag samples; 0 disables
+
+    # Admission Control for /api/generate (per worker)
+    admission_enabled: bool = True
+    admission_max_active: int = 0  # 0 uses max_concurrent_generations
+    admission_max_queue: int = 256
+    admission_max_queue_per_client: int = 8
+    admission_client_header: str = "X-Client-Id"  # Falls back to the client address
+
+    # Response Compression (gzip, and brotli if installed)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024  # Smaller bodies are sent uncompressed
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # Upstream Resilience
+    retry_max_attempts: int = 4
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 20.0
+    circuit_failure_threshold: int = 5  # 0 disables the circuit breaker
+    circuit_reset_timeout: float = 30.0
+    hedge_enabled: bool = False
+    hedge_quantile: float = 0.95  # Hedge when time to first token exceeds this quantile
+    hedge_min_delay: float = 2.0
+    upstream_tokens_per_minute: int = 0  # Per worker; 0 disables the token bucket
+
+    # Response Cache (only used when temperature is 0)
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 512
+    response_cache_ttl: float = 86400.0
+    response_cache_path: str = ""
+
+    # Generation History (also resolves generation ids for refinement)
+    history_db_path: str = "data/history.db"
+    history_blob_dir: str = "data/blobs"  # Content-addressed file contents, shared across generations
+
+    # Preview Rendering
+    preview_dir: str = "preview"  # runtime.js and the assets built into preview/dist
+    preview_esbuild_path: str = ""  # Defaults to preview/dist/esbuild, then esbuild on PATH
+    preview_cache_max_entries: int = 1024
+    preview_cache_dir: str = ""  # Empty keeps transpiled modules in memory only
+    preview_transpile_timeout: float = 10.0
+
+    # Batch Generation
+    batch_provider: str = "local"  # "local" worker pool or "anthropic" Message Batches
+    batch_concurrency: int = 8
+    batch_max_items: int = 1000
+    batch_db_path: str = "data/batches.db"
+    batch_poll_interval: float = 30.0
+    batch_results_poll_interval: float = 1.0
 
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins into a list."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def routing_fast_page_types_list(self) -> List[str]:
+        """Parse page types eligible for the fast model into a list."""
+        return [page_type.strip() for page_type in self.routing_fast_page_types.split(",") if page_type.strip()]
+
+    @property
+    def routing_complex_keywords_list(self) -> List[str]:
+        """Parse keywords that route a prompt to the main model into a list."""
+        return [keyword.strip() for keyword in self.routing_complex_keywords.split(",") if keyword.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,28 @@
+"""Logging setup for the application's own loggers."""
+import logging
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_handler: Optional[logging.Handler] = None
+
+
+def configure_logging(level: str) -> None:
+    """Send records from the ``app.*`` loggers to stderr at ``level``.
+
+    uvicorn configures only its own loggers, so without this the INFO
+    records of the application (request timings, routing decisions, prompt
+    token savings) are dropped. Third-party loggers keep their defaults, so
+    per-request INFO lines from httpx do not flood the output. Calling it
+    again only changes the level.
+
+    Args:
+        level: Level name, e.g. "info" or "debug"
+    """
+    global _handler
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(level.upper())
+    if _handler is None:
+        _handler = logging.StreamHandler()
+        _handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        app_logger.addHandler(_handler)
@@ -1,14 +1,35 @@
 """FastAPI application entry point."""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
+from app.logging_config import configure_logging
+from app.api.batch import router as batch_router
 from app.api.generate import router as generate_router
+from app.api.history import router as history_router
+from app.api.metrics import router as metrics_router
+from app.api.skills import router as skills_router
+from app.services import lifecycle
+from app.services.compression import CompressionMiddleware
+from app.services.metrics import MetricsMiddleware
+
+configure_logging(settings.log_level)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the worker before it takes traffic, and release resources on exit."""
+    await lifecycle.startup()
+    yield
+    await lifecycle.shutdown()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="UI Generator API",
     description="Generate React UI code from natural language prompts using Claude API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -18,10 +39,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Compress complete response bodies (inside the metrics middleware, so latency includes it)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+# Record request latency and per-stage timings
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(generate_router, prefix="/api", tags=["generation"])
+app.include_router(batch_router, prefix="/api", tags=["batch"])
+app.include_router(history_router, prefix="/api", tags=["history"])
+app.include_router(skills_router, prefix="/api", tags=["skills"])
+app.include_router(metrics_router, tags=["metrics"])
 
 
 @app.get("/")
@@ -35,5 +73,5 @@ async def root():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from app.server import main
+    main()
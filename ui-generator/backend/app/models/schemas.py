@@ -1,9 +1,22 @@
 """Pydantic models for request/response schemas."""
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
-class GenerateRequest(BaseModel):
+class ResponseOptions(BaseModel):
+    """Options controlling how much a generation response carries."""
+    preview: Literal["inline", "omit", "lazy"] = Field(
+        "inline",
+        description="inline: include preview_html; omit: leave it out; lazy: return preview_url to fetch it later"
+    )
+    known_hashes: List[str] = Field(
+        default_factory=list,
+        max_length=1000,
+        description="SHA-256 digests of file contents the client already has; those files are returned without content"
+    )
+
+
+class GenerateRequest(ResponseOptions):
     """Request model for UI generation."""
     prompt: str = Field(..., min_length=1, description="Natural language description of the UI to generate")
     page_type: Optional[Literal["form", "list", "detail", "dashboard"]] = Field(
@@ -18,16 +31,113 @@ class GeneratedFile(BaseModel):
     content: str = Field(..., description="File content (TSX/TypeScript code)")
 
 
+class ResponseFile(BaseModel):
+    """A generated file in a response, with its content hash."""
+    path: str = Field(..., description="File path relative to src/")
+    content: Optional[str] = Field(None, description="File content, omitted if its hash was in known_hashes")
+    hash: str = Field(..., description="SHA-256 hex digest of the UTF-8 content")
+
+
 class TokenUsage(BaseModel):
     """API token usage information."""
     input: int = Field(..., description="Input tokens consumed")
     output: int = Field(..., description="Output tokens generated")
+    cache_read: int = Field(0, description="Input tokens served from the prompt cache")
+    cache_write: int = Field(0, description="Input tokens written to the prompt cache")
+
+
+class Violation(BaseModel):
+    """A design-system rule broken by a generated file."""
+    path: str = Field(..., description="File containing the violation")
+    line: int = Field(..., description="1-based line number")
+    rule: str = Field(..., description="Rule id, e.g. spacing-scale or palette-color")
+    severity: Literal["error", "warning"] = Field(..., description="Violation severity")
+    message: str = Field(..., description="What is wrong and what to use instead")
+    fixed: bool = Field(False, description="Whether the violation was rewritten in the returned files")
 
 
 class GenerateResponse(BaseModel):
     """Response model for UI generation."""
     success: bool = Field(..., description="Whether generation was successful")
+    files: List[ResponseFile] = Field(..., description="Generated code files")
+    preview_html: Optional[str] = Field(None, description="HTML preview of generated UI, unless omitted or lazy")
+    preview_url: Optional[str] = Field(None, description="Where to fetch the preview when it was requested lazily")
+    token_usage: TokenUsage = Field(..., description="API token usage")
+    cached: bool = Field(False, description="Whether the result was served from the response cache")
+    model: Optional[str] = Field(None, description="Model that produced the files")
+    violations: List[Violation] = Field(default_factory=list, description="Design-system violations found")
+    generation_id: Optional[str] = Field(None, description="Id of the generated files, for /api/refine")
+    error: Optional[str] = Field(None, description="Error message if generation failed")
+
+
+class RefineRequest(ResponseOptions):
+    """Request model for refining an existing generation."""
+    instruction: str = Field(..., min_length=1, description="Change to apply, in natural language")
+    generation_id: Optional[str] = Field(None, description="Id returned by a previous generation or refinement")
+    files: Optional[List[GeneratedFile]] = Field(None, description="Current files, if no generation id is given")
+    page_type: Optional[Literal["form", "list", "detail", "dashboard"]] = Field(
+        None,
+        description="Optional page type hint; defaults to that of the stored generation"
+    )
+
+    @model_validator(mode="after")
+    def check_source(self) -> "RefineRequest":
+        if (self.generation_id is None) == (not self.files):
+            raise ValueError("Provide exactly one of generation_id or files")
+        return self
+
+
+class RefineResponse(GenerateResponse):
+    """Response model for a refinement."""
+    changed_files: List[str] = Field(default_factory=list, description="Paths added or modified")
+    deleted_files: List[str] = Field(default_factory=list, description="Paths removed")
+
+
+class HistorySummary(BaseModel):
+    """A stored generation, without file contents."""
+    generation_id: str = Field(..., description="Content id of the generated files")
+    prompt: Optional[str] = Field(None, description="Prompt or refinement instruction")
+    page_type: Optional[str] = Field(None, description="Page type hint used")
+    model: Optional[str] = Field(None, description="Model that generated the files")
+    parent_id: Optional[str] = Field(None, description="Generation this one was refined from")
+    file_count: int = Field(..., description="Number of files")
+    total_bytes: int = Field(..., description="Total size of the file contents in bytes")
+    created_at: float = Field(..., description="Unix time the generation was first stored")
+
+
+class HistoryEntry(HistorySummary):
+    """A stored generation with its files."""
+    files: List[GeneratedFile] = Field(..., description="Generated code files")
+
+
+class HistoryPage(BaseModel):
+    """One page of the generation history, newest first."""
+    items: List[HistorySummary] = Field(..., description="Generations on this page")
+    next_cursor: Optional[int] = Field(None, description="Value for 'before' to fetch the next page")
+
+
+class BatchGenerateRequest(BaseModel):
+    """Request model for batch UI generation."""
+    requests: List[GenerateRequest] = Field(..., min_length=1, description="Generation requests to run as one job")
+
+
+class BatchJobStatus(BaseModel):
+    """Status summary of a batch generation job."""
+    job_id: str = Field(..., description="Batch job id")
+    status: Literal["pending", "running", "completed", "failed"] = Field(..., description="Job status")
+    provider: str = Field(..., description="Provider running the job (local or anthropic)")
+    total: int = Field(..., description="Number of items in the job")
+    succeeded: int = Field(0, description="Items that produced files")
+    failed: int = Field(0, description="Items that failed")
+    pending: int = Field(0, description="Items without a result yet")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+
+
+class BatchItemResult(BaseModel):
+    """Result of one item in a batch generation job."""
+    index: int = Field(..., description="Position of the item in the submitted requests")
+    success: bool = Field(..., description="Whether generation was successful")
     files: List[GeneratedFile] = Field(..., description="Generated code files")
-    preview_html: str = Field(..., description="HTML preview of generated UI")
     token_usage: TokenUsage = Field(..., description="API token usage")
+    violations: List[Violation] = Field(default_factory=list, description="Design-system violations found")
     error: Optional[str] = Field(None, description="Error message if generation failed")
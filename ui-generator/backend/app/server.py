@@ -0,0 +1,103 @@
+"""Production server: uvicorn worker processes with graceful draining.
+
+Run with ``python -m app.server``. Every worker imports ``app.main``, warms
+up in the lifespan startup hook and then reports ready on ``/api/ready``.
+
+On SIGTERM (or SIGINT) a worker reports draining on ``/api/ready``, keeps
+serving for ``shutdown_drain_delay`` seconds so load balancers can stop
+routing to it, then closes its listener and waits up to
+``graceful_shutdown_timeout`` seconds for in-flight generations to finish
+before running the lifespan shutdown hook.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from types import FrameType
+from typing import Optional
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+from app.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that flips readiness to draining before shutting down."""
+
+    def __init__(self, config: uvicorn.Config):
+        super().__init__(config)
+        self._drain_started = False
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        # Imported here: the worker has loaded the app by the time signals arrive
+        from app.services import lifecycle
+
+        lifecycle.mark_draining()
+        if self._drain_started or settings.shutdown_drain_delay <= 0:
+            super().handle_exit(sig, frame)
+            return
+
+        self._drain_started = True
+        logger.info("Closing listener in %.1fs", settings.shutdown_drain_delay)
+        asyncio.get_event_loop().call_later(
+            settings.shutdown_drain_delay, super().handle_exit, sig, frame
+        )
+
+
+class DrainingMultiprocess(Multiprocess):
+    """Worker supervisor that signals every worker before waiting for any.
+
+    The stock supervisor terminates and joins workers one at a time, so a
+    slow drain on one worker would delay the signal to the next.
+    """
+
+    def shutdown(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        logger.info("Stopping parent process [%d]", self.pid)
+
+
+def _worker_count() -> int:
+    if settings.workers > 0:
+        return settings.workers
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def main() -> None:
+    """Start the API with the configured number of worker processes."""
+    workers = _worker_count()
+
+    # Workers must share a metrics directory, set before they import prometheus_client
+    metrics_dir = None
+    if workers > 1 and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        metrics_dir = tempfile.mkdtemp(prefix="uigen-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    config = uvicorn.Config(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        log_level=settings.log_level,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+    )
+    server = DrainingServer(config)
+    try:
+        if workers > 1:
+            sock = config.bind_socket()
+            DrainingMultiprocess(config, target=server.run, sockets=[sock]).run()
+        else:
+            server.run()
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""Admission control for generation requests: coalescing and per-client fair queueing."""
+import asyncio
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import aclosing
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services import metrics
+from app.services.resilience import LatencyTracker
+
+# Assumed generation time for queue ETAs until real durations have been observed
+DEFAULT_SERVICE_SECONDS = 20.0
+
+
+class QueueFullError(Exception):
+    """Raised when a request cannot be queued because its client's queue or the whole queue is full."""
+
+    def __init__(self, position: int, eta: float):
+        super().__init__(f"Generation queue is full (position {position}, ETA {eta:.0f}s)")
+        self.position = position
+        self.eta = eta
+
+
+def coalesce_key(client: str, prompt: str, page_type: Optional[str], stream: bool = False) -> str:
+    """Build the key under which identical in-flight requests are merged.
+
+    Whitespace in the prompt is collapsed, as for the response cache. With
+    a temperature of 0 every client would get the same result, so requests
+    are merged across clients; otherwise only a client's own repeats are.
+
+    Args:
+        client: Client identifier
+        prompt: User prompt
+        page_type: Optional page type hint
+        stream: Whether the request is streamed; streamed and plain requests
+            are never merged with each other
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    scope = "" if settings.temperature == 0 else client
+    payload = json.dumps(
+        [scope, " ".join(prompt.split()), page_type, stream],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Job:
+    """One admitted or queued generation and the requests waiting on its result.
+
+    Streamed jobs also keep every event produced so far, so a request that
+    joins late is sent the events it missed.
+    """
+
+    def __init__(self, key: str, client: str, slot: "asyncio.Future[None]"):
+        self.key = key
+        self.client = client
+        self.slot = slot
+        self.task: Optional["asyncio.Task[Dict]"] = None
+        self.waiters = 0
+        self.events: List[Dict] = []
+        self.updated = asyncio.Event()
+
+
+class _Follower:
+    """A streamed request's view of a job's events.
+
+    Holds one of the job's waiter places from creation until the events run
+    out, fail, or the follower is closed, whichever comes first; closing a
+    follower that was never iterated also gives its place back.
+    """
+
+    def __init__(self, job: _Job, events: AsyncGenerator[Dict, None]):
+        self._job = job
+        self._events = events
+        self._waiting = True
+        job.waiters += 1
+
+    def __aiter__(self) -> "_Follower":
+        return self
+
+    async def __anext__(self) -> Dict:
+        try:
+            return await self._events.__anext__()
+        except BaseException:
+            self._release()
+            raise
+
+    async def aclose(self) -> None:
+        """Stop following the job, cancelling it if nobody else is waiting."""
+        try:
+            await self._events.aclose()
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        if self._waiting:
+            self._waiting = False
+            AdmissionController._leave(self._job)
+
+
+class AdmissionController:
+    """Runs at most ``max_active`` generations, queueing the rest fairly per client.
+
+    Each client has its own FIFO queue and freed slots go to clients in
+    round-robin order, so a client submitting a burst waits behind its own
+    requests rather than in front of everyone else's. Queues are bounded
+    per client and in total; a request that does not fit is rejected at
+    once with the position it would have had and an estimated wait.
+
+    A request identical to one already queued or running joins it instead
+    of taking another place; the shared work is cancelled only once every
+    request waiting on it has gone away.
+    """
+
+    def __init__(self, max_active: int, max_queue: int, max_queue_per_client: int):
+        """Initialize the controller.
+
+        Args:
+            max_active: Generations allowed to run at once
+            max_queue: Most requests waiting across all clients
+            max_queue_per_client: Most requests waiting for one client
+        """
+        self.max_active = max(1, max_active)
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self._active = 0
+        self._queued = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future[None]]]" = OrderedDict()
+        self._jobs: Dict[str, _Job] = {}
+        self._durations = LatencyTracker()
+
+    async def run(
+        self,
+        client: str,
+        key: str,
+        compute: Callable[[], Awaitable[Dict]],
+        page_type: Optional[str] = None
+    ) -> Tuple[Dict, bool]:
+        """Run ``compute`` once a slot is free, or join an identical request.
+
+        Args:
+            client: Client identifier the request is queued under
+            key: Coalescing key from coalesce_key
+            compute: Coroutine factory producing a result dictionary
+            page_type: Page type, used as a metrics label
+
+        Returns:
+            Tuple of (result, coalesced), where coalesced is True if the
+            request joined another request's generation
+
+        Raises:
+            QueueFullError: If the request has to wait and there is no room
+        """
+        job = self._jobs.get(key)
+        coalesced = job is not None
+        if job is None:
+            job = _Job(key, client, self._claim_slot(client))
+            self._jobs[key] = job
+            job.task = asyncio.ensure_future(self._run_job(job, compute, page_type))
+            job.task.add_done_callback(lambda _: self._finish(job))
+        else:
+            metrics.record_admission("coalesced")
+
+        job.waiters += 1
+        try:
+            result = await asyncio.shield(job.task)
+        finally:
+            self._leave(job)
+        return result, coalesced
+
+    def stream(
+        self,
+        client: str,
+        key: str,
+        produce: Callable[[], AsyncGenerator[Dict, None]],
+        page_type: Optional[str] = None
+    ) -> Tuple[AsyncIterator[Dict], bool]:
+        """Start a streamed generation once a slot is free, or join an identical one.
+
+        The slot or queue place is claimed before returning, so a full
+        queue is reported before any of the response has been sent.
+
+        Args:
+            client: Client identifier the request is queued under
+            key: Coalescing key from coalesce_key with ``stream=True``
+            produce: Async generator factory yielding event dictionaries
+            page_type: Page type, used as a metrics label
+
+        Returns:
+            Tuple of (events, coalesced), where events yields every event of
+            the shared generation from the first one on; it must be
+            exhausted or closed with ``aclose()``, even if never iterated
+
+        Raises:
+            QueueFullError: If the request has to wait and there is no room
+        """
+        job = self._jobs.get(key)
+        coalesced = job is not None
+        if job is None:
+            job = _Job(key, client, self._claim_slot(client))
+            self._jobs[key] = job
+            job.task = asyncio.ensure_future(self._run_stream_job(job, produce, page_type))
+            job.task.add_done_callback(lambda _: self._finish(job))
+        else:
+            metrics.record_admission("coalesced")
+
+        return _Follower(job, self._follow(job)), coalesced
+
+    def eta(self, position: int) -> float:
+        """Estimate the seconds until the request at ``position`` in the queue starts."""
+        service = self._durations.quantile(0.5) or DEFAULT_SERVICE_SECONDS
+        return math.ceil(position / self.max_active) * service
+
+    def _claim_slot(self, client: str) -> "asyncio.Future[None]":
+        """Take a free slot, or a place in the client's queue.
+
+        Returns:
+            Future resolved when the request holds a slot
+
+        Raises:
+            QueueFullError: If the client's queue or the whole queue is full
+        """
+        slot = asyncio.get_running_loop().create_future()
+        if self._active < self.max_active and not self._queued:
+            self._active += 1
+            slot.set_result(None)
+            metrics.record_admission("admitted")
+            return slot
+
+        queue = self._queues.get(client)
+        ahead = len(queue) if queue else 0
+        if ahead >= self.max_queue_per_client or self._queued >= self.max_queue:
+            position = self._position(client, ahead)
+            metrics.record_admission("rejected")
+            raise QueueFullError(position, self.eta(position))
+
+        if queue is None:
+            queue = self._queues[client] = deque()
+        queue.append(slot)
+        self._queued += 1
+        metrics.record_admission("queued")
+        metrics.ADMISSION_QUEUED.inc()
+        return slot
+
+    def _position(self, client: str, ahead: int) -> int:
+        """Return the queue position of a new request from ``client`` under round-robin.
+
+        Every other client is served at most ``ahead + 1`` times before it.
+        """
+        others = sum(min(len(queue), ahead + 1) for name, queue in self._queues.items() if name != client)
+        return ahead + 1 + others
+
+    async def _wait_for_slot(self, job: _Job, page_type: Optional[str]) -> float:
+        """Wait until the job holds a slot and return when it started."""
+        queued_at = time.perf_counter()
+        await job.slot
+        started = time.perf_counter()
+        metrics.record_stage("queue_wait", started - queued_at, page_type, settings.claude_model)
+        return started
+
+    async def _run_job(
+        self,
+        job: _Job,
+        compute: Callable[[], Awaitable[Dict]],
+        page_type: Optional[str]
+    ) -> Dict:
+        started = await self._wait_for_slot(job, page_type)
+        result = await compute()
+        self._durations.record(time.perf_counter() - started)
+        return result
+
+    async def _run_stream_job(
+        self,
+        job: _Job,
+        produce: Callable[[], AsyncGenerator[Dict, None]],
+        page_type: Optional[str]
+    ) -> None:
+        try:
+            started = await self._wait_for_slot(job, page_type)
+            async with aclosing(produce()) as events:
+                async for event in events:
+                    job.events.append(event)
+                    # Wakes every follower; later waits block until the next event
+                    job.updated.set()
+                    job.updated.clear()
+            self._durations.record(time.perf_counter() - started)
+        finally:
+            job.updated.set()
+
+    async def _follow(self, job: _Job) -> AsyncIterator[Dict]:
+        """Yield a streamed job's events, then re-raise its error if it failed."""
+        sent = 0
+        while True:
+            while sent < len(job.events):
+                yield job.events[sent]
+                sent += 1
+            if job.task.done():
+                break
+            await job.updated.wait()
+        if not job.task.cancelled() and job.task.exception() is not None:
+            raise job.task.exception()
+
+    @staticmethod
+    def _leave(job: _Job) -> None:
+        """Drop a waiter, cancelling the job once nobody is waiting on it."""
+        job.waiters -= 1
+        if job.waiters == 0 and not job.task.done():
+            job.task.cancel()
+
+    def _finish(self, job: _Job) -> None:
+        """Release the job's slot or queue place, whichever it holds."""
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+        if job.slot.done() and not job.slot.cancelled():
+            self._release()
+            return
+        self._dequeue(job.client, job.slot)
+        job.slot.cancel()
+
+    def _dequeue(self, client: str, slot: "asyncio.Future[None]") -> None:
+        queue = self._queues.get(client)
+        if queue is None or slot not in queue:
+            return
+        queue.remove(slot)
+        self._queued -= 1
+        metrics.ADMISSION_QUEUED.dec()
+        if not queue:
+            del self._queues[client]
+
+    def _release(self) -> None:
+        """Hand a freed slot to the next client in round-robin order, or free it."""
+        while self._queues:
+            client, queue = self._queues.popitem(last=False)
+            slot = queue.popleft()
+            self._queued -= 1
+            metrics.ADMISSION_QUEUED.dec()
+            if queue:
+                # Back of the line: every other waiting client goes first
+                self._queues[client] = queue
+            if not slot.done():
+                slot.set_result(None)
+                return
+        self._active -= 1
+
+
+# Singleton instance
+_admission_controller = None
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Get or create the admission controller singleton, or None if disabled."""
+    global _admission_controller
+    if not settings.admission_enabled:
+        return None
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            max_active=settings.admission_max_active or settings.max_concurrent_generations,
+            max_queue=settings.admission_max_queue,
+            max_queue_per_client=settings.admission_max_queue_per_client
+        )
+    return _admission_controller
@@ -0,0 +1,298 @@
+"""Batch generation: provider interface, provider implementations and job runner."""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from anthropic.types import Message
+from app.config import settings
+from app.services.batch_store import (
+    BatchJobStore,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_RUNNING,
+)
+from app.services.claude_client import ClaudeClient, get_claude_client
+
+logger = logging.getLogger(__name__)
+
+# Result fields persisted per batch item (preview HTML is built on demand)
+RESULT_FIELDS = ("success", "files", "token_usage", "violations", "error")
+
+
+class BatchProvider(ABC):
+    """Runs the items of a batch job and reports results as they complete."""
+
+    name: str = ""
+
+    @abstractmethod
+    def run(self, job_id: str, items: List[Dict]) -> AsyncIterator[Tuple[int, Dict]]:
+        """Generate every item of a job.
+
+        Args:
+            job_id: Job id, for providers that keep their own state per job
+            items: Pending items, each with 'index', 'prompt' and 'page_type'
+
+        Yields:
+            (index, result) pairs in completion order, where result has the
+            same shape as ClaudeClient.generate_code
+        """
+
+
+class LocalBatchProvider(BatchProvider):
+    """Runs items through a bounded pool of concurrent generate calls."""
+
+    name = "local"
+
+    def __init__(
+        self,
+        generate: Callable[[str, Optional[str]], Awaitable[Dict]],
+        concurrency: int
+    ):
+        """Initialize provider.
+
+        Args:
+            generate: Coroutine function taking (prompt, page_type)
+            concurrency: Maximum number of items generated at once
+        """
+        self.generate = generate
+        self.concurrency = concurrency
+
+    async def run(self, job_id: str, items: List[Dict]) -> AsyncIterator[Tuple[int, Dict]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_item(item: Dict) -> Tuple[int, Dict]:
+            async with semaphore:
+                return item["index"], await self.generate(item["prompt"], item.get("page_type"))
+
+        tasks = [asyncio.ensure_future(run_item(item)) for item in items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class AnthropicBatchProvider(BatchProvider):
+    """Submits items as one Message Batch and collects its results.
+
+    The provider batch id is stored on the job, so a job interrupted by a
+    restart resumes polling the existing batch instead of resubmitting it;
+    results of items stored before the restart are skipped. Generated files
+    are validated against the design rules, as for the local provider.
+    """
+
+    name = "anthropic"
+
+    def __init__(self, claude_client: ClaudeClient, store: BatchJobStore, poll_interval: float):
+        """Initialize provider.
+
+        Args:
+            claude_client: Client used for request params, HTTP and parsing
+            store: Job store for recording the provider batch id
+            poll_interval: Seconds between batch status checks
+        """
+        self.claude_client = claude_client
+        self.store = store
+        self.poll_interval = poll_interval
+
+    async def run(self, job_id: str, items: List[Dict]) -> AsyncIterator[Tuple[int, Dict]]:
+        pending = {item["index"]: item for item in items}
+        job = await asyncio.to_thread(self.store.get_job, job_id)
+        batch_id = job["provider_ref"] if job else None
+
+        if not batch_id:
+            requests = []
+            for item in items:
+                params = self.claude_client.build_message_params(item["prompt"], item.get("page_type"))
+                params.pop("timeout", None)
+                requests.append({"custom_id": f"item-{item['index']}", "params": params})
+            batch = await self._request("POST", "/v1/messages/batches", {"requests": requests})
+            batch_id = batch["id"]
+            await asyncio.to_thread(self.store.set_provider_ref, job_id, batch_id)
+
+        while True:
+            batch = await self._request("GET", f"/v1/messages/batches/{batch_id}")
+            if batch["processing_status"] == "ended":
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        async with self.claude_client.http_client.stream(
+            "GET", batch["results_url"], headers=self._headers()
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                index = int(entry["custom_id"].rsplit("-", 1)[1])
+                item = pending.get(index)
+                if item is None:
+                    # Stored before a restart
+                    continue
+                yield index, await self._parse_entry(entry["result"], item.get("page_type"))
+
+    async def _parse_entry(self, result: Dict, page_type: Optional[str]) -> Dict:
+        """Convert one batch result entry into a validated generation result."""
+        if result["type"] == "succeeded":
+            message = Message.model_validate(result["message"])
+            parsed = self.claude_client.build_result(message, page_type)
+            if parsed["success"] and settings.validation_enabled:
+                report = await self.claude_client.validate(parsed["files"], page_type, message.model)
+                parsed.update(files=report.files, violations=report.violations)
+            return parsed
+
+        error = result.get("error", {}).get("message") or f"Batch request {result['type']}"
+        return {
+            "success": False,
+            "files": [],
+            "token_usage": {"input": 0, "output": 0, "cache_read": 0, "cache_write": 0},
+            "error": error
+        }
+
+    def _headers(self) -> Dict[str, str]:
+        return {**self.claude_client.client.default_headers, "content-type": "application/json"}
+
+    async def _request(self, method: str, path: str, body: Optional[Dict] = None) -> Dict:
+        response = await self.claude_client.http_client.request(
+            method,
+            f"{str(self.claude_client.client.base_url).rstrip('/')}{path}",
+            headers=self._headers(),
+            json=body
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class BatchManager:
+    """Starts batch jobs in the background and streams their results."""
+
+    def __init__(self, store: BatchJobStore, provider: BatchProvider):
+        """Initialize manager.
+
+        Args:
+            store: Persistent job store
+            provider: Provider that runs job items
+        """
+        self.store = store
+        self.provider = provider
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+
+    async def submit(self, requests: List[Dict]) -> str:
+        """Create a job for the given requests and start running it.
+
+        Args:
+            requests: Generation requests as dicts with 'prompt' and 'page_type'
+
+        Returns:
+            New job id
+        """
+        job_id = await asyncio.to_thread(self.store.create_job, self.provider.name, requests)
+        self._start(job_id)
+        return job_id
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        """Return a job summary, or None if the job does not exist."""
+        return await asyncio.to_thread(self.store.get_job, job_id)
+
+    async def resume(self) -> None:
+        """Restart jobs left unfinished by a previous process.
+
+        With several workers sharing one job store, only the worker that
+        claims the store's resume lock restarts jobs.
+        """
+        if not await asyncio.to_thread(self.store.claim_resume):
+            return
+        for job_id in await asyncio.to_thread(self.store.list_unfinished_jobs):
+            logger.info("Resuming batch job %s", job_id)
+            self._start(job_id)
+
+    async def stream_results(self, job_id: str, poll_interval: float) -> AsyncIterator[Dict]:
+        """Yield item results as they complete until the job finishes.
+
+        Results already completed are yielded first. The store is polled, so
+        this also follows jobs running in other worker processes.
+
+        Args:
+            job_id: Job id
+            poll_interval: Seconds to wait between checks for new results
+
+        Yields:
+            Item result dicts with 'index', 'success', 'files', 'token_usage' and 'error'
+        """
+        after_seq = 0
+        while True:
+            # Read status first: results saved before a terminal status are then included below
+            job = await self.get_job(job_id)
+            items = await asyncio.to_thread(self.store.completed_items, job_id, after_seq)
+            for item in items:
+                after_seq = item.pop("seq")
+                yield item
+
+            if job is None or job["status"] in (JOB_COMPLETED, JOB_FAILED):
+                return
+            if not items:
+                await asyncio.sleep(poll_interval)
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs; they stay unfinished and resume on next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self, job_id: str) -> None:
+        if job_id in self._tasks:
+            return
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: str) -> None:
+        try:
+            await asyncio.to_thread(self.store.set_job_status, job_id, JOB_RUNNING)
+            items = await asyncio.to_thread(self.store.pending_items, job_id)
+
+            async for index, result in self.provider.run(job_id, items):
+                stored = {field: result[field] for field in RESULT_FIELDS if field in result}
+                await asyncio.to_thread(self.store.save_result, job_id, index, stored)
+
+            await asyncio.to_thread(self.store.set_job_status, job_id, JOB_COMPLETED)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Batch job %s failed: %s", job_id, e)
+            await asyncio.to_thread(self.store.set_job_status, job_id, JOB_FAILED, str(e))
+
+
+# Singleton instance
+_batch_manager = None
+
+
+def get_batch_manager() -> BatchManager:
+    """Get or create batch manager singleton."""
+    global _batch_manager
+    if _batch_manager is None:
+        store = BatchJobStore(settings.batch_db_path)
+        claude_client = get_claude_client()
+        if settings.batch_provider == "anthropic":
+            provider: BatchProvider = AnthropicBatchProvider(
+                claude_client, store, settings.batch_poll_interval
+            )
+        else:
+            provider = LocalBatchProvider(
+                lambda prompt, page_type: claude_client.generate_code(prompt, page_type),
+                settings.batch_concurrency
+            )
+        _batch_manager = BatchManager(store, provider)
+    return _batch_manager
+
+
+async def close_batch_manager() -> None:
+    """Stop the batch manager singleton if it was created."""
+    global _batch_manager
+    if _batch_manager is not None:
+        await _batch_manager.shutdown()
+        _batch_manager.store.close()
+        _batch_manager = None
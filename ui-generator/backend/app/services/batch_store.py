@@ -0,0 +1,233 @@
+"""SQLite persistence for batch generation jobs and their per-item results."""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-worker only
+    fcntl = None
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+ITEM_PENDING = "pending"
+ITEM_SUCCEEDED = "succeeded"
+ITEM_FAILED = "failed"
+
+
+class BatchJobStore:
+    """Stores batch jobs, their requests and results in a local SQLite file.
+
+    All methods are synchronous and thread-safe; async callers run them via
+    ``asyncio.to_thread``. Because state lives on disk, any worker process can
+    report status or stream results for a job started by another.
+    """
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the job database.
+
+        Args:
+            path: SQLite database file path
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._resume_lock_file = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS batch_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                provider_ref TEXT,
+                total INTEGER NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS batch_items (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                request TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                seq INTEGER,
+                completed_at REAL,
+                PRIMARY KEY (job_id, idx)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def create_job(self, provider: str, requests: List[Dict]) -> str:
+        """Create a job with one pending item per request.
+
+        Args:
+            provider: Name of the provider that will run the job
+            requests: Generation requests as dicts with 'prompt' and 'page_type'
+
+        Returns:
+            New job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO batch_jobs (id, status, provider, total, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_PENDING, provider, len(requests), now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO batch_items (job_id, idx, request, status) VALUES (?, ?, ?, ?)",
+                [
+                    (job_id, idx, json.dumps(request, ensure_ascii=False), ITEM_PENDING)
+                    for idx, request in enumerate(requests)
+                ]
+            )
+            self._conn.commit()
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Return a job summary with per-status item counts, or None."""
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT * FROM batch_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM batch_items WHERE job_id = ? GROUP BY status",
+                (job_id,)
+            ).fetchall())
+
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "provider": job["provider"],
+            "provider_ref": job["provider_ref"],
+            "total": job["total"],
+            "succeeded": counts.get(ITEM_SUCCEEDED, 0),
+            "failed": counts.get(ITEM_FAILED, 0),
+            "pending": counts.get(ITEM_PENDING, 0),
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+        }
+
+    def list_unfinished_jobs(self) -> List[str]:
+        """Return ids of jobs that were pending or running, e.g. before a restart."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM batch_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_PENDING, JOB_RUNNING)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def pending_items(self, job_id: str) -> List[Dict]:
+        """Return the requests of items that have no result yet."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, request FROM batch_items WHERE job_id = ? AND status = ? ORDER BY idx",
+                (job_id, ITEM_PENDING)
+            ).fetchall()
+        return [{"index": row["idx"], **json.loads(row["request"])} for row in rows]
+
+    def completed_items(self, job_id: str, after_seq: int = 0) -> List[Dict]:
+        """Return finished item results, in completion order.
+
+        Args:
+            job_id: Job id
+            after_seq: Only return items whose completion sequence is greater
+
+        Returns:
+            List of result dicts, each with 'index' and 'seq'
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, result, seq FROM batch_items "
+                "WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after_seq)
+            ).fetchall()
+        return [
+            {"index": row["idx"], "seq": row["seq"], **json.loads(row["result"])}
+            for row in rows
+        ]
+
+    def set_job_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE batch_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def set_provider_ref(self, job_id: str, provider_ref: str) -> None:
+        """Record the provider's own id for a job so it can be resumed."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE batch_jobs SET provider_ref = ?, updated_at = ? WHERE id = ?",
+                (provider_ref, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def save_result(self, job_id: str, index: int, result: Dict) -> None:
+        """Persist the result of one item, unless it already has one.
+
+        Args:
+            job_id: Job id
+            index: Item index within the job
+            result: Result dict with 'success', 'files', 'token_usage', 'violations' and 'error'
+        """
+        status = ITEM_SUCCEEDED if result.get("success") else ITEM_FAILED
+        with self._lock:
+            # seq gives results a total completion order within the job; an item
+            # saved again would get a second seq and be streamed twice
+            self._conn.execute(
+                "UPDATE batch_items SET status = ?, result = ?, completed_at = ?, "
+                "seq = (SELECT COALESCE(MAX(seq), 0) + 1 FROM batch_items WHERE job_id = ?) "
+                "WHERE job_id = ? AND idx = ? AND status = ?",
+                (status, json.dumps(result, ensure_ascii=False), time.time(), job_id, job_id, index, ITEM_PENDING)
+            )
+            self._conn.commit()
+
+    def claim_resume(self) -> bool:
+        """Claim the right to resume unfinished jobs for this process.
+
+        Worker processes sharing the store race for an exclusive file lock
+        held until ``close``, so interrupted jobs are restarted by one worker
+        only. The lock is released when the process exits, however it exits.
+
+        Returns:
+            True if this process holds the lock
+        """
+        if self.path == ":memory:" or fcntl is None:
+            return True
+        if self._resume_lock_file is not None:
+            return True
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._resume_lock_file = lock_file
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        if self._resume_lock_file is not None:
+            self._resume_lock_file.close()
+            self._resume_lock_file = None
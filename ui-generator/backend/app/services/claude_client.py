@@ -1,19 +1,116 @@
 """Claude API client for generating React UI code."""
-import re
-from typing import Dict, List, Optional
-from anthropic import Anthropic
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+from anthropic import AsyncAnthropic
+from anthropic.types import Message
 from app.config import settings
+from app.services import metrics
+from app.services.code_parser import StreamingCodeParser, parse_generated_code
+from app.services.history_store import remember_generation
+from app.services.preview import get_preview_renderer
+from app.services.refine import RefineError, format_refine_request, merge_changes
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryPolicy,
+    TokenBucket,
+    UpstreamUnavailableError,
+    call_with_retries,
+    error_reason,
+    hedged,
+)
+from app.services.response_cache import get_response_cache, make_cache_key
+from app.services.routing import FAST, ModelRouter, Route, check_output
+from app.services.validator import ValidationReport, validate_files
 from app.services.skill_loader import get_skill_loader
 from app.models.schemas import GeneratedFile, TokenUsage
 
+logger = logging.getLogger(__name__)
+
+# Minimum time-to-first-token samples before hedging uses the observed quantile
+HEDGE_MIN_SAMPLES = 20
+
+
+class _UpstreamStream:
+    """An open upstream message stream that has produced its first content."""
+
+    def __init__(self, manager: Any, stream: Any, buffered: List[Any], ttft: float):
+        self._manager = manager
+        self.stream = stream
+        self._buffered = buffered
+        self.ttft = ttft
+
+    async def events(self) -> AsyncIterator[Any]:
+        """Yield the events read while opening, then the rest of the stream."""
+        for event in self._buffered:
+            yield event
+        self._buffered = []
+        async for event in self.stream:
+            yield event
+
+    async def aclose(self) -> None:
+        await self._manager.__aexit__(None, None, None)
+
 
 class ClaudeClient:
     """Client for interacting with Claude API."""
 
     def __init__(self):
-        """Initialize Claude client."""
-        self.client = Anthropic(api_key=settings.anthropic_api_key)
+        """Initialize Claude client.
+
+        All requests share one pooled async HTTP client, and the number of
+        in-flight upstream calls is capped by a semaphore so a burst of
+        generations cannot exhaust the connection pool.
+
+        Upstream calls are retried with backoff, guarded by a circuit breaker,
+        optionally hedged when slow to start, and optionally paced by a
+        tokens-per-minute bucket. The SDK's own retries are disabled so every
+        attempt goes through that policy.
+
+        Generations are routed to a model and output budget by a ModelRouter.
+        """
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(settings.request_timeout, connect=settings.connect_timeout),
+        )
+        self.client = AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            base_url=settings.anthropic_base_url or None,
+            http_client=self.http_client,
+            max_retries=0,
+        )
         self.skill_loader = get_skill_loader()
+        self._semaphore = asyncio.Semaphore(settings.max_concurrent_generations)
+        self.retry_policy = RetryPolicy(
+            settings.retry_max_attempts,
+            settings.retry_base_delay,
+            settings.retry_max_delay,
+        )
+        self.circuit_breaker = CircuitBreaker(
+            settings.circuit_failure_threshold,
+            settings.circuit_reset_timeout,
+        )
+        self.token_bucket = (
+            TokenBucket(settings.upstream_tokens_per_minute)
+            if settings.upstream_tokens_per_minute > 0 else None
+        )
+        self._ttft = LatencyTracker()
+        self.router = ModelRouter(
+            settings.claude_model,
+            settings.max_tokens,
+            settings.routing_fast_model,
+            settings.routing_fast_max_tokens,
+            settings.routing_fast_page_types_list,
+            settings.routing_max_prompt_chars,
+            settings.routing_complex_keywords_list,
+        )
 
     async def generate_code(
         self,
@@ -32,190 +129,826 @@ class ClaudeClient:
                 - files: List[GeneratedFile]
                 - preview_html: str
                 - token_usage: TokenUsage
+                - cached: bool
                 - error: Optional[str]
+                - model: model that produced the files, only present on success
+                - violations: design-system violations found in the files
+                - generation_id: id for refine_code, only present on success
+                - retry_after: seconds until upstream may recover, only
+                  present when it was unavailable
         """
+        with metrics.track_generation(page_type):
+            route = self.router.choose(user_prompt, page_type)
+            cache_key = self._cache_key(user_prompt, page_type, route)
+            cache = get_response_cache() if cache_key else None
+            if cache is None:
+                metrics.record_cache_request("bypass", page_type)
+                result = await self._generate_uncached(user_prompt, page_type)
+                return await self._with_generation_id({**result, "cached": False}, page_type, user_prompt)
+
+            # Results are stored under the route that served them. A fast-routed
+            # prompt that was escalated before finds the main-model result.
+            main_key = self._cache_key(user_prompt, page_type, self.router.main)
+            result, cached = await cache.get_or_compute(
+                cache_key,
+                lambda: self._generate_uncached(user_prompt, page_type),
+                fallback_key=main_key if main_key != cache_key else None,
+                store_key=lambda result: cache_key if result.get("model") == route.model else main_key
+            )
+            metrics.record_cache_request("hit" if cached else "miss", page_type)
+            return await self._with_generation_id({**result, "cached": cached}, page_type, user_prompt)
+
+    async def refine_code(
+        self,
+        files: List[Dict],
+        instruction: str,
+        page_type: Optional[str] = None,
+        parent_id: Optional[str] = None
+    ) -> Dict:
+        """Apply a change to previously generated files.
+
+        The model is asked only for what changes, as search/replace edits or
+        whole new files, which are merged into ``files``. Unchanged files are
+        neither regenerated nor re-parsed, and their transpiled preview
+        modules are served from the preview cache.
+
+        Args:
+            files: Current file dictionaries with 'path' and 'content'
+            instruction: Requested change in natural language
+            page_type: Optional page type hint, used as a metrics label
+            parent_id: Generation the files came from, recorded in the history
+
+        Returns:
+            Result dictionary as described in generate_code, where 'files' is
+            the full merged set, plus:
+                - changed_files: paths added or modified
+                - deleted_files: paths removed
+        """
+        model = settings.claude_model
+        message = None
+        with metrics.track_generation(page_type):
+            try:
+                params = self.build_refine_params(files, instruction, page_type)
+                message = await self._create_message(params, page_type)
+                response_text = "".join(block.text for block in message.content if block.type == "text")
+
+                with metrics.stage_timer("parse", page_type, message.model):
+                    parser = StreamingCodeParser()
+                    parser.feed(response_text)
+                    parser.finish()
+                    merged, changed, deleted = merge_changes(
+                        files, parser.files, parser.edits, parser.deleted
+                    )
+
+                if not changed and not deleted:
+                    metrics.record_parse_failure(page_type, message.model)
+                    raise RefineError("No changes found in response.")
+
+                result = {
+                    "success": True,
+                    **await self.finish_files(merged, page_type, message.model),
+                    "token_usage": self._token_usage(message.usage),
+                    "changed_files": changed,
+                    "deleted_files": deleted,
+                    "model": params["model"],
+                    "error": None
+                }
+                result = await self._with_generation_id(result, page_type, instruction, parent_id)
+
+            except (CircuitOpenError, UpstreamUnavailableError) as e:
+                logger.warning("Upstream unavailable: %s", e)
+                result = self._error_result(e)
+                result["retry_after"] = e.retry_after
+
+            except RefineError as e:
+                logger.warning("Could not apply refinement: %s", e)
+                result = self._error_result(e)
+                result["token_usage"] = self._token_usage(message.usage if message else None)
+
+            except Exception as e:
+                logger.exception("Error refining code: %s", e)
+                result = self._error_result(e)
+
+            metrics.record_generation(result, page_type, model)
+            return {**result, "cached": False}
+
+    async def _with_generation_id(
+        self,
+        result: Dict,
+        page_type: Optional[str],
+        prompt: str,
+        parent_id: Optional[str] = None
+    ) -> Dict:
+        """Save a successful result to the generation history and add its id."""
+        if result["success"]:
+            result["generation_id"] = await remember_generation(
+                result["files"], page_type, prompt, parent_id, result.get("model")
+            )
+        return result
+
+    async def _generate_uncached(
+        self,
+        user_prompt: str,
+        page_type: Optional[str] = None
+    ) -> Dict:
+        """Call Claude and parse the response, bypassing the response cache.
+
+        The model router picks the model and output budget. A fast-model
+        response that yields no files, is cut off or breaks design rules that
+        cannot be fixed is discarded and the request runs once more on the
+        main model; the token usage returned covers both calls.
+
+        Args:
+            user_prompt: Natural language description of UI to generate
+            page_type: Optional page type hint
+
+        Returns:
+            Result dictionary as described in generate_code, without 'cached'
+        """
+        route = self.router.choose(user_prompt, page_type)
+        discarded_usage = None
         try:
-            # Build system prompt with skill instructions
-            system_prompt = self.skill_loader.load_skill_instructions(page_type)
-
-            # Call Claude API
-            message = self.client.messages.create(
-                model=settings.claude_model,
-                max_tokens=settings.max_tokens,
-                temperature=settings.temperature,
-                system=system_prompt,
-                messages=[{
-                    "role": "user",
-                    "content": f"Generate a React frontend for: {user_prompt}"
-                }]
+            result, failure, report = await self._generate_routed(route, user_prompt, page_type)
+            if failure and route.tier == FAST:
+                # The discarded call's tokens are counted under the model that used them
+                discarded_usage = result["token_usage"]
+                metrics.record_token_usage(discarded_usage, page_type, route.model)
+                route = self.router.escalation(failure)
+                result, _, report = await self._generate_routed(route, user_prompt, page_type)
+
+            if result["success"]:
+                result.update(await self.finish_files(result["files"], page_type, route.model, report))
+
+        except (CircuitOpenError, UpstreamUnavailableError) as e:
+            logger.warning("Upstream unavailable: %s", e)
+            result = self._error_result(e)
+            result["retry_after"] = e.retry_after
+
+        except Exception as e:
+            logger.exception("Error generating code: %s", e)
+            result = self._error_result(e)
+
+        metrics.record_generation(result, page_type, route.model)
+        if discarded_usage is not None:
+            result["token_usage"] = {
+                kind: count + discarded_usage[kind] for kind, count in result["token_usage"].items()
+            }
+        return result
+
+    async def _generate_routed(
+        self,
+        route: Route,
+        user_prompt: str,
+        page_type: Optional[str]
+    ) -> Tuple[Dict, Optional[str], Optional[ValidationReport]]:
+        """Run one generation call on a route and log the outcome.
+
+        Fast-model output is validated here, before any preview, so that
+        design errors can trigger an escalation.
+
+        Args:
+            route: Model and output budget to use
+            user_prompt: Natural language description of UI to generate
+            page_type: Optional page type hint
+
+        Returns:
+            Tuple of (result without preview, why the output is unusable or
+            None, validation report if the output was validated)
+        """
+        started = time.perf_counter()
+        try:
+            params = self.build_message_params(user_prompt, page_type, route)
+            message = await self._create_message(params, page_type)
+        except Exception:
+            self._log_route(route, user_prompt, page_type, "error", started, None)
+            raise
+
+        result = self.build_result(message, page_type)
+        result["model"] = route.model
+        report = None
+        if (
+            route.tier == FAST and result["files"] and settings.validation_enabled
+            and settings.routing_escalate_on_violations
+        ):
+            report = await self.validate(result["files"], page_type, route.model)
+        failure = check_output(result["files"], message.stop_reason, report.errors if report else None)
+        if failure is None:
+            outcome = "ok"
+        elif route.tier == FAST:
+            outcome = f"escalated:{failure}"
+        else:
+            outcome = failure
+        self._log_route(route, user_prompt, page_type, outcome, started, result["token_usage"])
+        return result, failure, report
+
+    @staticmethod
+    def _log_route(
+        route: Route,
+        user_prompt: str,
+        page_type: Optional[str],
+        outcome: str,
+        started: float,
+        token_usage: Optional[Dict[str, int]]
+    ) -> None:
+        """Log and count a routing decision with its outcome, for tuning the router."""
+        metrics.record_routing(route.tier, route.reason, outcome)
+        logger.info(
+            "Routed generation: tier=%s model=%s reason=%s page_type=%s prompt_chars=%d "
+            "max_tokens=%d outcome=%s seconds=%.2f input_tokens=%s output_tokens=%s",
+            route.tier, route.model, route.reason, page_type, len(user_prompt), route.max_tokens,
+            outcome, time.perf_counter() - started,
+            token_usage["input"] if token_usage else None,
+            token_usage["output"] if token_usage else None
+        )
+
+    def _error_result(self, error: Exception) -> Dict:
+        return {
+            "success": False,
+            "files": [],
+            "preview_html": "",
+            "token_usage": self._token_usage(None),
+            "error": str(error)
+        }
+
+    async def _create_message(self, params: Dict[str, Any], page_type: Optional[str]) -> Message:
+        """Call the Messages API and return the complete message.
+
+        The response is consumed as a stream so time to first token can be
+        measured and slow starts hedged; the caller still receives one
+        accumulated Message. Transient failures anywhere in the call are retried.
+
+        Args:
+            params: Parameters from build_message_params
+            page_type: Page type, used as a metrics label
+
+        Returns:
+            Accumulated Message with final usage
+        """
+        model = params["model"]
+        reserved = await self._reserve_tokens(params, page_type)
+        message = None
+
+        try:
+            started = time.perf_counter()
+            message = await self._with_retries(
+                lambda: self._limited(lambda: self._read_message(params, page_type))
             )
+            metrics.record_stage("upstream_total", time.perf_counter() - started, page_type, model)
+        finally:
+            self._settle_tokens(reserved, self._token_usage(message.usage) if message else None)
+        return message
+
+    async def _acquire_upstream(self) -> None:
+        """Take a concurrency slot for one upstream attempt."""
+        await self._semaphore.acquire()
+        metrics.UPSTREAM_IN_FLIGHT.inc()
+
+    def _release_upstream(self) -> None:
+        """Give back a slot taken by _acquire_upstream."""
+        metrics.UPSTREAM_IN_FLIGHT.dec()
+        self._semaphore.release()
+
+    async def _limited(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one upstream attempt holding a concurrency slot.
+
+        Slots are taken per attempt, so a request backing off before a retry
+        does not keep one from other requests.
+        """
+        await self._acquire_upstream()
+        try:
+            return await call()
+        finally:
+            self._release_upstream()
 
-            # Extract text content from response
-            response_text = ""
-            for block in message.content:
-                if block.type == "text":
-                    response_text += block.text
+    async def _open_limited(self, params: Dict[str, Any], page_type: Optional[str]) -> _UpstreamStream:
+        """Open an upstream stream holding a concurrency slot.
 
-            # Parse generated code files
-            files = self._parse_generated_code(response_text)
+        The slot stays taken once the stream is open; the caller gives it
+        back with _release_upstream after closing the stream.
+        """
+        await self._acquire_upstream()
+        try:
+            return await self._open_stream(params, page_type)
+        except BaseException:
+            self._release_upstream()
+            raise
+
+    async def _read_message(self, params: Dict[str, Any], page_type: Optional[str]) -> Message:
+        """Run one upstream call to completion and return the accumulated Message."""
+        upstream = await self._open_stream(params, page_type)
+        output_tokens = None
+        try:
+            async for event in upstream.events():
+                if event.type == "message_delta":
+                    output_tokens = event.usage.output_tokens
+            message = await upstream.stream.get_final_message()
+        finally:
+            await upstream.aclose()
+
+        # The SDK's accumulated snapshot does not apply message_delta usage
+        if output_tokens is not None:
+            message.usage.output_tokens = output_tokens
+        return message
+
+    async def _open_stream(self, params: Dict[str, Any], page_type: Optional[str]) -> _UpstreamStream:
+        """Open an upstream stream, hedging with a second request if it is slow to start.
+
+        Args:
+            params: Parameters from build_message_params
+            page_type: Page type, used as a metrics label
+
+        Returns:
+            The first stream to produce content; the other is closed
+        """
+        upstream = await hedged(
+            lambda: self._start_stream(params),
+            self._hedge_delay(),
+            lambda loser: loser.aclose(),
+            on_hedge=metrics.HEDGED_REQUESTS.inc
+        )
+        self._ttft.record(upstream.ttft)
+        metrics.record_stage("upstream_ttft", upstream.ttft, page_type, params["model"])
+        return upstream
+
+    async def _start_stream(self, params: Dict[str, Any]) -> _UpstreamStream:
+        """Send one streaming request and read events until the first content arrives."""
+        started = time.perf_counter()
+        manager = self.client.messages.stream(**params)
+        stream = await manager.__aenter__()
+        buffered = []
+        try:
+            while True:
+                try:
+                    event = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+                buffered.append(event)
+                if event.type == "content_block_delta":
+                    break
+        except BaseException:
+            await manager.__aexit__(None, None, None)
+            raise
+        return _UpstreamStream(manager, stream, buffered, time.perf_counter() - started)
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Return how long to wait for first content before hedging, or None to not hedge."""
+        if not settings.hedge_enabled:
+            return None
+        if len(self._ttft) < HEDGE_MIN_SAMPLES:
+            return settings.hedge_min_delay
+        return max(settings.hedge_min_delay, self._ttft.quantile(settings.hedge_quantile))
+
+    async def _with_retries(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Run an upstream attempt under the retry policy and circuit breaker."""
+        try:
+            return await call_with_retries(
+                attempt,
+                self.retry_policy,
+                self.circuit_breaker,
+                on_retry=lambda e: metrics.record_upstream_retry(error_reason(e))
+            )
+        except CircuitOpenError:
+            metrics.CIRCUIT_REJECTIONS.inc()
+            raise
+
+    async def _reserve_tokens(self, params: Dict[str, Any], page_type: Optional[str]) -> int:
+        """Take an estimate of the call's tokens from the token bucket, if enabled.
+
+        The estimate is roughly four characters per input token plus the full
+        output allowance; the difference is settled once usage is known.
+
+        Returns:
+            Number of tokens reserved
+        """
+        if self.token_bucket is None:
+            return 0
+        system = params["system"]
+        text = system if isinstance(system, str) else "".join(block["text"] for block in system)
+        text += "".join(message["content"] for message in params["messages"])
+        reserved = len(text) // 4 + params["max_tokens"]
+        waited = await self.token_bucket.acquire(reserved)
+        if waited:
+            metrics.record_stage("rate_limit_wait", waited, page_type, params["model"])
+        return reserved
+
+    def _settle_tokens(self, reserved: int, token_usage: Optional[Dict[str, int]]) -> None:
+        """Correct the token bucket for the actual usage of a call."""
+        if self.token_bucket is None or not reserved:
+            return
+        used = 0
+        if token_usage is not None:
+            # Cache reads do not count towards input rate limits
+            used = token_usage["input"] + token_usage["output"] + token_usage["cache_write"]
+        self.token_bucket.settle(reserved, used)
+
+    async def stream_code(
+        self,
+        user_prompt: str,
+        page_type: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """Stream React UI code generation as a sequence of events.
+
+        Args:
+            user_prompt: Natural language description of UI to generate
+            page_type: Optional page type hint (form, list, detail, dashboard)
+
+        Yields:
+            Event dictionaries, each with a 'type' key:
+                - delta: raw text chunk in 'text'
+                - file: completed file in 'file' (a repeated path replaces the earlier file;
+                  files changed by design fixes are sent again before 'done')
+                - done: final 'success', 'preview_html', 'token_usage', 'cached', 'error'
+                  and, on success, 'violations' and 'generation_id'
+        """
+        with metrics.track_generation(page_type):
+            async for event in self._stream_events(user_prompt, page_type):
+                yield event
+
+    async def _stream_events(self, user_prompt: str, page_type: Optional[str]) -> AsyncIterator[Dict]:
+        cache_key = self._cache_key(user_prompt, page_type, self.router.main)
+        cache = get_response_cache() if cache_key else None
+        if cache is None:
+            metrics.record_cache_request("bypass", page_type)
+        else:
+            cached = await cache.get(cache_key)
+            metrics.record_cache_request("miss" if cached is None else "hit", page_type)
+            if cached is not None:
+                for file in cached["files"]:
+                    yield {"type": "file", "file": file}
+                yield {
+                    "type": "done",
+                    "success": True,
+                    "preview_html": cached["preview_html"],
+                    "token_usage": cached["token_usage"],
+                    "cached": True,
+                    "error": None,
+                    "violations": cached.get("violations", []),
+                    "generation_id": await remember_generation(
+                        cached["files"], page_type, user_prompt, model=cached.get("model")
+                    )
+                }
+                return
 
+        parser = StreamingCodeParser()
+        token_usage = self._token_usage(None)
+        model = settings.claude_model
+        parse_seconds = 0.0
+
+        reserved = 0
+
+        try:
+            # Streamed text cannot be taken back for an escalation, so streams use the main model
+            params = self.build_message_params(user_prompt, page_type)
+            reserved = await self._reserve_tokens(params, page_type)
+
+            started = time.perf_counter()
+            # Only opening the stream is retried: once text is sent it cannot be taken back
+            upstream = await self._with_retries(lambda: self._open_limited(params, page_type))
+            try:
+                async for event in upstream.events():
+                    # Usage arrives on message_start and is finalized by message_delta
+                    if event.type == "message_start":
+                        token_usage = self._token_usage(event.message.usage)
+                    elif event.type == "message_delta":
+                        token_usage["output"] = event.usage.output_tokens
+                    elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                        text = event.delta.text
+                        yield {"type": "delta", "text": text}
+                        parse_started = time.perf_counter()
+                        completed = parser.feed(text)
+                        parse_seconds += time.perf_counter() - parse_started
+                        for file in completed:
+                            yield {"type": "file", "file": file}
+            finally:
+                try:
+                    await upstream.aclose()
+                finally:
+                    self._release_upstream()
+            metrics.record_stage("upstream_total", time.perf_counter() - started, page_type, model)
+
+            # Trailing block, or unmarked blocks if the response had no FILE markers
+            parse_started = time.perf_counter()
+            completed = parser.finish()
+            parse_seconds += time.perf_counter() - parse_started
+            metrics.record_stage("parse", parse_seconds, page_type, model)
+            for file in completed:
+                yield {"type": "file", "file": file}
+
+            files = parser.files
             if not files:
-                return {
+                metrics.record_parse_failure(page_type, model)
+                metrics.record_generation({"success": False, "token_usage": token_usage}, page_type, model)
+                yield {
+                    "type": "done",
                     "success": False,
-                    "files": [],
                     "preview_html": "",
-                    "token_usage": {
-                        "input": message.usage.input_tokens,
-                        "output": message.usage.output_tokens
-                    },
+                    "token_usage": token_usage,
+                    "cached": False,
                     "error": "Failed to parse generated code. No valid files found in response."
                 }
-
-            # Generate preview HTML
-            preview_html = self._generate_preview_html(files)
-
-            return {
+                return
+
+            finished = await self.finish_files(files, page_type, model)
+            # Fixed files are sent again; a repeated path replaces the earlier file
+            for file, fixed in zip(files, finished["files"]):
+                if fixed is not file:
+                    yield {"type": "file", "file": fixed}
+            result = {
                 "success": True,
-                "files": files,
-                "preview_html": preview_html,
-                "token_usage": {
-                    "input": message.usage.input_tokens,
-                    "output": message.usage.output_tokens
-                },
+                **finished,
+                "token_usage": token_usage,
+                "model": model,
                 "error": None
             }
+            metrics.record_generation(result, page_type, model)
+            if cache is not None:
+                await cache.put(cache_key, result)
+
+            yield {
+                "type": "done",
+                "success": True,
+                "preview_html": result["preview_html"],
+                "token_usage": token_usage,
+                "cached": False,
+                "error": None,
+                "violations": result["violations"],
+                "generation_id": await remember_generation(result["files"], page_type, user_prompt)
+            }
 
         except Exception as e:
-            print(f"Error generating code: {e}")
+            if isinstance(e, (CircuitOpenError, UpstreamUnavailableError)):
+                logger.warning("Upstream unavailable: %s", e)
+            else:
+                logger.exception("Error streaming code: %s", e)
+            metrics.record_generation({"success": False, "token_usage": token_usage}, page_type, model)
+            yield {
+                "type": "done",
+                "success": False,
+                "preview_html": "",
+                "token_usage": token_usage,
+                "cached": False,
+                "error": str(e)
+            }
+
+        finally:
+            self._settle_tokens(reserved, token_usage)
+
+    def build_result(self, message: Any, page_type: Optional[str] = None) -> Dict:
+        """Parse a Messages API response into a generation result.
+
+        Preview HTML is left empty; see render_preview.
+
+        Args:
+            message: Message returned by the API
+            page_type: Page type, used as a metrics label
+
+        Returns:
+            Result dictionary as described in generate_code, without 'cached'
+        """
+        # Extract text content from response
+        response_text = ""
+        for block in message.content:
+            if block.type == "text":
+                response_text += block.text
+
+        # Parse generated code files
+        with metrics.stage_timer("parse", page_type, message.model):
+            files = self._parse_generated_code(response_text)
+
+        if not files:
+            metrics.record_parse_failure(page_type, message.model)
             return {
                 "success": False,
                 "files": [],
                 "preview_html": "",
-                "token_usage": {"input": 0, "output": 0},
-                "error": str(e)
+                "token_usage": self._token_usage(message.usage),
+                "error": "Failed to parse generated code. No valid files found in response."
             }
 
-    def _parse_generated_code(self, response_text: str) -> List[Dict]:
-        """Parse generated code files from Claude response.
+        return {
+            "success": True,
+            "files": files,
+            "preview_html": "",
+            "token_usage": self._token_usage(message.usage),
+            "error": None
+        }
 
-        Expected format:
-        FILE: src/pages/PageName.tsx
-        ```tsx
-        // code here
-        ```
+    def _cache_key(self, user_prompt: str, page_type: Optional[str], route: Route) -> Optional[str]:
+        """Build the response cache key for a request served on ``route``.
 
         Args:
-            response_text: Raw response text from Claude
+            user_prompt: Natural language description of UI to generate
+            page_type: Optional page type hint
+            route: Route whose model and output budget produce the result
 
         Returns:
-            List of file dictionaries with 'path' and 'content' keys
+            Cache key, or None when sampling is non-deterministic
         """
-        files = []
+        if settings.temperature > 0:
+            return None
+        return make_cache_key(
+            user_prompt,
+            page_type,
+            route.model,
+            route.max_tokens,
+            self.skill_loader.content_hash
+        )
+
+    def build_message_params(
+        self,
+        user_prompt: str,
+        page_type: Optional[str],
+        route: Optional[Route] = None
+    ) -> Dict[str, Any]:
+        """Build keyword arguments for a Messages API call.
 
-        # Pattern to match file blocks
-        # Matches: FILE: path\n```language\ncode\n```
-        pattern = r'FILE:\s*([^\n]+)\n```(?:tsx?|typescript|javascript)?\n(.*?)```'
+        Args:
+            user_prompt: Natural language description of UI to generate
+            page_type: Optional page type hint
+            route: Model and output budget; defaults to the main model
 
-        matches = re.finditer(pattern, response_text, re.DOTALL)
+        Returns:
+            Parameters shared by blocking and streaming requests
+        """
+        route = route or self.router.main
+        with metrics.stage_timer("prompt_build", page_type, route.model):
+            system = self._build_system(page_type)
+
+        return {
+            "model": route.model,
+            "max_tokens": route.max_tokens,
+            "temperature": settings.temperature,
+            "system": system,
+            "messages": [{
+                "role": "user",
+                "content": f"Generate a React frontend for: {user_prompt}"
+            }],
+            "timeout": settings.request_timeout,
+        }
+
+    def build_refine_params(
+        self,
+        files: List[Dict],
+        instruction: str,
+        page_type: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build keyword arguments for a refinement call.
 
-        for match in matches:
-            file_path = match.group(1).strip()
-            file_content = match.group(2).strip()
+        The system prompt shares its cached skill prefix with generation
+        requests of the same page type; the current files travel in the user
+        message.
 
-            files.append({
-                "path": file_path,
-                "content": file_content
-            })
+        Args:
+            files: Current file dictionaries
+            instruction: Requested change in natural language
+            page_type: Page type of the files
 
-        # If no files found with FILE: marker, try to extract code blocks directly
-        if not files:
-            code_blocks = re.finditer(r'```(?:tsx?|typescript)?\n(.*?)```', response_text, re.DOTALL)
-            for i, match in enumerate(code_blocks):
-                content = match.group(1).strip()
-                # Try to infer filename from content
-                filename = self._infer_filename(content, i)
-                files.append({
-                    "path": filename,
-                    "content": content
-                })
+        Returns:
+            Parameters for _create_message
+        """
+        with metrics.stage_timer("prompt_build", page_type, settings.claude_model):
+            static_prompt, tail = self.skill_loader.load_refine_sections(page_type)
+            system = self._system_blocks(static_prompt, tail)
+            content = format_refine_request(files, instruction)
+
+        return {
+            "model": settings.claude_model,
+            "max_tokens": settings.max_tokens,
+            "temperature": settings.temperature,
+            "system": system,
+            "messages": [{"role": "user", "content": content}],
+            "timeout": settings.request_timeout,
+        }
+
+    def _build_system(self, page_type: Optional[str]) -> Any:
+        """Build the system prompt with skill instructions.
+
+        With prompt caching enabled the prompt is sent as two blocks: the static
+        skill sections, marked cacheable, followed by the page type guidance and
+        output format. The cached prefix is then shared by all requests for
+        the same page type.
 
-        return files
+        Args:
+            page_type: Optional page type hint
 
-    def _infer_filename(self, content: str, index: int) -> str:
-        """Infer filename from code content.
+        Returns:
+            List of system content blocks, or a plain string if caching is off
+        """
+        return self._system_blocks(*self.skill_loader.load_skill_sections(page_type))
+
+    @staticmethod
+    def _system_blocks(static_prompt: str, tail: str) -> Any:
+        """Combine prompt sections, marking the static head cacheable if caching is on."""
+        if not settings.prompt_caching:
+            return f"{static_prompt}\n{tail}"
+        return [
+            {
+                "type": "text",
+                "text": static_prompt,
+                "cache_control": {"type": "ephemeral"}
+            },
+            {"type": "text", "text": tail},
+        ]
+
+    @staticmethod
+    def _token_usage(usage: Any) -> Dict[str, int]:
+        """Convert an API usage object into a TokenUsage dictionary.
 
         Args:
-            content: Code content
-            index: File index for fallback naming
+            usage: Usage from a Message or message_start event, or None
 
         Returns:
-            Inferred filename
+            Dictionary with input, output, cache_read and cache_write counts
         """
-        # Try to extract component name from export statement
-        export_match = re.search(r'export\s+(?:default\s+)?function\s+(\w+)', content)
-        if export_match:
-            component_name = export_match.group(1)
-            return f"src/components/{component_name}.tsx"
+        if usage is None:
+            return {"input": 0, "output": 0, "cache_read": 0, "cache_write": 0}
+        return {
+            "input": usage.input_tokens,
+            "output": usage.output_tokens,
+            "cache_read": getattr(usage, "cache_read_input_tokens", None) or 0,
+            "cache_write": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        }
 
-        # Try to extract from const component
-        const_match = re.search(r'const\s+(\w+)\s*=\s*\(\)', content)
-        if const_match:
-            component_name = const_match.group(1)
-            return f"src/components/{component_name}.tsx"
+    def _parse_generated_code(self, response_text: str) -> List[Dict]:
+        """Parse generated code files from Claude response.
+
+        Args:
+            response_text: Raw response text from Claude
 
-        # Fallback
-        return f"src/components/Component{index + 1}.tsx"
+        Returns:
+            List of file dictionaries with 'path' and 'content' keys
+        """
+        return parse_generated_code(response_text)
 
-    def _generate_preview_html(self, files: List[Dict]) -> str:
-        """Generate preview HTML from generated files.
+    async def render_preview(self, files: List[Dict], page_type: Optional[str], model: str) -> str:
+        """Render preview HTML for generated files in a worker thread.
 
         Args:
             files: List of generated file dictionaries
+            page_type: Page type, used as a metrics label
+            model: Model label
 
         Returns:
             HTML string for preview iframe
         """
-        # Find the main page component (usually in src/pages/)
-        main_component = None
-        for file in files:
-            if "pages/" in file["path"] or "Page" in file["path"]:
-                main_component = file["content"]
-                break
-
-        # If no page found, use first component
-        if not main_component and files:
-            main_component = files[0]["content"]
-
-        if not main_component:
-            return "<html><body><p>No preview available</p></body></html>"
-
-        # Generate a simple preview HTML
-        # Note: This is a simplified version - in production, you'd want to properly
-        # transpile JSX and handle imports
-        preview_html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>UI Preview</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <style>
-        body {{ margin: 0; padding: 16px; font-family: system-ui, -apple-system, sans-serif; }}
-    </style>
-</head>
-<body>
-    <div id="preview">
-        <div class="bg-muted p-6 rounded-lg border border-border">
-            <p class="text-muted-foreground">Preview rendering requires a React runtime.</p>
-            <p class="text-sm text-muted-foreground mt-2">View generated code in the "Code" tab.</p>
-        </div>
-    </div>
-    <!-- In production, you would transpile and render the React component here -->
-</body>
-</html>
-"""
-        return preview_html
+        with metrics.stage_timer("preview", page_type, model):
+            return await asyncio.to_thread(get_preview_renderer().render, files)
+
+    async def validate(self, files: List[Dict], page_type: Optional[str], model: str) -> ValidationReport:
+        """Check files against the design rules in a worker thread.
+
+        Args:
+            files: List of generated file dictionaries
+            page_type: Page type, used as a metrics label
+            model: Model label
+
+        Returns:
+            Validation report; fixes are applied if validation_autofix is set
+        """
+        with metrics.stage_timer("validate", page_type, model):
+            report = await asyncio.to_thread(validate_files, files, settings.validation_autofix)
+        metrics.record_violations(report.violations)
+        return report
+
+    async def finish_files(
+        self,
+        files: List[Dict],
+        page_type: Optional[str],
+        model: str,
+        report: Optional[ValidationReport] = None
+    ) -> Dict:
+        """Validate generated files and render their preview.
+
+        Without autofix the two run concurrently. With autofix the files are
+        validated first, so the preview is rendered once, from the fixed files.
+
+        Args:
+            files: List of generated file dictionaries
+            page_type: Page type, used as a metrics label
+            model: Model label
+            report: Validation already done for these files, if any
+
+        Returns:
+            Dictionary with the (fixed) 'files', 'preview_html' and 'violations'
+        """
+        if not settings.validation_enabled:
+            preview_html = await self.render_preview(files, page_type, model)
+            return {"files": files, "preview_html": preview_html, "violations": []}
+
+        if report is None and not settings.validation_autofix:
+            preview_html, report = await asyncio.gather(
+                self.render_preview(files, page_type, model),
+                self.validate(files, page_type, model)
+            )
+        else:
+            if report is None:
+                report = await self.validate(files, page_type, model)
+            preview_html = await self.render_preview(report.files, page_type, model)
+        return {"files": report.files, "preview_html": preview_html, "violations": report.violations}
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        await self.http_client.aclose()
 
 
 # Singleton instance
@@ -228,3 +961,11 @@ def get_claude_client() -> ClaudeClient:
     if _claude_client is None:
         _claude_client = ClaudeClient()
     return _claude_client
+
+
+async def close_claude_client() -> None:
+    """Close the Claude client singleton if it was created."""
+    global _claude_client
+    if _claude_client is not None:
+        await _claude_client.aclose()
+        _claude_client = None
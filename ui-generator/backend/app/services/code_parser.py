@@ -0,0 +1,315 @@
+"""Single-pass parser for FILE blocks in Claude output.
+
+The same state machine serves both complete responses and streamed output:
+every character is examined at most once, with no regex scans over the
+response and no backtracking on malformed or unterminated fences.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+FILE_MARKER = "FILE:"
+EDIT_MARKER = "EDIT:"
+DELETE_MARKER = "DELETE:"
+FENCE = "```"
+
+# Outside a fence, only lines containing one of these change the parser state
+_TOKENS = (FENCE, FILE_MARKER, EDIT_MARKER, DELETE_MARKER)
+
+# Applied once per unmarked block, only when a response has no FILE markers
+_EXPORT_FUNCTION = re.compile(r'export\s+(?:default\s+)?function\s+(\w+)')
+_CONST_COMPONENT = re.compile(r'const\s+(\w+)\s*=\s*\(\)')
+
+
+def parse_generated_code(response_text: str) -> List[Dict]:
+    """Parse generated code files from a complete Claude response.
+
+    Args:
+        response_text: Raw response text from Claude
+
+    Returns:
+        List of file dictionaries with 'path' and 'content' keys
+    """
+    parser = StreamingCodeParser()
+    parser.feed(response_text)
+    parser.finish()
+    return parser.files
+
+
+def infer_filename(content: str, index: int) -> str:
+    """Infer filename from code content.
+
+    Args:
+        content: Code content
+        index: File index for fallback naming
+
+    Returns:
+        Inferred filename
+    """
+    # Try to extract component name from export statement
+    export_match = _EXPORT_FUNCTION.search(content)
+    if export_match:
+        return f"src/components/{export_match.group(1)}.tsx"
+
+    # Try to extract from const component
+    const_match = _CONST_COMPONENT.search(content)
+    if const_match:
+        return f"src/components/{const_match.group(1)}.tsx"
+
+    # Fallback
+    return f"src/components/Component{index + 1}.tsx"
+
+
+class StreamingCodeParser:
+    """Extracts generated files from model output in one pass.
+
+    Text is fed in arbitrary chunks. Outside code fences the parser jumps to
+    the next line holding a fence or marker; inside a fence it jumps between
+    backtick runs with ``str.find``, so neither prose nor code is inspected
+    line by line. A line split across chunks is kept as a list of pieces and
+    scanned once, when its newline arrives, so feeding a long line in small
+    chunks stays linear.
+    Each FILE block is returned the moment its closing fence is seen, so
+    callers can forward files without waiting for the full response. Fenced
+    blocks without a FILE marker are collected on the same pass and used, with
+    inferred names, only if the response has no markers.
+
+    Any language tag is accepted on the opening fence. A closing fence is a
+    line starting with backticks, or backticks ending the last line of code.
+    If a path appears more than once, the later block replaces the earlier
+    one in ``files``.
+
+    Refinement responses may also contain EDIT blocks (search/replace hunks
+    against an existing file) and DELETE lines; these are collected in
+    ``edits`` and ``deleted`` rather than ``files``.
+
+    Expected format:
+    FILE: src/pages/PageName.tsx
+    ```tsx
+    // code here
+    ```
+    """
+
+    def __init__(self):
+        """Initialize parser state."""
+        # Pieces of the current incomplete line, scanned once it is complete
+        self._partial: List[str] = []
+        self._path: Optional[str] = None
+        self._marker = FILE_MARKER
+        self._in_fence = False
+        self._content: List[str] = []
+        self._files: Dict[str, str] = {}
+        self._unmarked: List[str] = []
+        self._edits: List[Dict] = []
+        self._deleted: List[str] = []
+
+    @property
+    def files(self) -> List[Dict]:
+        """Files parsed so far, deduplicated by path in first-seen order."""
+        return [{"path": path, "content": content} for path, content in self._files.items()]
+
+    @property
+    def edits(self) -> List[Dict]:
+        """EDIT blocks parsed so far, in order, as dicts with 'path' and 'content'."""
+        return list(self._edits)
+
+    @property
+    def deleted(self) -> List[str]:
+        """Paths named by DELETE lines, in order."""
+        return list(self._deleted)
+
+    def feed(self, text: str) -> List[Dict]:
+        """Consume a chunk of text.
+
+        Args:
+            text: Next chunk of model output
+
+        Returns:
+            FILE blocks completed by this chunk, as dicts with 'path' and 'content'
+        """
+        completed: List[Dict] = []
+        if self._partial:
+            newline = text.find("\n")
+            if newline < 0:
+                self._partial.append(text)
+                return completed
+            self._partial.append(text[:newline + 1])
+            line = "".join(self._partial)
+            self._partial = []
+            self._keep(line, self._scan(line, completed))
+            text = text[newline + 1:]
+        self._keep(text, self._scan(text, completed))
+        return completed
+
+    def finish(self) -> List[Dict]:
+        """Flush the trailing partial line once the output has ended.
+
+        Returns:
+            Files completed by the trailing text. If no FILE block was found at
+            all, these are the unmarked fenced blocks with inferred filenames.
+            An unterminated block is dropped.
+        """
+        completed = self.feed("\n") if self._partial else []
+        self._partial = []
+
+        if not self._files and not self._edits:
+            for index, content in enumerate(self._unmarked):
+                completed.append(self._add_file(infer_filename(content, index), content))
+        self._unmarked = []
+
+        return completed
+
+    def _keep(self, buffer: str, pos: int) -> None:
+        """Hold the unconsumed end of ``buffer`` (an incomplete line) for the next chunk."""
+        if pos < len(buffer):
+            self._partial.append(buffer[pos:])
+
+    def _scan(self, buffer: str, completed: List[Dict]) -> int:
+        """Parse ``buffer`` (which starts at a line start) as far as it allows.
+
+        Args:
+            buffer: Text to parse
+            completed: Receives the FILE blocks closed in ``buffer``
+
+        Returns:
+            Offset of the first unconsumed character: the start of an
+            incomplete last line, or len(buffer)
+        """
+        pos = 0
+        found: Dict[str, int] = {}
+        while True:
+            if self._in_fence:
+                pos, file, blocked = self._scan_fence(buffer, pos)
+                if file:
+                    completed.append(file)
+                if blocked:
+                    return pos
+                continue
+
+            if self._path is None:
+                # Lines without a fence or marker leave the state unchanged: skip them
+                token_at = self._next_token(buffer, pos, found)
+                if token_at < 0:
+                    return buffer.rfind("\n", pos) + 1 or pos
+                pos = buffer.rfind("\n", pos, token_at) + 1 or pos
+
+            newline = buffer.find("\n", pos)
+            if newline < 0:
+                return pos
+            self._consume_line(buffer[pos:newline])
+            pos = newline + 1
+
+    @staticmethod
+    def _next_token(buffer: str, pos: int, found: Dict[str, int]) -> int:
+        """Return the offset of the nearest fence or marker at or after ``pos``, or -1.
+
+        ``found`` remembers each token's next offset across calls on the same
+        buffer, so every token is searched for at most once per occurrence.
+        """
+        nearest = -1
+        for token in _TOKENS:
+            at = found.get(token)
+            if at is None or 0 <= at < pos:
+                at = found[token] = buffer.find(token, pos)
+            if at >= 0 and (nearest < 0 or at < nearest):
+                nearest = at
+        return nearest
+
+    def _scan_fence(self, buffer: str, pos: int) -> Tuple[int, Optional[Dict], bool]:
+        """Scan fenced code from ``pos`` (a line start) for the closing fence.
+
+        Args:
+            buffer: Text being parsed
+            pos: Offset of the first unconsumed line of code
+
+        Returns:
+            Tuple of (new offset, completed FILE block or None, whether more
+            input is needed before scanning can continue)
+        """
+        search = pos
+        while True:
+            fence_at = buffer.find(FENCE, search)
+            if fence_at < 0:
+                # Keep the partial last line: it may start a fence in the next chunk
+                line_start = buffer.rfind("\n", pos) + 1
+                if line_start > pos:
+                    self._content.append(buffer[pos:line_start])
+                return max(line_start, pos), None, True
+
+            line_start = buffer.rfind("\n", pos, fence_at) + 1 or pos
+            if not buffer[line_start:fence_at].strip():
+                # Fence at the start of a line closes the block
+                file = self._close_block(buffer[pos:line_start])
+                return fence_at + len(FENCE), file, False
+
+            line_end = buffer.find("\n", fence_at)
+            if line_end < 0:
+                # Cannot tell whether the fence ends the line yet
+                self._content.append(buffer[pos:line_start])
+                return line_start, None, True
+
+            last_fence = buffer.rfind(FENCE, fence_at, line_end)
+            if not buffer[last_fence + len(FENCE):line_end].strip():
+                # Closing fence glued to the last line of code
+                file = self._close_block(buffer[pos:last_fence])
+                return line_end + 1, file, False
+
+            # Backticks inside a line of code; keep looking
+            search = line_end + 1
+
+    def _consume_line(self, line: str) -> None:
+        """Advance the state machine by one line outside a fence.
+
+        Args:
+            line: Line of output without its trailing newline
+        """
+        stripped = line.strip()
+        if stripped.startswith(FENCE):
+            self._in_fence = True
+            return
+
+        if self._path is not None and not stripped:
+            # Allow blank lines between a FILE marker and its fence
+            return
+
+        self._path = None
+        for marker in (FILE_MARKER, EDIT_MARKER, DELETE_MARKER):
+            marker_at = line.find(marker)
+            if marker_at < 0:
+                continue
+            path = line[marker_at + len(marker):].strip().strip("*`").strip() or None
+            if marker == DELETE_MARKER:
+                if path:
+                    self._deleted.append(path)
+            else:
+                self._path = path
+                self._marker = marker
+            return
+
+    def _close_block(self, tail: str) -> Optional[Dict]:
+        """Finish the current fenced block.
+
+        Args:
+            tail: Code between the last buffered content and the closing fence
+
+        Returns:
+            The completed FILE block, or None for an unmarked block
+        """
+        self._content.append(tail)
+        content = "".join(self._content).strip()
+        path = self._path
+        self._path = None
+        self._in_fence = False
+        self._content = []
+
+        if path is None:
+            self._unmarked.append(content)
+            return None
+        if self._marker == EDIT_MARKER:
+            self._edits.append({"path": path, "content": content})
+            return None
+        return self._add_file(path, content)
+
+    def _add_file(self, path: str, content: str) -> Dict:
+        self._files[path] = content
+        return {"path": path, "content": content}
@@ -0,0 +1,187 @@
+"""Negotiated gzip/brotli compression of response bodies."""
+import asyncio
+import gzip
+import zlib
+from typing import List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+# Streamed responses compressed chunk by chunk; other streams (zip downloads) pass through
+STREAM_COMPRESSIBLE_TYPES = ("application/x-ndjson",)
+
+# Bodies at least this large are compressed in a worker thread, off the event loop
+THREAD_THRESHOLD = 64 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the response encoding from an Accept-Encoding header.
+
+    Brotli is preferred when it is installed and accepted, then gzip.
+    Encodings with q=0 are refused, and '*' accepts both.
+
+    Args:
+        accept_encoding: Accept-Encoding header value
+
+    Returns:
+        "br", "gzip" or None for an uncompressed response
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    supported: List[str] = (["br"] if brotli is not None else []) + ["gzip"]
+    wildcard = accepted.get("*", 0.0)
+    best = None
+    best_quality = 0.0
+    for encoding in supported:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _StreamEncoder:
+    """Incremental gzip or brotli encoder that flushes after every chunk."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 writes a gzip header and trailer around the deflate stream
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def encode(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so the client can decode it at once."""
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """Return the end of the compressed stream."""
+        return self._compressor.finish() if self.encoding == "br" else self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing response bodies with gzip or brotli.
+
+    Responses sent as a single body are compressed whole. Streamed NDJSON
+    responses are compressed chunk by chunk with a flush after each one, so
+    every event still reaches the client as soon as it is produced; other
+    streams (zip downloads) pass through untouched. Small bodies and
+    non-text content types are left as is.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        """Initialize middleware.
+
+        Args:
+            app: ASGI application to wrap
+            minimum_size: Smallest body in bytes worth compressing
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: Brotli quality (0-11)
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        stream: Optional[_StreamEncoder] = None
+
+        async def send_wrapper(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether the body is complete
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if stream is not None:
+                more_body = message.get("more_body", False)
+                body = stream.encode(message.get("body", b""))
+                if not more_body:
+                    body += stream.finish()
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+            if start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(held["headers"]))
+            more_body = message.get("more_body", False)
+            if more_body and self._should_compress_stream(headers):
+                stream = _StreamEncoder(encoding, self.gzip_level, self.brotli_quality)
+                del headers["Content-Length"]
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                await send({**held, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": stream.encode(body), "more_body": True})
+                return
+            if not self._should_compress(headers, body, more_body):
+                await send(held)
+                await send(message)
+                return
+
+            compressed = (
+                await asyncio.to_thread(self.compress, body, encoding)
+                if len(body) >= THREAD_THRESHOLD else self.compress(body, encoding)
+            )
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send({**held, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress a body with the negotiated encoding."""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if more_body or len(body) < self.minimum_size or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _should_compress_stream(headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(STREAM_COMPRESSIBLE_TYPES)
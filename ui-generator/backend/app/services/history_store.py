@@ -0,0 +1,359 @@
+"""Persistent generation history with content-addressed file storage."""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from app.config import settings
+
+# Bytes read from a blob per zip write; also bounds the size of streamed chunks
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+def make_generation_id(files: List[Dict]) -> str:
+    """Build the id of a set of files.
+
+    The id depends only on file paths and contents, so every worker derives
+    the same id for the same files.
+
+    Args:
+        files: File dictionaries with 'path' and 'content'
+
+    Returns:
+        Hex digest identifying the file set
+    """
+    payload = json.dumps(
+        [[file["path"], file["content"]] for file in files],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def archive_path(path: str) -> str:
+    """Turn a model-chosen file path into a safe relative zip entry name.
+
+    Backslashes count as separators, and empty, '.' and '..' segments are
+    dropped, so no entry can be absolute or extract outside the target
+    directory.
+
+    Args:
+        path: File path as generated
+
+    Returns:
+        Relative '/'-separated path
+    """
+    segments = [
+        segment for segment in path.replace("\\", "/").split("/")
+        if segment not in ("", ".", "..")
+    ]
+    return "/".join(segments) or "untitled"
+
+
+class HistoryStore:
+    """Stores generations in SQLite and their file contents as blobs.
+
+    Each distinct file content is written once, to a blob named by its
+    SHA-256, so files shared between generations (common components, files
+    untouched by a refinement) take no extra space. Generations are keyed
+    by their content id; saving the same file set again is a no-op.
+
+    All methods are synchronous and thread-safe; async callers run them via
+    ``asyncio.to_thread``. Any worker process can read generations saved by
+    another.
+    """
+
+    def __init__(self, db_path: str, blob_dir: str):
+        """Open (and create if needed) the history database and blob directory.
+
+        Args:
+            db_path: SQLite database file path
+            blob_dir: Directory holding content-addressed file blobs
+        """
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.blob_dir = Path(blob_dir)
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS generations (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                prompt TEXT,
+                page_type TEXT,
+                model TEXT,
+                parent_id TEXT,
+                file_count INTEGER NOT NULL,
+                total_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS generation_files (
+                generation_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                blob TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (generation_id, idx)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def save_generation(
+        self,
+        generation_id: str,
+        files: List[Dict],
+        page_type: Optional[str] = None,
+        prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        parent_id: Optional[str] = None
+    ) -> bool:
+        """Store a generation and any file contents not already stored.
+
+        Args:
+            generation_id: Id from make_generation_id
+            files: File dictionaries with 'path' and 'content'
+            page_type: Page type the files were generated for
+            prompt: Prompt or refinement instruction that produced the files
+            model: Model that produced the files
+            parent_id: Generation this one was refined from
+
+        Returns:
+            True if the generation was new
+        """
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM generations WHERE id = ?", (generation_id,)
+            ).fetchone()
+        if exists:
+            return False
+
+        # Blobs are written before the rows that reference them
+        entries = []
+        for file in files:
+            data = file["content"].encode("utf-8")
+            entries.append((file["path"], self._write_blob(data), len(data)))
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO generations "
+                "(id, prompt, page_type, model, parent_id, file_count, total_bytes, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    generation_id, prompt, page_type, model, parent_id,
+                    len(entries), sum(size for _, _, size in entries), time.time()
+                )
+            )
+            if cursor.rowcount:
+                self._conn.executemany(
+                    "INSERT INTO generation_files (generation_id, idx, path, blob, size) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(generation_id, idx, path, blob, size) for idx, (path, blob, size) in enumerate(entries)]
+                )
+            self._conn.commit()
+        return bool(cursor.rowcount)
+
+    def get_generation(self, generation_id: str) -> Optional[Dict]:
+        """Return a generation's metadata and files, or None if it does not exist."""
+        summary = self.get_summary(generation_id)
+        if summary is None:
+            return None
+        files = []
+        for entry in self.file_entries(generation_id):
+            with self.open_blob(entry["blob"]) as blob:
+                files.append({"path": entry["path"], "content": blob.read().decode("utf-8")})
+        return {**summary, "files": files}
+
+    def get_summary(self, generation_id: str) -> Optional[Dict]:
+        """Return a generation's metadata without file contents."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM generations WHERE id = ?", (generation_id,)
+            ).fetchone()
+        return self._summary(row) if row else None
+
+    def list_generations(self, limit: int, before: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+        """List generations, newest first.
+
+        Args:
+            limit: Maximum number of generations to return
+            before: Cursor from a previous page, or None for the first page
+
+        Returns:
+            Tuple of (generation summaries, cursor for the next page or None)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM generations WHERE seq < ? ORDER BY seq DESC LIMIT ?",
+                (before if before is not None else 2 ** 63 - 1, limit + 1)
+            ).fetchall()
+        next_cursor = rows[limit - 1]["seq"] if len(rows) > limit else None
+        return [self._summary(row) for row in rows[:limit]], next_cursor
+
+    def file_entries(self, generation_id: str) -> List[Dict]:
+        """Return a generation's files as dicts with 'path', 'blob' and 'size'."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, blob, size FROM generation_files WHERE generation_id = ? ORDER BY idx",
+                (generation_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def open_blob(self, blob: str) -> BinaryIO:
+        """Open a stored file content for reading."""
+        return open(self._blob_path(blob), "rb")
+
+    def iter_zip(self, generation_id: str) -> Iterator[bytes]:
+        """Stream a generation's files as a zip archive.
+
+        The archive is written to a non-seekable sink and handed out chunk
+        by chunk as it is built, so memory use does not grow with its size.
+
+        Args:
+            generation_id: Generation to archive
+
+        Yields:
+            Consecutive chunks of the zip file
+        """
+        summary = self.get_summary(generation_id)
+        date_time = time.localtime(summary["created_at"] if summary else time.time())[:6]
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+            for entry in self.file_entries(generation_id):
+                info = zipfile.ZipInfo(archive_path(entry["path"]), date_time=date_time)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with self.open_blob(entry["blob"]) as source, archive.open(info, "w") as target:
+                    while True:
+                        data = source.read(ZIP_CHUNK_SIZE)
+                        if not data:
+                            break
+                        target.write(data)
+                        chunk = sink.drain()
+                        if chunk:
+                            yield chunk
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        yield sink.drain()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _write_blob(self, data: bytes) -> str:
+        """Write a blob unless identical content is already stored, and return its name."""
+        blob = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(blob)
+        if path.exists():
+            return blob
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers and concurrent writers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return blob
+
+    def _blob_path(self, blob: str) -> Path:
+        return self.blob_dir / blob[:2] / blob[2:]
+
+    @staticmethod
+    def _summary(row: sqlite3.Row) -> Dict:
+        return {
+            "generation_id": row["id"],
+            "prompt": row["prompt"],
+            "page_type": row["page_type"],
+            "model": row["model"],
+            "parent_id": row["parent_id"],
+            "file_count": row["file_count"],
+            "total_bytes": row["total_bytes"],
+            "created_at": row["created_at"],
+        }
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object collecting zip output between drains."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def remember_generation(
+    files: List[Dict],
+    page_type: Optional[str],
+    prompt: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    model: Optional[str] = None
+) -> str:
+    """Save a generated file set to the history and return its id.
+
+    Args:
+        files: Generated file dictionaries
+        page_type: Page type the files were generated for
+        prompt: Prompt or refinement instruction that produced the files
+        parent_id: Generation this one was refined from
+        model: Model that produced the files; defaults to the main model
+
+    Returns:
+        Generation id, usable with /api/refine and /api/history
+    """
+    generation_id = make_generation_id(files)
+    await asyncio.to_thread(
+        get_history_store().save_generation,
+        generation_id, files, page_type, prompt, model or settings.claude_model, parent_id
+    )
+    return generation_id
+
+
+async def load_generation(generation_id: str) -> Optional[Dict]:
+    """Load a stored generation with its files, or None if it does not exist."""
+    return await asyncio.to_thread(get_history_store().get_generation, generation_id)
+
+
+# Singleton instance
+_history_store = None
+
+
+def get_history_store() -> HistoryStore:
+    """Get or create the history store singleton."""
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore(settings.history_db_path, settings.history_blob_dir)
+    return _history_store
+
+
+def close_history_store() -> None:
+    """Close the history store singleton if it was created."""
+    global _history_store
+    if _history_store is not None:
+        _history_store.close()
+        _history_store = None
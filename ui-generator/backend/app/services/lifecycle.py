@@ -0,0 +1,92 @@
+"""Worker lifecycle: startup warm-up, readiness state and shutdown."""
+import asyncio
+import logging
+import time
+from typing import Optional
+from app.config import settings
+from app.services.batch import close_batch_manager, get_batch_manager
+from app.services.claude_client import close_claude_client, get_claude_client
+from app.services.history_store import close_history_store, get_history_store
+from app.services.metrics import mark_worker_stopped, monitor_event_loop_lag
+from app.services.preview import get_preview_renderer
+from app.services.response_cache import close_response_cache, get_response_cache
+from app.services.skill_loader import get_skill_loader
+
+logger = logging.getLogger(__name__)
+
+STARTING = "starting"
+READY = "ready"
+DRAINING = "draining"
+
+# Page types whose system prompts are compiled ahead of the first request
+WARM_PAGE_TYPES = (None, "form", "list", "detail", "dashboard")
+
+_state = STARTING
+_lag_monitor: Optional["asyncio.Task[None]"] = None
+
+
+def get_state() -> str:
+    """Return the worker state: starting, ready or draining."""
+    return _state
+
+
+def is_ready() -> bool:
+    """Return whether the worker should receive new traffic."""
+    return _state == READY
+
+
+def mark_draining() -> None:
+    """Report the worker as not ready while in-flight requests finish."""
+    global _state
+    if _state != DRAINING:
+        logger.info("Draining: readiness now reports unavailable")
+    _state = DRAINING
+
+
+def _compile_prompts() -> None:
+    """Read the skill files and build the system prompt for every page type."""
+    skill_loader = get_skill_loader()
+    for page_type in WARM_PAGE_TYPES:
+        skill_loader.load_skill_sections(page_type)
+    skill_loader.load_refine_sections()
+    logger.info(
+        "System prompt tokens by page type (est.): %s",
+        ", ".join(
+            f"{page_type} {sizes['tokens']} (-{sizes['saved_tokens']})"
+            for page_type, sizes in skill_loader.prompt_savings().items()
+        )
+    )
+    get_preview_renderer()
+
+
+async def startup() -> None:
+    """Warm up the worker, resume batch jobs and mark it ready."""
+    global _state, _lag_monitor
+    _state = STARTING
+    started = time.perf_counter()
+    # File reads run off the event loop; the client and cache bind to it
+    await asyncio.to_thread(_compile_prompts)
+    get_claude_client()
+    get_response_cache()
+    get_history_store()
+    await get_batch_manager().resume()
+    if settings.event_loop_lag_interval > 0:
+        _lag_monitor = asyncio.create_task(monitor_event_loop_lag(settings.event_loop_lag_interval))
+    _state = READY
+    logger.info("Worker ready in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+async def shutdown() -> None:
+    """Stop batch jobs and release pooled upstream connections and cache handles.
+
+    Runs after the server has stopped accepting connections and waited for
+    in-flight requests, so nothing is using the singletons any more.
+    """
+    mark_draining()
+    if _lag_monitor is not None:
+        _lag_monitor.cancel()
+    await close_batch_manager()
+    await close_claude_client()
+    close_response_cache()
+    close_history_store()
+    mark_worker_stopped()
@@ -0,0 +1,323 @@
+"""Prometheus metrics and per-request stage timing for the generation pipeline."""
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages, in the order they run for one generation
+STAGES = (
+    "queue_wait",
+    "prompt_build",
+    "rate_limit_wait",
+    "upstream_ttft",
+    "upstream_total",
+    "parse",
+    "validate",
+    "preview",
+    "serialize",
+)
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "uigen_stage_seconds",
+    "Time spent in each generation pipeline stage",
+    ["stage", "page_type", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "uigen_http_request_seconds",
+    "End-to-end HTTP request latency",
+    ["handler", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+TOKENS = Counter(
+    "uigen_tokens_total",
+    "Tokens consumed by upstream calls",
+    ["kind", "page_type", "model"],
+)
+GENERATIONS = Counter(
+    "uigen_generations_total",
+    "Generations by outcome",
+    ["outcome", "page_type", "model"],
+)
+CACHE_REQUESTS = Counter(
+    "uigen_response_cache_requests_total",
+    "Response cache lookups by result (hit, miss or bypass)",
+    ["result", "page_type"],
+)
+PARSE_FAILURES = Counter(
+    "uigen_parse_failures_total",
+    "Model responses from which no files could be parsed",
+    ["page_type", "model"],
+)
+DESIGN_VIOLATIONS = Counter(
+    "uigen_design_violations_total",
+    "Design-system violations found in generated files",
+    ["rule", "severity", "fixed"],
+)
+ROUTED_GENERATIONS = Counter(
+    "uigen_routed_generations_total",
+    "Generation attempts by routing tier, decision reason and outcome",
+    ["tier", "reason", "outcome"],
+)
+ADMISSIONS = Counter(
+    "uigen_admissions_total",
+    "Generation requests by admission outcome (admitted, queued, coalesced or rejected)",
+    ["outcome"],
+)
+UPSTREAM_RETRIES = Counter(
+    "uigen_upstream_retries_total",
+    "Upstream calls retried after a transient error",
+    ["reason"],
+)
+HEDGED_REQUESTS = Counter(
+    "uigen_hedged_requests_total",
+    "Hedge requests sent because the first attempt was slow to start",
+)
+CIRCUIT_REJECTIONS = Counter(
+    "uigen_circuit_rejections_total",
+    "Generations rejected without calling upstream because the circuit was open",
+)
+IN_FLIGHT_REQUESTS = Gauge(
+    "uigen_in_flight_requests",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+IN_FLIGHT_GENERATIONS = Gauge(
+    "uigen_in_flight_generations",
+    "Generations currently running, including time queued for an upstream slot",
+    ["page_type"],
+    multiprocess_mode="livesum",
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "uigen_upstream_in_flight",
+    "Upstream model calls currently holding a concurrency slot",
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUED = Gauge(
+    "uigen_admission_queued",
+    "Generation requests waiting in the admission queue",
+    multiprocess_mode="livesum",
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "uigen_event_loop_lag_seconds",
+    "How late the event loop ran a timer, sampled periodically per worker",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def _label(page_type: Optional[str]) -> str:
+    return page_type or "none"
+
+
+@contextmanager
+def track_generation(page_type: Optional[str]) -> Iterator[None]:
+    """Count the enclosed block as an in-flight generation."""
+    gauge = IN_FLIGHT_GENERATIONS.labels(_label(page_type))
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+def record_stage(stage: str, seconds: float, page_type: Optional[str], model: str) -> None:
+    """Record a stage duration in the histogram and the current request's timings.
+
+    Args:
+        stage: One of STAGES
+        seconds: Duration in seconds
+        page_type: Page type label
+        model: Model label
+    """
+    STAGE_SECONDS.labels(stage, _label(page_type), model).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def stage_timer(stage: str, page_type: Optional[str], model: str) -> Iterator[None]:
+    """Time the enclosed block as a pipeline stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started, page_type, model)
+
+
+def record_token_usage(token_usage: Dict[str, int], page_type: Optional[str], model: str) -> None:
+    """Add a TokenUsage dictionary to the token counters."""
+    for kind, count in token_usage.items():
+        if count:
+            TOKENS.labels(kind, _label(page_type), model).inc(count)
+
+
+def record_generation(result: Dict, page_type: Optional[str], model: str) -> None:
+    """Count a finished generation and its token usage.
+
+    Args:
+        result: Result dictionary as returned by ClaudeClient.generate_code
+        page_type: Page type label
+        model: Model label
+    """
+    outcome = "success" if result.get("success") else "failure"
+    GENERATIONS.labels(outcome, _label(page_type), model).inc()
+    record_token_usage(result.get("token_usage") or {}, page_type, model)
+
+
+def record_cache_request(result: str, page_type: Optional[str]) -> None:
+    """Count a response cache lookup (hit, miss or bypass)."""
+    CACHE_REQUESTS.labels(result, _label(page_type)).inc()
+
+
+def record_parse_failure(page_type: Optional[str], model: str) -> None:
+    """Count a response from which no files could be parsed."""
+    PARSE_FAILURES.labels(_label(page_type), model).inc()
+
+
+def record_violations(violations: List[Dict]) -> None:
+    """Count design-system violations by rule, severity and whether they were fixed."""
+    for violation in violations:
+        DESIGN_VIOLATIONS.labels(violation["rule"], violation["severity"], str(violation["fixed"]).lower()).inc()
+
+
+def record_routing(tier: str, reason: str, outcome: str) -> None:
+    """Count a generation attempt by its routing decision and outcome.
+
+    Args:
+        tier: Routing tier (fast or main)
+        reason: Why the tier was chosen
+        outcome: ok, error, no_files, truncated or escalated:<cause>
+    """
+    ROUTED_GENERATIONS.labels(tier, reason, outcome).inc()
+
+
+def record_admission(outcome: str) -> None:
+    """Count a generation request by admission outcome."""
+    ADMISSIONS.labels(outcome).inc()
+
+
+def record_upstream_retry(reason: str) -> None:
+    """Count a retried upstream call, labelled by HTTP status or error type."""
+    UPSTREAM_RETRIES.labels(reason).inc()
+
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """Record event loop lag until cancelled.
+
+    Sleeps for ``interval`` repeatedly; any time beyond it is time the loop
+    spent running other callbacks, such as blocking work on the loop.
+
+    Args:
+        interval: Seconds between samples
+    """
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, time.perf_counter() - started - interval))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Render all metrics in Prometheus text format.
+
+    When PROMETHEUS_MULTIPROC_DIR is set (multi-worker deployments), metrics
+    from every worker process are aggregated.
+
+    Returns:
+        Tuple of (body, content type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_stopped() -> None:
+    """Drop this process's live gauges from multi-worker aggregation."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def _server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency, in-flight counts and stage timings.
+
+    Stage timings recorded while handling a request are returned in a
+    ``Server-Timing`` header (for stages finished before the response starts)
+    and logged as one structured JSON line when the request completes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(timings).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        IN_FLIGHT_REQUESTS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT_REQUESTS.dec()
+            _request_timings.reset(token)
+
+            # The router stores the matched endpoint in the shared scope
+            endpoint = scope.get("endpoint")
+            handler = getattr(endpoint, "__name__", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(handler, scope["method"], str(status)).observe(elapsed)
+            if timings:
+                logger.info(json.dumps({
+                    "event": "request_timing",
+                    "handler": handler,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in timings.items()},
+                }))
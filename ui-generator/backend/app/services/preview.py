@@ -0,0 +1,421 @@
+"""Self-contained preview rendering for generated files.
+
+Generated TSX is transpiled to CommonJS with a local esbuild binary and
+linked in the page by a small runtime (preview/runtime.js) that stubs
+imports such as ``@/components/common``. React and a precompiled Tailwind
+stylesheet are inlined, trimmed to the classes the files use, so previews
+render without any network access. Transpiled modules are cached by content
+hash, so re-rendering unchanged files skips esbuild entirely.
+"""
+import hashlib
+import html
+import json
+import logging
+import re
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RUNTIME_FILE = "runtime.js"
+DIST_DIR = "dist"
+REACT_FILES = ("react.production.min.js", "react-dom.production.min.js")
+STYLESHEET_FILE = "tailwind.css"
+
+# esbuild loader per transpilable extension; other files are not linked
+LOADERS = {".tsx": "tsx", ".ts": "ts", ".jsx": "jsx", ".js": "jsx"}
+ESBUILD_ARGS = (
+    "--format=cjs",
+    "--target=es2019",
+    "--jsx=transform",
+    "--jsx-factory=React.createElement",
+    "--jsx-fragment=React.Fragment",
+    "--log-level=error",
+)
+
+_CLASS_SPLIT = re.compile(r"[\s\"'`{}()<>,;=$\\]+")
+_SELECTOR_CLASS = re.compile(r"\.((?:\\.|[\w-])+)")
+_CSS_ESCAPE = re.compile(r"\\(.)")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_SCRIPT_CLOSE = re.compile(r"</(script)", re.IGNORECASE)
+
+
+def _inline_script(code: str) -> str:
+    """Make code safe to embed in a <script> element."""
+    return _SCRIPT_CLOSE.sub(r"<\\/\1", code)
+
+
+class StylesheetIndex:
+    """Precompiled Tailwind stylesheet indexed by class name.
+
+    Rules whose selectors contain no class (preflight and Tailwind's CSS
+    variable defaults) are always emitted. Other rules are emitted when every
+    class in one of their selectors is used.
+    """
+
+    def __init__(self, css: str):
+        """Parse a stylesheet.
+
+        Args:
+            css: Stylesheet as written by the Tailwind CLI (minified or not)
+        """
+        # (wrapping at-rule or None, selector, body), in stylesheet order
+        self._rules: List[Tuple[Optional[str], str, str]] = []
+        self._selector_classes: List[List[Set[str]]] = []
+        self._by_class: Dict[str, List[int]] = {}
+        self._always: List[int] = []
+        self._parse(_CSS_COMMENT.sub("", css), None)
+
+    def _parse(self, css: str, wrapper: Optional[str]) -> None:
+        pos = 0
+        while True:
+            open_at = css.find("{", pos)
+            if open_at < 0:
+                return
+            prelude = css[pos:open_at].strip()
+            close_at = self._matching_brace(css, open_at)
+            body = css[open_at + 1:close_at]
+            pos = close_at + 1
+
+            if prelude.startswith(("@media", "@supports")):
+                self._parse(body, prelude)
+            elif prelude.startswith("@"):
+                # Keyframes and other at-rules are small; keep them all
+                self._add(wrapper, prelude, body, [])
+            else:
+                selectors = [
+                    {_CSS_ESCAPE.sub(r"\1", name) for name in _SELECTOR_CLASS.findall(selector)}
+                    for selector in prelude.split(",")
+                ]
+                self._add(wrapper, prelude, body, selectors)
+
+    @staticmethod
+    def _matching_brace(css: str, open_at: int) -> int:
+        depth = 0
+        for index in range(open_at, len(css)):
+            if css[index] == "{":
+                depth += 1
+            elif css[index] == "}":
+                depth -= 1
+                if depth == 0:
+                    return index
+        return len(css)
+
+    def _add(self, wrapper: Optional[str], selector: str, body: str, selectors: List[Set[str]]) -> None:
+        index = len(self._rules)
+        self._rules.append((wrapper, selector, " ".join(body.split())))
+        self._selector_classes.append(selectors)
+        if not any(selectors):
+            self._always.append(index)
+            return
+        for name in set().union(*selectors):
+            self._by_class.setdefault(name, []).append(index)
+
+    def css_for(self, classes: Set[str]) -> str:
+        """Return the stylesheet subset needed for the given classes.
+
+        Args:
+            classes: Candidate class names (unknown names are ignored)
+
+        Returns:
+            CSS text, grouped by media query in original order
+        """
+        selected = set(self._always)
+        for name in classes:
+            for index in self._by_class.get(name, ()):
+                if any(required and required <= classes for required in self._selector_classes[index]):
+                    selected.add(index)
+
+        parts: List[str] = []
+        open_wrapper: Optional[str] = None
+        for index in sorted(selected):
+            wrapper, selector, body = self._rules[index]
+            if wrapper != open_wrapper:
+                if open_wrapper is not None:
+                    parts.append("}")
+                if wrapper is not None:
+                    parts.append(f"{wrapper}{{")
+                open_wrapper = wrapper
+            parts.append(f"{selector}{{{body}}}")
+        if open_wrapper is not None:
+            parts.append("}")
+        return "\n".join(parts)
+
+
+class PreviewRenderer:
+    """Renders generated files into a self-contained preview page."""
+
+    def __init__(
+        self,
+        preview_dir: str,
+        esbuild_path: str = "",
+        cache_max_entries: int = 1024,
+        cache_dir: str = "",
+        transpile_timeout: float = 10.0
+    ):
+        """Initialize renderer and load the offline assets.
+
+        Args:
+            preview_dir: Directory holding runtime.js and the built dist/ assets
+            esbuild_path: esbuild binary; defaults to dist/esbuild, then PATH
+            cache_max_entries: Transpiled modules kept in memory
+            cache_dir: Directory for transpiled modules that survive restarts
+                (empty keeps them in memory only)
+            transpile_timeout: Seconds allowed for one esbuild run
+        """
+        root = Path(preview_dir)
+        dist = root / DIST_DIR
+        self.esbuild_path = (
+            esbuild_path
+            or (str(dist / "esbuild") if (dist / "esbuild").is_file() else None)
+            or shutil.which("esbuild")
+        )
+        self.cache_max_entries = cache_max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.transpile_timeout = transpile_timeout
+        self._cache: "OrderedDict[str, Tuple[Optional[str], Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._runtime = self._read(root / RUNTIME_FILE)
+        self._react = [self._read(dist / name) for name in REACT_FILES]
+        stylesheet = self._read(dist / STYLESHEET_FILE)
+        self._stylesheet = StylesheetIndex(stylesheet) if stylesheet is not None else None
+        self._runtime_classes = self._class_candidates(self._runtime or "")
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        missing = [
+            name for name, present in (
+                ("esbuild", self.esbuild_path),
+                (RUNTIME_FILE, self._runtime is not None),
+                ("React", all(code is not None for code in self._react)),
+            ) if not present
+        ]
+        self.available = not missing
+        if missing:
+            logger.warning(
+                "Preview toolchain incomplete (missing %s); serving file listings instead. "
+                "Run 'npm install && npm run build' in %s.",
+                ", ".join(missing), root
+            )
+        elif self._stylesheet is None:
+            logger.warning("Precompiled stylesheet not found in %s; previews will be unstyled", dist)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    @staticmethod
+    def _class_candidates(text: str) -> Set[str]:
+        return set(_CLASS_SPLIT.split(text))
+
+    def render(self, files: List[Dict]) -> str:
+        """Render generated files as a standalone HTML page.
+
+        Blocking: runs esbuild for files not already cached, so async callers
+        should run it in a worker thread.
+
+        Args:
+            files: List of generated file dictionaries
+
+        Returns:
+            HTML string for preview iframe
+        """
+        scripts = [file for file in files if Path(file["path"]).suffix in LOADERS]
+        if not scripts:
+            return "<html><body><p>No preview available</p></body></html>"
+        if not self.available:
+            return self._file_listing(files)
+
+        modules: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        for file, (code, error) in zip(scripts, self.transpile_many(scripts)):
+            if error is not None:
+                errors[file["path"]] = error
+            else:
+                modules[file["path"]] = code
+
+        css = ""
+        if self._stylesheet is not None:
+            used = set(self._runtime_classes)
+            for file in scripts:
+                used |= self._class_candidates(file["content"])
+            css = self._stylesheet.css_for(used).replace("</", "<\\/")
+
+        module_entries = ",\n".join(
+            f"{json.dumps(path)}: function (module, exports, require) {{\n{code}\n}}"
+            for path, code in modules.items()
+        )
+        data = (
+            f"window.__PREVIEW__ = {{\n"
+            f"entry: {json.dumps(self._entry_path(scripts))},\n"
+            f"errors: {json.dumps(errors, ensure_ascii=False)},\n"
+            f"modules: {{\n{module_entries}\n}}\n}};"
+        )
+        scripts_html = "\n".join(
+            f"<script>{_inline_script(code)}</script>"
+            for code in (*self._react, data, self._runtime)
+        )
+
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>UI Preview</title>
+<style>{css}</style>
+</head>
+<body>
+<div id="preview"></div>
+{scripts_html}
+</body>
+</html>
+"""
+
+    @staticmethod
+    def _entry_path(scripts: List[Dict]) -> str:
+        """Pick the main page component (usually in src/pages/), else the first file."""
+        for file in scripts:
+            if "pages/" in file["path"] or "Page" in file["path"]:
+                return file["path"]
+        return scripts[0]["path"]
+
+    def transpile_many(self, files: List[Dict]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Transpile files to CommonJS, running esbuild in parallel for cache misses.
+
+        Args:
+            files: File dictionaries with 'path' and 'content'
+
+        Returns:
+            (code, error) per file, in input order; exactly one of them is None
+        """
+        results: List[Optional[Tuple[Optional[str], Optional[str]]]] = []
+        misses = []
+        for index, file in enumerate(files):
+            key = self._cache_key(file["path"], file["content"])
+            cached = self._cache_get(key)
+            results.append(cached)
+            if cached is None:
+                misses.append((index, key, file))
+
+        running = []
+        for index, key, file in misses:
+            loader = LOADERS[Path(file["path"]).suffix]
+            try:
+                process = subprocess.Popen(
+                    [self.esbuild_path, f"--loader={loader}", f"--sourcefile={file['path']}", *ESBUILD_ARGS],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    encoding="utf-8"
+                )
+            except OSError as e:
+                results[index] = (None, f"esbuild failed to start: {e}")
+                continue
+            running.append((index, key, file, process))
+
+        for index, key, file, process in running:
+            try:
+                stdout, stderr = process.communicate(file["content"], timeout=self.transpile_timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                results[index] = (None, "Transpile timed out")
+                continue
+            if process.returncode != 0:
+                # Syntax errors are deterministic for the same content, so cache them too
+                result = (None, stderr.strip() or "Transpile failed")
+            else:
+                result = (stdout, None)
+            self._cache_put(key, result)
+            results[index] = result
+
+        return results
+
+    @staticmethod
+    def _cache_key(path: str, content: str) -> str:
+        loader = LOADERS[Path(path).suffix]
+        digest = hashlib.sha256()
+        for part in (loader, *ESBUILD_ARGS, content):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        if self.cache_dir is not None:
+            try:
+                code = (self.cache_dir / f"{key}.js").read_text(encoding="utf-8")
+            except OSError:
+                return None
+            self._remember(key, (code, None))
+            return code, None
+        return None
+
+    def _cache_put(self, key: str, result: Tuple[Optional[str], Optional[str]]) -> None:
+        self._remember(key, result)
+        code, error = result
+        if self.cache_dir is not None and error is None:
+            # Content-addressed: concurrent writers produce the same bytes
+            temp = self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+            temp.write_text(code, encoding="utf-8")
+            temp.replace(self.cache_dir / f"{key}.js")
+
+    def _remember(self, key: str, result: Tuple[Optional[str], Optional[str]]) -> None:
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _file_listing(files: List[Dict]) -> str:
+        """Offline fallback used when the preview toolchain is not installed."""
+        items = "".join(f"<li><code>{html.escape(file['path'])}</code></li>" for file in files)
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>UI Preview</title>
+<style>
+body {{ margin: 0; padding: 16px; font-family: system-ui, -apple-system, sans-serif; color: #3f3f46; }}
+code {{ font-size: 14px; }}
+</style>
+</head>
+<body>
+<p>Preview rendering is not available on this server. Generated files:</p>
+<ul>{items}</ul>
+</body>
+</html>
+"""
+
+
+# Singleton instance
+_preview_renderer = None
+
+
+def get_preview_renderer() -> PreviewRenderer:
+    """Get or create preview renderer singleton."""
+    global _preview_renderer
+    if _preview_renderer is None:
+        _preview_renderer = PreviewRenderer(
+            settings.preview_dir,
+            esbuild_path=settings.preview_esbuild_path,
+            cache_max_entries=settings.preview_cache_max_entries,
+            cache_dir=settings.preview_cache_dir,
+            transpile_timeout=settings.preview_transpile_timeout
+        )
+    return _preview_renderer
@@ -0,0 +1,147 @@
+"""Refinement: prompt formatting and merging of changes into an existing file set."""
+import os
+from typing import Dict, List, Tuple
+
+SEARCH_MARKER = "<<<<<<< SEARCH"
+DIVIDER = "======="
+REPLACE_MARKER = ">>>>>>> REPLACE"
+
+_LANGUAGES = {".tsx": "tsx", ".ts": "ts", ".jsx": "jsx", ".js": "js", ".css": "css", ".json": "json"}
+
+
+class RefineError(ValueError):
+    """Raised when a refinement response cannot be applied to the current files."""
+
+
+def format_refine_request(files: List[Dict], instruction: str) -> str:
+    """Build the user message for a refinement request.
+
+    Args:
+        files: Current file dictionaries with 'path' and 'content'
+        instruction: Requested change in natural language
+
+    Returns:
+        Message listing the current files in FILE blocks, then the change
+    """
+    parts = ["Current files:\n"]
+    for file in files:
+        language = _LANGUAGES.get(os.path.splitext(file["path"])[1], "")
+        parts.append(f"FILE: {file['path']}\n```{language}\n{file['content']}\n```\n")
+    parts.append(f"Apply this change: {instruction}")
+    return "\n".join(parts)
+
+
+def parse_hunks(block: str) -> List[Tuple[str, str]]:
+    """Split an EDIT block into search/replace pairs.
+
+    Args:
+        block: Content of one EDIT block
+
+    Returns:
+        List of (search, replace) text pairs
+
+    Raises:
+        RefineError: If a hunk is not terminated
+    """
+    hunks = []
+    search: List[str] = []
+    replace: List[str] = []
+    section = None
+    for line in block.split("\n"):
+        marker = line.strip()
+        if marker == SEARCH_MARKER:
+            search, replace = [], []
+            section = search
+        elif marker == DIVIDER and section is search:
+            section = replace
+        elif marker == REPLACE_MARKER and section is replace:
+            hunks.append(("\n".join(search), "\n".join(replace)))
+            section = None
+        elif section is not None:
+            section.append(line)
+
+    if section is not None:
+        raise RefineError("Unterminated search/replace hunk")
+    return hunks
+
+
+def apply_hunk(content: str, search: str, replace: str, path: str) -> str:
+    """Replace the first occurrence of ``search`` in ``content``.
+
+    If the exact text is not found, lines are matched again ignoring leading
+    and trailing whitespace, which tolerates re-indented search text.
+
+    Args:
+        content: Current file content
+        search: Text to find; empty appends ``replace`` to the file
+        replace: Replacement text
+        path: File path, for error messages
+
+    Returns:
+        Updated content
+
+    Raises:
+        RefineError: If the search text does not occur in the file
+    """
+    if not search.strip():
+        return f"{content.rstrip()}\n{replace}"
+
+    at = content.find(search)
+    if at >= 0:
+        return content[:at] + replace + content[at + len(search):]
+
+    lines = content.split("\n")
+    wanted = [line.strip() for line in search.strip("\n").split("\n")]
+    for start in range(len(lines) - len(wanted) + 1):
+        if all(lines[start + i].strip() == wanted[i] for i in range(len(wanted))):
+            return "\n".join(lines[:start] + replace.split("\n") + lines[start + len(wanted):])
+
+    raise RefineError(f"{path}: search text not found: {search.strip()[:80]!r}")
+
+
+def merge_changes(
+    files: List[Dict],
+    replaced: List[Dict],
+    edits: List[Dict],
+    deleted: List[str]
+) -> Tuple[List[Dict], List[str], List[str]]:
+    """Merge a refinement response into the current files.
+
+    Whole files are applied first, then edits in order, then deletions.
+    Files the response does not mention are kept unchanged and in place.
+
+    Args:
+        files: Current file dictionaries
+        replaced: FILE blocks from the response (new or rewritten files)
+        edits: EDIT blocks from the response
+        deleted: Paths from DELETE lines
+
+    Returns:
+        Tuple of (merged files, paths added or changed, paths deleted)
+
+    Raises:
+        RefineError: If an edit targets a missing file or does not apply
+    """
+    original = {file["path"]: file["content"] for file in files}
+    contents = dict(original)
+
+    for file in replaced:
+        contents[file["path"]] = file["content"]
+
+    for edit in edits:
+        path = edit["path"]
+        if path not in contents:
+            raise RefineError(f"{path}: edit targets a file that does not exist")
+        content = contents[path]
+        for search, replace in parse_hunks(edit["content"]):
+            content = apply_hunk(content, search, replace, path)
+        contents[path] = content
+
+    removed = []
+    for path in deleted:
+        if contents.pop(path, None) is not None and path in original:
+            removed.append(path)
+
+    changed = [path for path, content in contents.items() if original.get(path) != content]
+    merged = [{"path": path, "content": content} for path, content in contents.items()]
+    return merged, changed, removed
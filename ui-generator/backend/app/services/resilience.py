@@ -0,0 +1,362 @@
+"""Retry, circuit breaking, rate limiting and hedging for upstream model calls."""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Deque, List, Optional, TypeVar
+from anthropic import APIConnectionError, APIStatusError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upstream statuses worth retrying: rate limited, server errors and overloaded (529)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Error types the API can also report inside an otherwise successful stream
+RETRYABLE_ERROR_TYPES = {"rate_limit_error", "overloaded_error", "api_error"}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Upstream temporarily unavailable; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised when retries are exhausted on a retryable upstream error."""
+
+    def __init__(self, cause: Exception, retry_after: Optional[float]):
+        super().__init__(f"Upstream unavailable after retries: {cause}")
+        self.retry_after = retry_after
+
+
+def _error_type(exc: APIStatusError) -> Optional[str]:
+    body = exc.body if isinstance(exc.body, dict) else {}
+    error = body.get("error") if isinstance(body.get("error"), dict) else {}
+    return error.get("type")
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return whether an upstream error is transient and worth retrying."""
+    if isinstance(exc, APIConnectionError):
+        # Includes APITimeoutError
+        return True
+    if isinstance(exc, APIStatusError):
+        # Errors sent as SSE events arrive with the stream's 200 status
+        return exc.status_code in RETRYABLE_STATUS_CODES or _error_type(exc) in RETRYABLE_ERROR_TYPES
+    return False
+
+
+def error_reason(exc: BaseException) -> str:
+    """Return a short label for an upstream error: HTTP status, API error type or class name."""
+    if isinstance(exc, APIStatusError):
+        if exc.status_code >= 400:
+            return str(exc.status_code)
+        return _error_type(exc) or type(exc).__name__
+    return type(exc).__name__
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read the server's requested delay from a ``retry-after`` header.
+
+    Args:
+        exc: Upstream error
+
+    Returns:
+        Delay in seconds, or None if the error carries no usable header
+    """
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honouring ``retry-after``."""
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        """Initialize policy.
+
+        Args:
+            max_attempts: Total attempts including the first
+            base_delay: Backoff ceiling for the first retry, in seconds
+            max_delay: Upper bound on any single delay, in seconds
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Return the wait before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Delay requested by the server, if any
+
+        Returns:
+            Delay in seconds
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    The breaker opens after ``failure_threshold`` consecutive failures. While
+    open, calls are rejected immediately. After ``reset_timeout`` one probe
+    call is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """Initialize breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit (0 disables)
+            reset_timeout: Seconds to stay open before allowing a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        """Check the circuit before calling upstream.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe in flight
+        """
+        if self.failure_threshold <= 0 or self.state == self.CLOSED:
+            return
+        remaining = self._opened_at + self.reset_timeout - time.monotonic()
+        if self.state == self.OPEN and remaining <= 0:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        raise CircuitOpenError(max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            logger.info("Upstream circuit closed")
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.failure_threshold <= 0:
+            return
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Upstream circuit opened after %d failures", self._failures)
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Let another probe through if the current one ended without an upstream verdict."""
+        self._probe_in_flight = False
+
+
+class TokenBucket:
+    """Async token bucket sized to an upstream tokens-per-minute budget.
+
+    Requests reserve an estimate up front and settle the difference once
+    actual usage is known, so the bucket can briefly go into debt.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        """Initialize bucket, starting full.
+
+        Args:
+            tokens_per_minute: Refill rate; also the bucket capacity
+        """
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until ``tokens`` are available and take them.
+
+        Args:
+            tokens: Tokens to reserve (capped at the bucket capacity)
+
+        Returns:
+            Seconds spent waiting
+        """
+        tokens = min(float(tokens), self.capacity)
+        waited = 0.0
+        # The lock keeps waiters first-come, first-served
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(wait)
+                waited += wait
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Return over-reserved tokens, or charge tokens used beyond the reservation."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + min(float(reserved), self.capacity) - used)
+
+
+class LatencyTracker:
+    """Rolling window of latencies for computing quantiles."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the q-quantile of recent samples, or None if there are none."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def hedged(
+    start: Callable[[], Awaitable[T]],
+    delay: Optional[float],
+    discard: Callable[[T], Awaitable[None]],
+    on_hedge: Optional[Callable[[], None]] = None
+) -> T:
+    """Run ``start``, and a second copy if the first is still running after ``delay``.
+
+    The first attempt to succeed wins and the other is cancelled. If an
+    attempt succeeds after a winner was chosen, its result is passed to
+    ``discard`` so resources it holds are released.
+
+    Args:
+        start: Factory for one attempt
+        delay: Seconds before sending the hedge, or None to never hedge
+        discard: Releases the result of a losing attempt
+        on_hedge: Called when the hedge request is sent
+
+    Returns:
+        Result of the winning attempt
+
+    Raises:
+        Exception: The last attempt's error if every attempt fails
+    """
+    tasks: List["asyncio.Future[T]"] = [asyncio.ensure_future(start())]
+    winner: Optional["asyncio.Future[T]"] = None
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if on_hedge is not None:
+                    on_hedge()
+                tasks.append(asyncio.ensure_future(start()))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        losers = [task for task in tasks if task is not winner]
+        for task in losers:
+            task.cancel()
+        for result in await asyncio.gather(*losers, return_exceptions=True):
+            if not isinstance(result, BaseException):
+                await discard(result)
+
+
+async def call_with_retries(
+    attempt: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    on_retry: Optional[Callable[[BaseException], None]] = None
+) -> T:
+    """Run ``attempt``, retrying transient upstream errors.
+
+    Args:
+        attempt: Factory for one upstream call
+        policy: Backoff policy
+        breaker: Circuit breaker consulted before, and updated after, each attempt
+        on_retry: Called with the error before each retry
+
+    Returns:
+        Result of the first successful attempt
+
+    Raises:
+        CircuitOpenError: If the circuit is open
+        UpstreamUnavailableError: If every attempt failed with a retryable error
+        Exception: Non-retryable errors are raised unchanged
+    """
+    for attempt_number in range(1, policy.max_attempts + 1):
+        breaker.before_call()
+        try:
+            result = await attempt()
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                if isinstance(e, APIStatusError):
+                    # Upstream answered; the request itself was bad
+                    breaker.record_success()
+                else:
+                    # A local error says nothing about upstream health
+                    breaker.release_probe()
+                raise
+            breaker.record_failure()
+            retry_after = retry_after_seconds(e)
+            if attempt_number == policy.max_attempts:
+                raise UpstreamUnavailableError(e, retry_after) from e
+            delay = policy.delay(attempt_number, retry_after)
+            logger.warning(
+                "Upstream call failed (%s); retry %d in %.2fs",
+                e, attempt_number, delay
+            )
+            if on_retry is not None:
+                on_retry(e)
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
@@ -0,0 +1,260 @@
+"""Result cache for deterministic generations."""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    prompt: str,
+    page_type: Optional[str],
+    model: str,
+    max_tokens: int,
+    skill_hash: str
+) -> str:
+    """Build a cache key for a generation request.
+
+    Whitespace in the prompt is collapsed so trivially different submissions
+    of the same text share an entry.
+
+    Args:
+        prompt: User prompt
+        page_type: Optional page type hint
+        model: Claude model name
+        max_tokens: Output token budget
+        skill_hash: Content hash of the active skill set
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    normalized = " ".join(prompt.split())
+    payload = json.dumps(
+        [normalized, page_type, model, max_tokens, skill_hash],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _SqliteTier:
+    """Persistent cache tier so a warm cache survives restarts."""
+
+    def __init__(self, path: str, ttl: float):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            path: SQLite database file path
+            ttl: Seconds an entry stays valid
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: Dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now)
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _InFlight:
+    """A shared upstream call and the number of requests waiting on it."""
+
+    def __init__(self, task: "asyncio.Task[Dict]"):
+        self.task = task
+        self.waiters = 0
+
+
+class ResponseCache:
+    """Two-tier (in-process LRU, optional SQLite) cache of generation results.
+
+    Only successful results are stored. Concurrent requests for the same key
+    share a single in-flight call; that call is cancelled only once every
+    waiting request has gone away.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, db_path: Optional[str] = None):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            ttl: Seconds an entry stays valid
+            db_path: Optional SQLite path for the persistent tier
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._disk = _SqliteTier(db_path, ttl) if db_path else None
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Look up a cached result.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if time.monotonic() - stored_at < self.ttl:
+                self._memory.move_to_end(key)
+                return value
+            del self._memory[key]
+
+        if self._disk is not None:
+            try:
+                value = await asyncio.to_thread(self._disk.get, key)
+            except sqlite3.Error as e:
+                logger.warning("Response cache read failed: %s", e)
+                return None
+            if value is not None:
+                self._remember(key, value)
+                return value
+
+        return None
+
+    async def put(self, key: str, value: Dict) -> None:
+        """Store a successful result in every tier.
+
+        Args:
+            key: Cache key from make_cache_key
+            value: Result dictionary (must be JSON serializable)
+        """
+        self._remember(key, value)
+        if self._disk is not None:
+            try:
+                await asyncio.to_thread(self._disk.put, key, value)
+            except sqlite3.Error as e:
+                logger.warning("Response cache write failed: %s", e)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict]],
+        fallback_key: Optional[str] = None,
+        store_key: Optional[Callable[[Dict], str]] = None
+    ) -> Tuple[Dict, bool]:
+        """Return a cached result, or compute it once for all concurrent callers.
+
+        Args:
+            key: Cache key from make_cache_key; concurrent callers are merged on it
+            compute: Coroutine factory producing a result dictionary
+            fallback_key: Key also looked up when ``key`` misses
+            store_key: Returns the key a computed result is stored under, when
+                it may differ from ``key`` (e.g. the result came from another model)
+
+        Returns:
+            Tuple of (result, served_from_cache). Callers that joined another
+            request's in-flight call are reported as served from cache.
+        """
+        cached = await self.get(key)
+        if cached is None and fallback_key is not None:
+            cached = await self.get(fallback_key)
+        if cached is not None:
+            return cached, True
+
+        entry = self._inflight.get(key)
+        leader = entry is None
+        if entry is None:
+            entry = _InFlight(asyncio.ensure_future(self._compute_and_store(key, compute, store_key)))
+            self._inflight[key] = entry
+
+        entry.waiters += 1
+        try:
+            result = await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.task.done():
+                entry.task.cancel()
+
+        return result, not leader
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        self._memory.clear()
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        if self._disk is not None:
+            self._disk.close()
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict]],
+        store_key: Optional[Callable[[Dict], str]]
+    ) -> Dict:
+        try:
+            result = await compute()
+            if result.get("success"):
+                await self.put(store_key(result) if store_key else key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def _remember(self, key: str, value: Dict) -> None:
+        self._memory[key] = (time.monotonic(), value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+# Singleton instance
+_response_cache = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get or create the response cache singleton, or None if disabled."""
+    global _response_cache
+    if not settings.response_cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl=settings.response_cache_ttl,
+            db_path=settings.response_cache_path or None
+        )
+    return _response_cache
+
+
+def close_response_cache() -> None:
+    """Close the response cache singleton if it was created."""
+    global _response_cache
+    if _response_cache is not None:
+        _response_cache.close()
+        _response_cache = None
@@ -0,0 +1,123 @@
+"""Model routing: a model and output budget per request, with escalation on bad output."""
+import re
+from typing import Dict, Iterable, List, Optional
+
+FAST = "fast"
+MAIN = "main"
+
+# Reasons a generation from the fast model is retried on the main model
+NO_FILES = "no_files"
+TRUNCATED = "truncated"
+DESIGN_VIOLATIONS = "design_violations"
+
+
+class Route:
+    """Model and output token budget chosen for one request."""
+
+    def __init__(self, tier: str, model: str, max_tokens: int, reason: str):
+        self.tier = tier
+        self.model = model
+        self.max_tokens = max_tokens
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"Route({self.tier}, {self.model}, max_tokens={self.max_tokens}, reason={self.reason})"
+
+
+class ModelRouter:
+    """Routes simple pages to a fast model and everything else to the main model.
+
+    A request is simple when its page type is one of ``fast_page_types``,
+    the prompt is at most ``max_prompt_chars`` long and it mentions none of
+    ``complex_keywords``. The reason for every decision is kept on the
+    route so outcomes can be logged against it and the thresholds tuned.
+    """
+
+    def __init__(
+        self,
+        main_model: str,
+        main_max_tokens: int,
+        fast_model: str = "",
+        fast_max_tokens: int = 4000,
+        fast_page_types: Iterable[str] = (),
+        max_prompt_chars: int = 400,
+        complex_keywords: Iterable[str] = ()
+    ):
+        """Initialize router.
+
+        Args:
+            main_model: Model for complex requests and escalations
+            main_max_tokens: Output budget on the main model
+            fast_model: Model for simple requests; empty disables routing
+            fast_max_tokens: Output budget on the fast model
+            fast_page_types: Page types eligible for the fast model
+            max_prompt_chars: Longest prompt eligible for the fast model
+            complex_keywords: Words that send a prompt to the main model
+        """
+        self.main = Route(MAIN, main_model, main_max_tokens, "default")
+        self.fast_model = fast_model
+        self.fast_max_tokens = fast_max_tokens
+        self.fast_page_types = set(fast_page_types)
+        self.max_prompt_chars = max_prompt_chars
+        keywords = [keyword for keyword in complex_keywords if keyword]
+        self._keywords = (
+            re.compile(r"\b(" + "|".join(re.escape(keyword) for keyword in keywords) + r")", re.IGNORECASE)
+            if keywords else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.fast_model) and self.fast_model != self.main.model
+
+    def choose(self, user_prompt: str, page_type: Optional[str]) -> Route:
+        """Pick the model and output budget for a generation.
+
+        Args:
+            user_prompt: Natural language description of UI to generate
+            page_type: Optional page type hint
+
+        Returns:
+            Chosen route
+        """
+        if not self.enabled:
+            return self.main
+        if page_type not in self.fast_page_types:
+            return self._to_main(f"page_type:{page_type or 'none'}")
+        if len(user_prompt) > self.max_prompt_chars:
+            return self._to_main("long_prompt")
+        keyword = self._keywords.search(user_prompt) if self._keywords else None
+        if keyword:
+            return self._to_main(f"keyword:{keyword.group(1).lower()}")
+        return Route(FAST, self.fast_model, self.fast_max_tokens, "simple")
+
+    def escalation(self, failure: str) -> Route:
+        """Return the route that retries a failed fast-model generation."""
+        return self._to_main(f"escalated:{failure}")
+
+    def _to_main(self, reason: str) -> Route:
+        return Route(MAIN, self.main.model, self.main.max_tokens, reason)
+
+
+def check_output(
+    files: List[Dict],
+    stop_reason: Optional[str],
+    design_errors: Optional[List[Dict]] = None
+) -> Optional[str]:
+    """Return why a generation is not usable as is, or None if it is.
+
+    Args:
+        files: Files parsed from the response
+        stop_reason: Why the model stopped generating
+        design_errors: Design-system errors left after fixes, if validated
+
+    Returns:
+        NO_FILES, TRUNCATED, DESIGN_VIOLATIONS or None
+    """
+    if not files:
+        return NO_FILES
+    if stop_reason == "max_tokens":
+        # The last file was cut off mid-way
+        return TRUNCATED
+    if design_errors:
+        return DESIGN_VIOLATIONS
+    return None
@@ -0,0 +1,155 @@
+"""Indexed section tree of the skill markdown files, for page-type-specific prompts."""
+import re
+from typing import Iterator, List, Optional, Set
+
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*$")
+FENCE = "```"
+
+# "## 3. Form Page Template" -> "form"
+TEMPLATE_TITLE = re.compile(r"^(?:\d+\.\s*)?(\w+) Page Template$", re.IGNORECASE)
+COMMON_IMPORT = re.compile(r"import\s*\{([^}]*)\}\s*from\s*['\"]@/components/common")
+JSX_COMPONENT = re.compile(r"<([A-Z]\w*)")
+
+
+class Section:
+    """A markdown heading, the lines up to its first subsection, and its subsections.
+
+    The root section (level 0) holds the text before the first heading.
+    Rendering a tree reproduces the original document exactly.
+    """
+
+    def __init__(self, title: str, level: int):
+        self.title = title
+        self.level = level
+        self.lines: List[str] = []
+        self.children: List["Section"] = []
+
+    def render(self) -> str:
+        """Return the section's markdown, subsections included."""
+        return "\n".join(self.lines + [child.render() for child in self.children])
+
+    def walk(self) -> Iterator["Section"]:
+        """Yield this section and all nested sections, in document order."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def parse_sections(markdown: str) -> Section:
+    """Parse markdown into a section tree.
+
+    Lines starting with '#' inside fenced code blocks are not headings.
+
+    Args:
+        markdown: Document text
+
+    Returns:
+        Root section of the document
+    """
+    root = Section("", 0)
+    stack = [root]
+    in_fence = False
+    for line in markdown.split("\n"):
+        if line.lstrip().startswith(FENCE):
+            in_fence = not in_fence
+        heading = None if in_fence else HEADING.match(line)
+        if heading:
+            section = Section(heading.group(2), len(heading.group(1)))
+            while stack[-1].level >= section.level:
+                stack.pop()
+            stack[-1].children.append(section)
+            stack.append(section)
+        stack[-1].lines.append(line)
+    return root
+
+
+def _filtered(root: Section, keep) -> str:
+    """Render a document, dropping the top-level subsections ``keep`` rejects.
+
+    Top-level subsections are the children of the document's title heading
+    (or of the root if there is none).
+    """
+    parent = root.children[0] if len(root.children) == 1 else root
+    dropped = [child for child in parent.children if not keep(child)]
+    if not dropped:
+        return root.render()
+    original = parent.children
+    parent.children = [child for child in original if child not in dropped]
+    try:
+        return root.render()
+    finally:
+        parent.children = original
+
+
+def template_type(section: Section) -> Optional[str]:
+    """Return the page type a template section describes, or None."""
+    match = TEMPLATE_TITLE.match(section.title)
+    return match.group(1).lower() if match else None
+
+
+def component_name(section: Section) -> Optional[str]:
+    """Return the component a component library section documents, or None.
+
+    A section documents a component when its title is the name of a
+    component it imports from @/components/common.
+    """
+    text = section.render()
+    for match in COMMON_IMPORT.finditer(text):
+        names = {name.strip() for name in match.group(1).split(",")}
+        if section.title in names:
+            return section.title
+    return None
+
+
+class SkillIndex:
+    """Page templates and component library, indexed for per-page-type selection.
+
+    Built once per skill set. For a known page type only that type's
+    template is kept, along with the general guidance around the templates,
+    and the component library is reduced to the components that template
+    uses. Unknown or missing page types get the documents in full.
+    """
+
+    def __init__(self, page_templates: Optional[str], component_library: Optional[str]):
+        """Parse the skill documents.
+
+        Args:
+            page_templates: Content of page-templates.md, or None if missing
+            component_library: Content of component-library.md, or None if missing
+        """
+        self._templates = parse_sections(page_templates) if page_templates else None
+        self._components = parse_sections(component_library) if component_library else None
+        self.page_types: Set[str] = {
+            page_type for page_type in (
+                template_type(section) for section in (self._templates.walk() if self._templates else ())
+            ) if page_type
+        }
+
+    def page_templates(self, page_type: Optional[str]) -> Optional[str]:
+        """Return page-templates.md with only the template for ``page_type``."""
+        if self._templates is None:
+            return None
+        if page_type not in self.page_types:
+            return self._templates.render()
+        return _filtered(self._templates, lambda section: template_type(section) in (None, page_type))
+
+    def component_library(self, page_type: Optional[str]) -> Optional[str]:
+        """Return component-library.md with only the components ``page_type``'s template uses.
+
+        Sections that do not document a single component (import rules,
+        guidance on adding components) are always kept.
+        """
+        if self._components is None:
+            return None
+        if page_type not in self.page_types:
+            return self._components.render()
+        used = self.template_components(page_type)
+        return _filtered(self._components, lambda section: component_name(section) in (None, *used))
+
+    def template_components(self, page_type: str) -> Set[str]:
+        """Return the component names used in the JSX of ``page_type``'s template."""
+        used: Set[str] = set()
+        for section in self._templates.walk() if self._templates else ():
+            if template_type(section) == page_type:
+                used.update(JSX_COMPONENT.findall(section.render()))
+        return used
@@ -1,17 +1,44 @@
 """Load and format frontend-ui-ux-publishing skill instructions for Claude API."""
-import os
+import hashlib
+import logging
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+from app.services.skill_index import SkillIndex
+
+logger = logging.getLogger(__name__)
+
+# Skill files in prompt order, with the section heading each is placed under
+SKILL_FILES: List[Tuple[str, str]] = [
+    ("design-system.md", "Design System"),
+    ("consistency-rules.md", "Consistency Rules"),
+    ("page-templates.md", "Page Templates"),
+    ("component-library.md", "Component Library"),
+]
+
+# Rough characters per token, for reporting prompt sizes
+CHARS_PER_TOKEN = 4
 
 
 class SkillLoader:
-    """Loads skill instructions from files."""
+    """Loads skill instructions from files.
 
-    def __init__(self, skill_data_dir: Optional[str] = None):
+    For a known page type the prompt carries only that page type's template
+    and the components it uses; design system and consistency rules are
+    always included in full. Compiled prompts are cached per page type.
+    Skill files are stat-ed at most once per check interval and the cache is
+    dropped when any file's mtime or size changes, so edits to a mounted
+    skill-data volume take effect without a restart.
+    """
+
+    def __init__(self, skill_data_dir: Optional[str] = None, check_interval: float = 1.0):
         """Initialize skill loader.
 
         Args:
             skill_data_dir: Path to skill data directory. If None, uses default location.
+            check_interval: Minimum seconds between file change checks
         """
         if skill_data_dir is None:
             # Default to backend/skill-data relative to this file
@@ -20,6 +47,38 @@ class SkillLoader:
 
         self.skill_data_dir = Path(skill_data_dir)
 
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._signature: Optional[Tuple] = None
+        self._contents: Dict[str, Optional[str]] = {}
+        self._content_hash = ""
+        self._index = SkillIndex(None, None)
+        self._prompt_cache: Dict[Optional[str], Tuple[str, str]] = {}
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the skill files and built-in prompts, for keying downstream caches."""
+        self._ensure_fresh()
+        return self._content_hash
+
+    def skill_file(self, filename: str) -> Optional[str]:
+        """Return the current content of a skill file, or None if it is missing."""
+        self._ensure_fresh()
+        return self._contents.get(filename)
+
+    def reload(self) -> str:
+        """Force skill files to be re-read on the next lookup.
+
+        Returns:
+            Content hash of the reloaded skill set
+        """
+        with self._lock:
+            self._signature = None
+            self._checked_at = 0.0
+        return self.content_hash
+
     def load_skill_instructions(self, page_type: Optional[str] = None) -> str:
         """Load complete skill instructions as a formatted system prompt.
 
@@ -29,45 +88,154 @@ class SkillLoader:
         Returns:
             Formatted system prompt with skill instructions
         """
+        static_prompt, tail = self.load_skill_sections(page_type)
+        return f"{static_prompt}\n{tail}"
+
+    def load_skill_sections(self, page_type: Optional[str] = None) -> Tuple[str, str]:
+        """Load the system prompt split into a static head and a per-request tail.
+
+        The head (base instructions and skill files) is identical for every
+        request with the same skill set and page type, which makes it
+        suitable for prompt caching. The tail carries page type guidance and
+        output format.
+
+        Args:
+            page_type: Optional page type hint (form, list, detail, dashboard)
+
+        Returns:
+            Tuple of (static prompt, page-type tail)
+        """
+        self._ensure_fresh()
+
+        with self._lock:
+            signature = self._signature
+            sections = self._prompt_cache.get(page_type)
+        if sections is None:
+            sections = self._build_prompt(page_type)
+            with self._lock:
+                # A reload may have swapped the skill set while building
+                if self._signature == signature:
+                    self._prompt_cache[page_type] = sections
+        return sections
+
+    def load_refine_sections(self, page_type: Optional[str] = None) -> Tuple[str, str]:
+        """Load the system prompt for refining existing files.
+
+        The static head is the same as for generating ``page_type``, so it
+        shares the prompt cache entry; the tail asks for changes only.
+
+        Args:
+            page_type: Page type of the files being refined
+
+        Returns:
+            Tuple of (static prompt, refine tail)
+        """
+        static_prompt, _ = self.load_skill_sections(page_type)
+        return static_prompt, self._get_refine_format_instructions()
+
+    def _build_prompt(self, page_type: Optional[str]) -> Tuple[str, str]:
+        """Assemble the system prompt from the loaded skill files.
+
+        Args:
+            page_type: Optional page type hint
+
+        Returns:
+            Tuple of (static prompt, page-type tail)
+        """
         instructions = []
 
         # Base instructions
         instructions.append(self._load_base_instructions())
 
-        # Design system rules
-        design_system = self._load_file("design-system.md")
-        if design_system:
-            instructions.append("\n## Design System\n")
-            instructions.append(design_system)
-
-        # Consistency rules
-        consistency = self._load_file("consistency-rules.md")
-        if consistency:
-            instructions.append("\n## Consistency Rules\n")
-            instructions.append(consistency)
-
-        # Page templates
-        templates = self._load_file("page-templates.md")
-        if templates:
-            instructions.append("\n## Page Templates\n")
-            instructions.append(templates)
-
-        # Component library
-        components = self._load_file("component-library.md")
-        if components:
-            instructions.append("\n## Component Library\n")
-            instructions.append(components)
+        # Design system, consistency rules, page templates, component library
+        for filename, heading in SKILL_FILES:
+            content = self._skill_content(filename, page_type)
+            if content:
+                instructions.append(f"\n## {heading}\n")
+                instructions.append(content)
+
+        tail = []
 
         # Page type specific guidance
         if page_type:
-            instructions.append(f"\n## Page Type Guidance\n")
-            instructions.append(f"Generate a {page_type.upper()} page type specifically. ")
-            instructions.append(f"Follow the {page_type} page template from the templates section above.")
+            tail.append(f"\n## Page Type Guidance\n")
+            tail.append(f"Generate a {page_type.upper()} page type specifically. ")
+            tail.append(f"Follow the {page_type} page template from the templates section above.")
 
         # Output format instructions
-        instructions.append(self._get_output_format_instructions())
+        tail.append(self._get_output_format_instructions())
+
+        return "\n".join(instructions), "\n".join(tail)
 
-        return "\n".join(instructions)
+    def _skill_content(self, filename: str, page_type: Optional[str]) -> Optional[str]:
+        """Return a skill file's content, reduced to what ``page_type`` needs."""
+        if filename == "page-templates.md":
+            return self._index.page_templates(page_type)
+        if filename == "component-library.md":
+            return self._index.component_library(page_type)
+        return self._contents.get(filename)
+
+    def prompt_savings(self) -> Dict[str, Dict[str, int]]:
+        """Estimate the system prompt size of each page type against the full prompt.
+
+        Returns:
+            Mapping of page type to estimated 'tokens', 'full_tokens' and
+            'saved_tokens'
+        """
+        full = len(self.load_skill_instructions(None)) // CHARS_PER_TOKEN
+        savings = {}
+        for page_type in sorted(self._index.page_types):
+            tokens = len(self.load_skill_instructions(page_type)) // CHARS_PER_TOKEN
+            savings[page_type] = {"tokens": tokens, "full_tokens": full, "saved_tokens": full - tokens}
+        return savings
+
+    def _ensure_fresh(self) -> None:
+        """Reload skill files and drop cached prompts if any file changed."""
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            if signature == self._signature:
+                return
+
+            contents = {filename: self._load_file(filename) for filename, _ in SKILL_FILES}
+            digest = hashlib.sha256()
+            for prompt in (
+                self._load_base_instructions(),
+                self._get_output_format_instructions(),
+                self._get_refine_format_instructions(),
+            ):
+                digest.update(prompt.encode("utf-8"))
+                digest.update(b"\0")
+            for filename, _ in SKILL_FILES:
+                digest.update(filename.encode("utf-8"))
+                digest.update(b"\0")
+                digest.update((contents[filename] or "").encode("utf-8"))
+                digest.update(b"\0")
+
+            self._contents = contents
+            self._index = SkillIndex(contents["page-templates.md"], contents["component-library.md"])
+            self._content_hash = digest.hexdigest()
+            self._prompt_cache = {}
+            self._signature = signature
+            logger.info("Loaded skill set %s from %s", self._content_hash[:12], self.skill_data_dir)
+
+    def _file_signature(self) -> Tuple:
+        """Cheap change detector built from each skill file's mtime and size."""
+        signature = []
+        for filename, _ in SKILL_FILES:
+            try:
+                stat = (self.skill_data_dir / filename).stat()
+                signature.append((filename, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((filename, None, None))
+        return tuple(signature)
 
     def _load_base_instructions(self) -> str:
         """Load base skill instructions."""
@@ -120,6 +288,44 @@ FILE: src/components/ComponentName.tsx
 - Use semantic color tokens: text-primary, text-muted, bg-background, bg-muted, border-border
 - Import components from @/components/common/, not @/components/ui/
 - Include proper TypeScript types for props and state
+"""
+
+    def _get_refine_format_instructions(self) -> str:
+        """Get output format instructions for refinement requests."""
+        return """
+
+## Refinement Output Format
+
+You are changing files you generated earlier. The current files follow in
+the user message. Output ONLY what changes; files you do not mention are kept
+as they are.
+
+To change part of a file, use an EDIT block with one or more search/replace
+hunks. SEARCH must copy the current lines exactly, including indentation, and
+match only one place in the file:
+
+EDIT: src/pages/PageName.tsx
+```
+<<<<<<< SEARCH
+        <Button variant="secondary">Save</Button>
+=======
+        <Button variant="primary">Save</Button>
+>>>>>>> REPLACE
+```
+
+To add a file, or to rewrite most of one, output the whole file:
+
+FILE: src/components/ComponentName.tsx
+```tsx
+// Complete file content
+```
+
+To remove a file, write a line: DELETE: src/components/Unused.tsx
+
+**Important Requirements:**
+- Prefer small EDIT hunks over whole files
+- Never repeat unchanged files
+- Keep following the design system rules above
 """
 
     def _load_file(self, filename: str) -> Optional[str]:
@@ -134,14 +340,14 @@ FILE: src/components/ComponentName.tsx
         file_path = self.skill_data_dir / filename
 
         if not file_path.exists():
-            print(f"Warning: Skill file not found: {file_path}")
+            logger.warning("Skill file not found: %s", file_path)
             return None
 
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 return f.read()
         except Exception as e:
-            print(f"Error loading skill file {filename}: {e}")
+            logger.error("Error loading skill file %s: %s", filename, e)
             return None
 
 
@@ -0,0 +1,297 @@
+"""Design-system validation of generated files, with fixes for mechanical violations."""
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.services.skill_loader import get_skill_loader
+
+ERROR = "error"
+WARNING = "warning"
+
+# Tailwind palette colors; the design system allows semantic tokens only
+PALETTE = (
+    "slate", "gray", "zinc", "neutral", "stone", "red", "orange", "amber", "yellow", "lime",
+    "green", "emerald", "teal", "cyan", "sky", "blue", "indigo", "violet", "purple",
+    "fuchsia", "pink", "rose",
+)
+GRAYS = {"slate", "gray", "zinc", "neutral", "stone"}
+SPACING_UTILITIES = (
+    "space-x", "space-y", "gap-x", "gap-y", "gap",
+    "px", "py", "pt", "pr", "pb", "pl", "ps", "pe", "p",
+    "mx", "my", "mt", "mr", "mb", "ml", "ms", "me", "m",
+)
+COLOR_UTILITIES = ("text", "bg", "border", "ring", "divide", "outline", "fill", "stroke", "from", "via", "to")
+TEXT_SIZES = ("xs", "sm", "base", "lg", "xl", "2xl", "3xl", "4xl", "5xl", "6xl", "7xl", "8xl", "9xl")
+
+# Start of a class name, an import or a tag: not preceded by a word character
+# or hyphen. The lookahead lets the scan skip every other position cheaply.
+_TOKEN_START = r"(?<![\w\-])(?=[-a-z<])"
+_CLASS_END = r"(?![\w\-\[])"
+
+
+def _derive_spacing(design_system: str) -> Dict[int, int]:
+    """Return the spacing scale as {tailwind step: px} from the --space-N tokens."""
+    return {int(step): int(px) for step, px in re.findall(r"--space-(\d+):\s*(\d+)px", design_system)}
+
+
+def _derive_text_sizes(design_system: str) -> Dict[str, int]:
+    """Return the allowed text size classes with their px size from the typography tokens."""
+    return {
+        size: int(px)
+        for size, px in re.findall(r"--text-[\w-]+:[^\n]*?/\*\s*text-(\w+),\s*(\d+)px", design_system)
+    }
+
+
+def _derive_common_components(consistency_rules: str) -> Set[str]:
+    """Return the mandatory common components listed in the consistency rules."""
+    section = re.search(r"## Common Components[^\n]*\n(.*?)(?=\n## |\Z)", consistency_rules, re.DOTALL)
+    return set(re.findall(r"^- `(\w+)`", section.group(1), re.MULTILINE)) if section else set()
+
+
+def _derive_raw_elements(consistency_rules: str) -> Set[str]:
+    """Return the DOM elements pages must not use directly."""
+    line = re.search(r"^.*Direct DOM elements.*$", consistency_rules, re.MULTILINE)
+    return set(re.findall(r"`<(\w+)>`", line.group(0))) if line else set()
+
+
+def _derive_import_paths(consistency_rules: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (forbidden, required) component import paths from the import rules."""
+    forbidden = re.search(r"from '(@/components/\w+)/", consistency_rules)
+    required = re.search(r"✅ Correct:?\s*```\w*\s*import[^\n]*from '(@/components/\w+)'", consistency_rules)
+    return (forbidden.group(1) if forbidden else None, required.group(1) if required else None)
+
+
+class DesignValidator:
+    """Rules compiled from design-system.md and consistency-rules.md.
+
+    All rules are alternatives of a single regular expression, so a file is
+    checked in one scan. Violations with an exact equivalent (an arbitrary
+    value equal to a token, gray and status palette colors with a semantic
+    equivalent, ui/ imports of common components) can be fixed in the same
+    pass. Off-scale spacing has no equivalent on the scale and is only
+    reported.
+    """
+
+    def __init__(self, design_system: Optional[str], consistency_rules: Optional[str]):
+        """Compile the rules.
+
+        Args:
+            design_system: Content of design-system.md, or None if missing
+            consistency_rules: Content of consistency-rules.md, or None if missing
+        """
+        design_system = design_system or ""
+        consistency_rules = consistency_rules or ""
+        self.spacing = _derive_spacing(design_system)
+        self.text_sizes = _derive_text_sizes(design_system)
+        self.common_components = _derive_common_components(consistency_rules)
+        self.raw_elements = _derive_raw_elements(consistency_rules)
+        self.forbidden_import, self.common_import = _derive_import_paths(consistency_rules)
+        self._text_by_px = {px: size for size, px in self.text_sizes.items()}
+
+        patterns = []
+        if self.spacing:
+            utilities = "|".join(SPACING_UTILITIES)
+            patterns.append(
+                rf"(?P<spacing>(?P<sp_neg>-?)(?P<sp_utility>{utilities})-(?P<sp_step>\d+(?:\.\d+)?){_CLASS_END})"
+            )
+        patterns.append(
+            rf"(?P<color>(?P<co_utility>{'|'.join(COLOR_UTILITIES)})-(?P<co_hue>{'|'.join(PALETTE)})"
+            rf"-(?P<co_shade>\d{{2,3}})(?:/\d+)?{_CLASS_END})"
+        )
+        if self.text_sizes:
+            patterns.append(rf"(?P<text_size>text-(?P<ts_size>{'|'.join(TEXT_SIZES)}){_CLASS_END})")
+        if self.forbidden_import:
+            patterns.append(
+                rf"(?P<ui_import>import\s*\{{(?P<ui_names>[^}}]*)\}}\s*from\s*(?P<ui_quote>['\"])"
+                rf"{re.escape(self.forbidden_import)}(?:/[^'\"]*)?['\"])"
+            )
+        if self.raw_elements:
+            patterns.append(rf"(?P<raw_element><(?P<raw_tag>{'|'.join(sorted(self.raw_elements))})(?=[\s>/]))")
+        # Arbitrary values: w-[350px], text-[18px], bg-[#8b5cf6], md:p-[10px].
+        # Last, and possessive, because it is tried on nearly every word.
+        patterns.append(
+            r"(?P<arbitrary>-?(?P<arb_utility>[a-z]++(?:-[a-z]++)*+)-\[(?P<arb_value>[^\]\s'\"`]++)\])"
+        )
+        self._pattern = re.compile(_TOKEN_START + "(?:" + "|".join(patterns) + ")")
+        self._handlers = {
+            "arbitrary": self._check_arbitrary,
+            "spacing": self._check_spacing,
+            "color": self._check_color,
+            "text_size": self._check_text_size,
+            "ui_import": self._check_ui_import,
+            "raw_element": self._check_raw_element,
+        }
+
+    def check(self, path: str, content: str, fix: bool = False) -> Tuple[str, List[Dict]]:
+        """Check one file.
+
+        Args:
+            path: File path; raw element rules apply to pages only
+            content: File content
+            fix: Whether to rewrite fixable violations
+
+        Returns:
+            Tuple of (content, with fixes applied if requested, list of
+            violations with 'path', 'line', 'rule', 'severity', 'message'
+            and 'fixed')
+        """
+        is_page = "/pages/" in f"/{path}"
+        violations: List[Dict] = []
+        pieces: List[str] = []
+        copied = 0
+        line = 1
+        counted = 0
+
+        for match in self._pattern.finditer(content):
+            result = self._handlers[match.lastgroup](match, is_page)
+            if result is None:
+                continue
+            rule, severity, message, replacement = result
+
+            line += content.count("\n", counted, match.start())
+            counted = match.start()
+            fixed = fix and replacement is not None
+            if fixed:
+                pieces.append(content[copied:match.start()])
+                pieces.append(replacement)
+                copied = match.end()
+            violations.append({
+                "path": path, "line": line, "rule": rule, "severity": severity,
+                "message": message, "fixed": fixed,
+            })
+
+        if pieces:
+            pieces.append(content[copied:])
+            content = "".join(pieces)
+        return content, violations
+
+    def _check_arbitrary(self, match: re.Match, is_page: bool):
+        utility, value = match.group("arb_utility"), match.group("arb_value")
+        text = match.group("arbitrary")
+        replacement = None
+        px = _pixels(value)
+        if px is not None:
+            negative = text.startswith("-")
+            if utility in SPACING_UTILITIES and px % 4 == 0 and px // 4 in self.spacing:
+                replacement = f"{'-' if negative else ''}{utility}-{px // 4}"
+            elif utility == "text" and px in self._text_by_px:
+                replacement = f"text-{self._text_by_px[px]}"
+        return "arbitrary-value", ERROR, f"Arbitrary value '{text}'; use a design token class", replacement
+
+    def _check_spacing(self, match: re.Match, is_page: bool):
+        step = float(match.group("sp_step"))
+        if step == 0 or step in self.spacing:
+            return None
+        # Any step on the scale would change the layout, so there is no fix
+        return "spacing-scale", ERROR, f"'{match.group('spacing')}' is off the 8px spacing scale", None
+
+    def _check_color(self, match: re.Match, is_page: bool):
+        utility, hue, shade = match.group("co_utility"), match.group("co_hue"), int(match.group("co_shade"))
+        text = match.group("color")
+        token = _semantic_color(utility, hue, shade)
+        replacement = f"{utility}-{token}" if token else None
+        return "palette-color", ERROR, f"Palette color '{text}'; use a semantic color token", replacement
+
+    def _check_text_size(self, match: re.Match, is_page: bool):
+        if match.group("ts_size") in self.text_sizes:
+            return None
+        allowed = ", ".join(f"text-{size}" for size in self.text_sizes)
+        return "text-size", WARNING, f"'{match.group('text_size')}' is not a typography token ({allowed})", None
+
+    def _check_ui_import(self, match: re.Match, is_page: bool):
+        names = {name.strip().split(" as ")[0].strip() for name in match.group("ui_names").split(",") if name.strip()}
+        replacement = None
+        if self.common_import and names <= self.common_components:
+            quote = match.group("ui_quote")
+            replacement = f"import {{{match.group('ui_names')}}} from {quote}{self.common_import}{quote}"
+        message = f"Import from {self.forbidden_import}/; use {self.common_import or 'common components'}"
+        return "ui-import", ERROR, message, replacement
+
+    def _check_raw_element(self, match: re.Match, is_page: bool):
+        if not is_page:
+            return None
+        tag = match.group("raw_tag")
+        return "raw-element", WARNING, f"Direct <{tag}> in a page; use the common component", None
+
+
+def _pixels(value: str) -> Optional[int]:
+    """Return a CSS length in whole px (px or rem at 16px), or None."""
+    number = re.fullmatch(r"(\d+(?:\.\d+)?)(px|rem)", value)
+    if not number:
+        return None
+    px = float(number.group(1)) * (16 if number.group(2) == "rem" else 1)
+    return int(px) if px.is_integer() else None
+
+
+def _semantic_color(utility: str, hue: str, shade: int) -> Optional[str]:
+    """Return the semantic token with the same role as a palette color, if unambiguous."""
+    if hue in GRAYS:
+        if utility in ("border", "divide"):
+            return "border"
+        if utility == "text":
+            return "foreground" if shade >= 700 else "muted-foreground" if shade >= 400 else None
+        if utility == "bg" and shade <= 200:
+            return "muted"
+        return None
+    if utility in ("text", "border"):
+        return {"red": "destructive", "green": "success", "yellow": "warning", "amber": "warning"}.get(hue)
+    return None
+
+
+class ValidationReport:
+    """Violations found in a file set, and the files with any fixes applied."""
+
+    def __init__(self, files: List[Dict], violations: List[Dict]):
+        self.files = files
+        self.violations = violations
+
+    @property
+    def errors(self) -> List[Dict]:
+        """Error-severity violations that were not fixed."""
+        return [v for v in self.violations if v["severity"] == ERROR and not v["fixed"]]
+
+
+def validate_files(files: List[Dict], fix: bool = False) -> ValidationReport:
+    """Check generated files against the active skill set's design rules.
+
+    Args:
+        files: File dictionaries with 'path' and 'content'
+        fix: Whether to rewrite fixable violations
+
+    Returns:
+        Report whose files are the input list itself when nothing was changed
+    """
+    validator = get_design_validator()
+    checked = []
+    violations = []
+    changed = False
+    for file in files:
+        content, found = validator.check(file["path"], file["content"], fix)
+        violations.extend(found)
+        if content is not file["content"]:
+            changed = True
+            file = {**file, "content": content}
+        checked.append(file)
+    return ValidationReport(checked if changed else files, violations)
+
+
+# Compiled validator, rebuilt when the skill set changes
+_validator: Optional[DesignValidator] = None
+_validator_hash = ""
+_validator_lock = threading.Lock()
+
+
+def get_design_validator() -> DesignValidator:
+    """Get the validator for the active skill set, compiling it if needed."""
+    global _validator, _validator_hash
+    skill_loader = get_skill_loader()
+    content_hash = skill_loader.content_hash
+    if _validator is None or content_hash != _validator_hash:
+        with _validator_lock:
+            if _validator is None or content_hash != _validator_hash:
+                _validator = DesignValidator(
+                    skill_loader.skill_file("design-system.md"),
+                    skill_loader.skill_file("consistency-rules.md"),
+                )
+                _validator_hash = content_hash
+    return _validator
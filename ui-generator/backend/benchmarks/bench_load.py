@@ -0,0 +1,328 @@
+"""Load test of the backend against a local fake model.
+
+Starts benchmarks.fake_anthropic and the API server (``python -m app.server``)
+as subprocesses, then drives /api/generate with a closed loop of clients at
+each concurrency level. For every level it reports throughput, latency
+percentiles, backend overhead (latency minus the time the fake model takes to
+send its response), event loop lag from the server's own metrics, and
+resident memory of the server processes.
+
+The response cache is disabled and every prompt is distinct, so each request
+runs the full pipeline.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_load [--concurrency 1,4,16,64] [--requests 200]
+        [--ttft 0.3] [--tokens-per-second 400] [--workers 1] [--json] [--output FILE]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_anthropic import FIXTURES, expected_seconds
+
+BACKEND_DIR = Path(__file__).parent.parent
+MEMORY_SAMPLE_INTERVAL = 0.05
+LAG_METRIC = "uigen_event_loop_lag_seconds"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-quantile (0-1) of values by nearest rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _process_tree(pid: int) -> List[int]:
+    """Return pid and all its descendants (Linux /proc)."""
+    pids = [pid]
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children = (task / "children").read_text().split()
+        except OSError:
+            continue
+        for child in children:
+            pids.extend(_process_tree(int(child)))
+    return pids
+
+
+def _rss_bytes(pid: int) -> int:
+    """Return the resident memory of a process tree in bytes, or 0 if unavailable."""
+    total = 0
+    for member in _process_tree(pid):
+        try:
+            for line in Path(f"/proc/{member}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+def _lag_histogram(metrics_text: str) -> Tuple[Dict[float, float], float, float]:
+    """Extract cumulative buckets, sum and count of the event loop lag histogram."""
+    buckets: Dict[float, float] = {}
+    total = count = 0.0
+    for line in metrics_text.splitlines():
+        if not line.startswith(LAG_METRIC):
+            continue
+        name, value = line.rsplit(" ", 1)
+        if name.startswith(f"{LAG_METRIC}_bucket"):
+            le = re.search(r'le="([^"]+)"', name).group(1)
+            buckets[float(le)] = buckets.get(float(le), 0.0) + float(value)
+        elif name.startswith(f"{LAG_METRIC}_sum"):
+            total += float(value)
+        elif name.startswith(f"{LAG_METRIC}_count"):
+            count += float(value)
+    return buckets, total, count
+
+
+def _lag_summary(before: str, after: str) -> Dict[str, Optional[float]]:
+    """Summarize event loop lag samples taken between two metrics scrapes."""
+    buckets_before, sum_before, count_before = _lag_histogram(before)
+    buckets_after, sum_after, count_after = _lag_histogram(after)
+    count = count_after - count_before
+    if count <= 0:
+        return {"samples": 0, "mean_ms": None, "p99_le_ms": None}
+
+    # Smallest bucket bound holding 99% of this level's samples
+    p99 = None
+    for bound in sorted(buckets_after):
+        if buckets_after[bound] - buckets_before.get(bound, 0.0) >= 0.99 * count:
+            p99 = bound
+            break
+    return {
+        "samples": int(count),
+        "mean_ms": round((sum_after - sum_before) / count * 1000, 2),
+        "p99_le_ms": None if p99 in (None, float("inf")) else round(p99 * 1000, 2),
+    }
+
+
+async def _wait_ready(client: httpx.AsyncClient, url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode}")
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+async def _sample_memory(pid: int, peak: List[int], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], _rss_bytes(pid))
+        try:
+            await asyncio.wait_for(stop.wait(), MEMORY_SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    server_pid: int,
+    concurrency: int,
+    requests: int,
+    args: argparse.Namespace,
+    level: int
+) -> Dict:
+    """Send ``requests`` generations with ``concurrency`` clients in a closed loop."""
+    fixtures = list(FIXTURES)
+    latencies: List[float] = []
+    overheads: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            fixture = fixtures[index % len(fixtures)]
+            payload = {"prompt": f"Benchmark page {level}-{index} [fixture:{fixture}]", "page_type": "dashboard"}
+            started = time.perf_counter()
+            try:
+                response = await client.post("/api/generate", json=payload)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            elapsed = time.perf_counter() - started
+            if not ok:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            overheads.append(elapsed - expected_seconds(fixture, args.ttft, args.tokens_per_second))
+
+    metrics_before = (await client.get("/metrics")).text
+    baseline_rss = _rss_bytes(server_pid)
+    peak = [baseline_rss]
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_memory(server_pid, peak, stop))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    stop.set()
+    await sampler
+    metrics_after = (await client.get("/metrics")).text
+
+    def ms(value: float) -> float:
+        return round(value * 1000, 1)
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "requests_per_s": round(len(latencies) / duration, 2),
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 0.50)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(max(latencies, default=0.0)),
+        },
+        "overhead_ms": {
+            "p50": ms(percentile(overheads, 0.50)),
+            "p95": ms(percentile(overheads, 0.95)),
+            "p99": ms(percentile(overheads, 0.99)),
+        },
+        "event_loop_lag": _lag_summary(metrics_before, metrics_after),
+        "memory": {
+            "baseline_rss_mb": round(baseline_rss / 2 ** 20, 1),
+            "peak_rss_mb": round(peak[0] / 2 ** 20, 1),
+            "per_in_flight_request_kb": round((peak[0] - baseline_rss) / concurrency / 1024, 1),
+        },
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Start the fake model and the server, and run every concurrency level."""
+    fake_port, api_port = _free_port(), _free_port()
+    data_dir = tempfile.mkdtemp(prefix="uigen-bench-")
+    fake_env = {
+        **os.environ,
+        "FAKE_TTFT": str(args.ttft),
+        "FAKE_TOKENS_PER_S": str(args.tokens_per_second),
+    }
+    api_env = {
+        **os.environ,
+        "ANTHROPIC_API_KEY": "benchmark",
+        "ANTHROPIC_BASE_URL": f"http://127.0.0.1:{fake_port}",
+        "HOST": "127.0.0.1",
+        "PORT": str(api_port),
+        "WORKERS": str(args.workers),
+        "LOG_LEVEL": "warning",
+        "RESPONSE_CACHE_ENABLED": "false",
+        "MAX_CONCURRENT_GENERATIONS": str(max(args.concurrency)),
+        "HTTP_MAX_CONNECTIONS": str(max(args.concurrency) * 2),
+        "BATCH_DB_PATH": f"{data_dir}/batches.db",
+        "HISTORY_DB_PATH": f"{data_dir}/history.db",
+        "HISTORY_BLOB_DIR": f"{data_dir}/blobs",
+    }
+    api_env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.fake_anthropic:app",
+         "--host", "127.0.0.1", "--port", str(fake_port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=fake_env
+    )
+    server = subprocess.Popen([sys.executable, "-m", "app.server"], cwd=BACKEND_DIR, env=api_env)
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{api_port}", limits=limits, timeout=300.0
+        ) as client:
+            await _wait_ready(client, "/api/ready", server, 60.0)
+
+            # One request per fixture so first-call costs do not land in the first level
+            for fixture in FIXTURES:
+                response = await client.post("/api/generate", json={"prompt": f"Warm up [fixture:{fixture}]"})
+                if response.status_code != 200:
+                    raise RuntimeError(f"Warm-up request failed: {response.status_code} {response.text[:200]}")
+
+            results = []
+            for level, concurrency in enumerate(args.concurrency):
+                requests = max(args.requests, concurrency * 2)
+                results.append(await run_level(client, server.pid, concurrency, requests, args, level))
+    finally:
+        for process in (server, fake):
+            process.terminate()
+        for process in (server, fake):
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    return {
+        "benchmark": "load",
+        "config": {
+            "ttft_s": args.ttft,
+            "tokens_per_second": args.tokens_per_second,
+            "workers": args.workers,
+            "fixtures": list(FIXTURES),
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument(
+        "--concurrency", type=lambda value: [int(part) for part in value.split(",")],
+        default=[1, 4, 16, 64], help="Comma-separated concurrency levels"
+    )
+    arg_parser.add_argument("--requests", type=int, default=200, help="Requests per level (at least 2x concurrency)")
+    arg_parser.add_argument("--ttft", type=float, default=0.3, help="Fake model time to first token, in seconds")
+    arg_parser.add_argument("--tokens-per-second", type=float, default=400, help="Fake model output rate (0: instant)")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Server worker processes")
+    arg_parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    arg_parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = arg_parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    header = (
+        f"{'conc':>5}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'ovh p50':>9}{'ovh p99':>9}{'lag ms':>8}{'KB/req':>9}{'err':>5}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in report["results"]:
+        lag = row["event_loop_lag"]["mean_ms"]
+        print(
+            f"{row['concurrency']:>5}{row['requests_per_s']:>9.1f}"
+            f"{row['latency_ms']['p50']:>9.1f}{row['latency_ms']['p95']:>9.1f}{row['latency_ms']['p99']:>9.1f}"
+            f"{row['overhead_ms']['p50']:>9.1f}{row['overhead_ms']['p99']:>9.1f}"
+            f"{(lag if lag is not None else float('nan')):>8.2f}"
+            f"{row['memory']['per_in_flight_request_kb']:>9.1f}{row['errors']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
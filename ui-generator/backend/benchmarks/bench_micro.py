@@ -0,0 +1,219 @@
+"""Micro-benchmarks for the per-request hot paths of the backend.
+
+Times, best of N runs:
+  * skill_loader: SkillLoader.load_skill_instructions per page type, on a
+    fresh loader (cold: files read and prompt compiled) and on a warm one,
+    with the estimated prompt tokens saved against the full skill set
+  * parser: ClaudeClient._parse_generated_code on every recorded response
+  * preview: PreviewRenderer.render on the files parsed from every recorded
+    response, on a fresh renderer (cold transpile cache) and a warm one
+  * serialize: /api/generate response bodies for every recorded response,
+    with pydantic's JSON encoder and with orjson, and the body size in
+    full, gzip-compressed and lean (lazy preview, all file contents known)
+
+The preview times depend on whether the preview toolchain is built; the
+result records which path was measured.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_micro [--repeat N] [--json] [--output FILE]
+"""
+import argparse
+import gzip
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.api.generate import _json_body, _lean_result
+from app.config import settings
+from app.models.schemas import GenerateRequest, GenerateResponse
+from app.services.claude_client import ClaudeClient
+from app.services.preview import PreviewRenderer
+from app.services.skill_loader import SkillLoader
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PAGE_TYPES = (None, "form", "list", "detail", "dashboard")
+
+
+def best_of(func: Callable[[], object], repeat: int, setup: Callable[[], None] = lambda: None) -> float:
+    """Return the best-of-`repeat` wall time in seconds, excluding ``setup``."""
+    best = float("inf")
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _us(seconds: float) -> float:
+    return round(seconds * 1e6, 1)
+
+
+def _new_renderer() -> PreviewRenderer:
+    return PreviewRenderer(
+        settings.preview_dir,
+        settings.preview_esbuild_path,
+        settings.preview_cache_max_entries,
+        transpile_timeout=settings.preview_transpile_timeout
+    )
+
+
+def bench_skill_loader(repeat: int) -> List[Dict]:
+    """Time prompt compilation per page type, cold and cached."""
+    savings = SkillLoader().prompt_savings()
+    results = []
+    for page_type in PAGE_TYPES:
+        holder: Dict[str, SkillLoader] = {}
+
+        def fresh() -> None:
+            holder["loader"] = SkillLoader()
+
+        cold = best_of(lambda: holder["loader"].load_skill_instructions(page_type), repeat, fresh)
+        warm_loader = SkillLoader()
+        prompt = warm_loader.load_skill_instructions(page_type)
+        warm = best_of(lambda: warm_loader.load_skill_instructions(page_type), repeat)
+        results.append({
+            "page_type": page_type or "default",
+            "prompt_chars": len(prompt),
+            "saved_tokens_est": savings.get(page_type, {}).get("saved_tokens", 0),
+            "cold_us": _us(cold),
+            "warm_us": _us(warm),
+        })
+    return results
+
+
+def bench_parser(fixtures: Dict[str, str], repeat: int) -> List[Dict]:
+    """Time code parsing for every recorded response."""
+    parse = ClaudeClient._parse_generated_code
+    results = []
+    for name, text in fixtures.items():
+        size_kb = len(text.encode("utf-8")) / 1024
+        elapsed = best_of(lambda: parse(None, text), repeat)
+        results.append({
+            "fixture": name,
+            "size_kb": round(size_kb, 1),
+            "files": len(parse(None, text)),
+            "us": _us(elapsed),
+            "us_per_kb": round(elapsed * 1e6 / size_kb, 2),
+        })
+    return results
+
+
+def bench_preview(fixtures: Dict[str, str], repeat: int) -> Dict:
+    """Time preview rendering for the files of every recorded response."""
+    parse = ClaudeClient._parse_generated_code
+    probe = _new_renderer()
+    results = []
+    for name, text in fixtures.items():
+        files = parse(None, text)
+        holder: Dict[str, PreviewRenderer] = {}
+
+        def fresh() -> None:
+            holder["renderer"] = _new_renderer()
+
+        cold = best_of(lambda: holder["renderer"].render(files), repeat, fresh)
+        warm_renderer = _new_renderer()
+        html = warm_renderer.render(files)
+        warm = best_of(lambda: warm_renderer.render(files), repeat)
+        results.append({
+            "fixture": name,
+            "files": len(files),
+            "html_kb": round(len(html.encode("utf-8")) / 1024, 1),
+            "cold_us": _us(cold),
+            "warm_us": _us(warm),
+        })
+    return {"toolchain_available": probe.available, "results": results}
+
+
+def bench_serialize(fixtures: Dict[str, str], repeat: int) -> List[Dict]:
+    """Time and size the response body for every recorded response."""
+    parse = ClaudeClient._parse_generated_code
+    renderer = _new_renderer()
+    inline = GenerateRequest(prompt="benchmark")
+    results = []
+    for name, text in fixtures.items():
+        files = parse(None, text)
+        result = {
+            "success": True,
+            "files": files,
+            "preview_html": renderer.render(files),
+            "token_usage": {"input": 0, "output": 0},
+            "generation_id": "0" * 32,
+        }
+        full = _lean_result(result, inline)
+        lean_options = GenerateRequest(
+            prompt="benchmark", preview="lazy", known_hashes=[file["hash"] for file in full["files"]]
+        )
+        body = _json_body(GenerateResponse, full)
+        results.append({
+            "fixture": name,
+            "files": len(files),
+            "pydantic_us": _us(best_of(lambda: GenerateResponse(**full).model_dump_json(), repeat)),
+            "orjson_us": _us(best_of(lambda: _json_body(GenerateResponse, full), repeat)),
+            "body_kb": round(len(body) / 1024, 1),
+            "gzip_kb": round(len(gzip.compress(body, compresslevel=settings.compression_gzip_level)) / 1024, 1),
+            "lean_kb": round(len(_json_body(GenerateResponse, _lean_result(result, lean_options))) / 1024, 1),
+        })
+    return results
+
+
+def run(repeat: int) -> Dict:
+    """Run every micro-benchmark."""
+    fixtures = {
+        path.name: path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.txt"))
+    }
+    return {
+        "skill_loader": bench_skill_loader(repeat),
+        "parser": bench_parser(fixtures, repeat),
+        "preview": bench_preview(fixtures, max(1, repeat // 10)),
+        "serialize": bench_serialize(fixtures, repeat),
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=50, help="Timed runs per case (best is kept)")
+    arg_parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    arg_parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = arg_parser.parse_args()
+
+    # Every fresh renderer would repeat the incomplete-toolchain warning
+    logging.getLogger("app.services.preview").setLevel(logging.ERROR)
+
+    report = {"benchmark": "micro", "repeat": args.repeat, "results": run(args.repeat)}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    results = report["results"]
+    print(f"{'skill_loader':<24}{'chars':>8}{'saved tok':>12}{'cold us':>12}{'warm us':>12}")
+    for row in results["skill_loader"]:
+        print(
+            f"{row['page_type']:<24}{row['prompt_chars']:>8}{row['saved_tokens_est']:>12}"
+            f"{row['cold_us']:>12.1f}{row['warm_us']:>12.1f}"
+        )
+
+    print(f"\n{'parser':<24}{'KB':>8}{'files':>12}{'us/KB':>12}")
+    for row in results["parser"]:
+        print(f"{row['fixture']:<24}{row['size_kb']:>8.1f}{row['files']:>12}{row['us_per_kb']:>12.2f}")
+
+    preview = results["preview"]
+    mode = "toolchain" if preview["toolchain_available"] else "file listing fallback"
+    print(f"\n{'preview (' + mode + ')':<32}{'files':>8}{'cold us':>12}{'warm us':>12}")
+    for row in preview["results"]:
+        print(f"{row['fixture']:<32}{row['files']:>8}{row['cold_us']:>12.1f}{row['warm_us']:>12.1f}")
+
+    print(f"\n{'serialize':<24}{'pydantic us':>12}{'orjson us':>11}{'KB':>8}{'gzip KB':>9}{'lean KB':>9}")
+    for row in results["serialize"]:
+        print(
+            f"{row['fixture']:<24}{row['pydantic_us']:>12.1f}{row['orjson_us']:>11.1f}"
+            f"{row['body_kb']:>8.1f}{row['gzip_kb']:>9.1f}{row['lean_kb']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Micro-benchmark for parsing generated code out of recorded model responses.
+
+Compares the single-pass parser, the same parser fed in streaming-sized
+chunks, and the previous regex-based implementation, reporting parse time
+per KB for every response in benchmarks/fixtures/.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_parser [--repeat N] [--json]
+"""
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.services.code_parser import StreamingCodeParser, parse_generated_code
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+STREAM_CHUNK_SIZE = 16
+
+
+def legacy_parse(response_text: str) -> List[Dict]:
+    """Regex parser that ClaudeClient used before the single-pass tokenizer."""
+    files = []
+    pattern = r'FILE:\s*([^\n]+)\n```(?:tsx?|typescript|javascript)?\n(.*?)```'
+    for match in re.finditer(pattern, response_text, re.DOTALL):
+        files.append({"path": match.group(1).strip(), "content": match.group(2).strip()})
+
+    if not files:
+        code_blocks = re.finditer(r'```(?:tsx?|typescript)?\n(.*?)```', response_text, re.DOTALL)
+        for i, match in enumerate(code_blocks):
+            content = match.group(1).strip()
+            export_match = re.search(r'export\s+(?:default\s+)?function\s+(\w+)', content)
+            const_match = re.search(r'const\s+(\w+)\s*=\s*\(\)', content)
+            if export_match:
+                path = f"src/components/{export_match.group(1)}.tsx"
+            elif const_match:
+                path = f"src/components/{const_match.group(1)}.tsx"
+            else:
+                path = f"src/components/Component{i + 1}.tsx"
+            files.append({"path": path, "content": content})
+
+    return files
+
+
+def streaming_parse(response_text: str) -> List[Dict]:
+    """Feed the response through the parser in small chunks, as streaming does."""
+    parser = StreamingCodeParser()
+    for start in range(0, len(response_text), STREAM_CHUNK_SIZE):
+        parser.feed(response_text[start:start + STREAM_CHUNK_SIZE])
+    parser.finish()
+    return parser.files
+
+
+PARSERS: Dict[str, Callable[[str], List[Dict]]] = {
+    "single_pass": parse_generated_code,
+    "streaming": streaming_parse,
+    "legacy_regex": legacy_parse,
+}
+
+
+def time_parser(parse: Callable[[str], List[Dict]], text: str, repeat: int) -> float:
+    """Return the best-of-`repeat` wall time in seconds for one parse."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(repeat: int) -> List[Dict]:
+    """Benchmark every parser against every fixture."""
+    results = []
+    for fixture in sorted(FIXTURES_DIR.glob("*.txt")):
+        text = fixture.read_text(encoding="utf-8")
+        size_kb = len(text.encode("utf-8")) / 1024
+        row = {"fixture": fixture.name, "size_kb": round(size_kb, 1)}
+        for name, parse in PARSERS.items():
+            elapsed = time_parser(parse, text, repeat)
+            row[name] = {
+                "files": len(parse(text)),
+                "us_per_kb": round(elapsed * 1e6 / size_kb, 2),
+            }
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=50, help="Timed runs per parser (best is kept)")
+    arg_parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = arg_parser.parse_args()
+
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps({"benchmark": "parser", "results": results}, indent=2))
+        return
+
+    header = f"{'fixture':<24}{'KB':>7}" + "".join(f"{name:>24}" for name in PARSERS)
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        cells = "".join(
+            f"{row[name]['us_per_kb']:>14.2f} us/KB ({row[name]['files']})" for name in PARSERS
+        )
+        print(f"{row['fixture']:<24}{row['size_kb']:>7.1f}{cells}")
+
+
+if __name__ == "__main__":
+    main()
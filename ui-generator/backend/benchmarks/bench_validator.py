@@ -0,0 +1,109 @@
+"""Benchmark for design-system validation of generated files.
+
+Validates every file parsed from the recorded responses in
+benchmarks/fixtures/, then synthetic large files built by repeating those
+files, with and without fixes. Reports time per file against the 5 ms per
+file budget, time per KB and violations found.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_validator [--repeat N] [--sizes 16,128,1024] [--json] [--output FILE]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.services.code_parser import parse_generated_code
+from app.services.validator import get_design_validator
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+BUDGET_MS_PER_FILE = 5.0
+
+
+def time_check(path: str, content: str, fix: bool, repeat: int) -> float:
+    """Return the best-of-`repeat` wall time in seconds to check one file."""
+    validator = get_design_validator()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        validator.check(path, content, fix)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _row(name: str, path: str, content: str, repeat: int) -> Dict:
+    size_kb = len(content.encode("utf-8")) / 1024
+    _, violations = get_design_validator().check(path, content, True)
+    row = {
+        "file": name,
+        "size_kb": round(size_kb, 1),
+        "violations": len(violations),
+        "fixable": sum(1 for violation in violations if violation["fixed"]),
+    }
+    for mode, fix in (("check", False), ("fix", True)):
+        elapsed = time_check(path, content, fix, repeat)
+        row[mode] = {"ms": round(elapsed * 1000, 3), "us_per_kb": round(elapsed * 1e6 / size_kb, 2)}
+    return row
+
+
+def run(repeat: int, sizes_kb: List[int]) -> Dict:
+    """Benchmark the recorded files and synthetic files of the given sizes."""
+    files = []
+    for fixture in sorted(FIXTURES_DIR.glob("*.txt")):
+        for file in parse_generated_code(fixture.read_text(encoding="utf-8")):
+            files.append((f"{fixture.stem}:{file['path']}", file["path"], file["content"]))
+
+    recorded = [_row(name, path, content, repeat) for name, path, content in files]
+
+    corpus = "\n".join(content for _, _, content in files)
+    synthetic = []
+    for size_kb in sizes_kb:
+        copies = max(1, size_kb * 1024 // max(1, len(corpus)) + 1)
+        content = "\n".join([corpus] * copies)[:size_kb * 1024]
+        synthetic.append(_row(f"synthetic {size_kb} KB", "src/pages/Large.tsx", content, max(1, repeat // 10)))
+
+    worst = max(row["fix"]["ms"] for row in recorded) if recorded else 0.0
+    return {
+        "budget_ms_per_file": BUDGET_MS_PER_FILE,
+        "worst_recorded_file_ms": worst,
+        "within_budget": worst <= BUDGET_MS_PER_FILE,
+        "recorded": recorded,
+        "synthetic": synthetic,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=50, help="Timed runs per file (best is kept)")
+    arg_parser.add_argument("--sizes", default="16,128,1024", help="Synthetic file sizes in KB")
+    arg_parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    arg_parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = arg_parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    report = {"benchmark": "validator", "repeat": args.repeat, "results": run(args.repeat, sizes)}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    results = report["results"]
+    header = f"{'file':<52}{'KB':>8}{'found':>7}{'fixable':>9}{'check ms':>10}{'fix ms':>9}{'us/KB':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in results["recorded"] + results["synthetic"]:
+        print(
+            f"{row['file'][:51]:<52}{row['size_kb']:>8.1f}{row['violations']:>7}{row['fixable']:>9}"
+            f"{row['check']['ms']:>10.3f}{row['fix']['ms']:>9.3f}{row['fix']['us_per_kb']:>9.2f}"
+        )
+    verdict = "within" if results["within_budget"] else "OVER"
+    print(
+        f"\nWorst recorded file: {results['worst_recorded_file_ms']:.3f} ms "
+        f"({verdict} the {results['budget_ms_per_file']:.0f} ms budget)"
+    )
+
+
+if __name__ == "__main__":
+    main()
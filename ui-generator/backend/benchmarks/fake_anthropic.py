@@ -0,0 +1,168 @@
+"""Local fake of the Anthropic Messages API that replays recorded responses.
+
+Responses are the recorded model outputs in benchmarks/fixtures/, sent at a
+configurable token rate after a configurable time to first token, so the
+backend can be load tested without network access or API cost. A request
+whose prompt contains ``[fixture:NAME]`` gets that fixture; otherwise one is
+picked from a hash of the prompt.
+
+Configuration is read from the environment, so the app can be served by
+uvicorn directly:
+    FAKE_TTFT          Seconds before the first token (default 0.3)
+    FAKE_TOKENS_PER_S  Output token rate; 0 sends everything at once (default 400)
+    FAKE_CHUNK_TOKENS  Tokens per streamed text delta (default 8)
+
+Usage (from the backend directory):
+    python -m benchmarks.fake_anthropic [--port 9100] [--ttft 0.3] [--tokens-per-second 400]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import uuid
+import zlib
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+FIXTURE_TAG = re.compile(r"\[fixture:([\w.-]+)\]")
+
+# Rough characters per token, used for delays and reported usage
+CHARS_PER_TOKEN = 4
+
+FIXTURES: Dict[str, str] = {
+    path.name: path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.txt"))
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def expected_seconds(fixture: str, ttft: float, tokens_per_second: float) -> float:
+    """Return how long the fake takes to send a fixture in full."""
+    if tokens_per_second <= 0:
+        return ttft
+    return ttft + estimate_tokens(FIXTURES[fixture]) / tokens_per_second
+
+
+def pick_fixture(prompt: str) -> str:
+    """Choose the recorded response for a prompt."""
+    tagged = FIXTURE_TAG.search(prompt)
+    if tagged and tagged.group(1) in FIXTURES:
+        return tagged.group(1)
+    names = list(FIXTURES)
+    return names[zlib.crc32(prompt.encode("utf-8")) % len(names)]
+
+
+def _prompt_text(body: Dict) -> str:
+    parts: List[str] = []
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content or [])
+    return "\n".join(parts)
+
+
+def _input_tokens(body: Dict) -> int:
+    system = body.get("system") or ""
+    if not isinstance(system, str):
+        system = "".join(block.get("text", "") for block in system)
+    return estimate_tokens(system + _prompt_text(body))
+
+
+def _sse(event: str, data: Dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+async def _stream_events(
+    text: str,
+    body: Dict,
+    ttft: float,
+    tokens_per_second: float,
+    chunk_tokens: int
+) -> AsyncIterator[bytes]:
+    message_id = f"msg_{uuid.uuid4().hex[:24]}"
+    await asyncio.sleep(ttft)
+    yield _sse("message_start", {
+        "type": "message_start",
+        "message": {
+            "id": message_id, "type": "message", "role": "assistant", "model": body["model"],
+            "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": _input_tokens(body), "output_tokens": 1},
+        },
+    })
+    yield _sse("content_block_start", {
+        "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+    })
+
+    chunk_chars = chunk_tokens * CHARS_PER_TOKEN
+    delay = chunk_tokens / tokens_per_second if tokens_per_second > 0 else 0.0
+    for start in range(0, len(text), chunk_chars):
+        if delay:
+            await asyncio.sleep(delay)
+        yield _sse("content_block_delta", {
+            "type": "content_block_delta", "index": 0,
+            "delta": {"type": "text_delta", "text": text[start:start + chunk_chars]},
+        })
+
+    yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+    yield _sse("message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+        "usage": {"output_tokens": estimate_tokens(text)},
+    })
+    yield _sse("message_stop", {"type": "message_stop"})
+
+
+async def messages(request: Request):
+    """POST /v1/messages: replay a fixture, streamed or as one message."""
+    body = await request.json()
+    ttft = float(os.environ.get("FAKE_TTFT", "0.3"))
+    tokens_per_second = float(os.environ.get("FAKE_TOKENS_PER_S", "400"))
+    chunk_tokens = int(os.environ.get("FAKE_CHUNK_TOKENS", "8"))
+    text = FIXTURES[pick_fixture(_prompt_text(body))]
+
+    if body.get("stream"):
+        return StreamingResponse(
+            _stream_events(text, body, ttft, tokens_per_second, chunk_tokens),
+            media_type="text/event-stream"
+        )
+
+    output_tokens = estimate_tokens(text)
+    await asyncio.sleep(ttft + (output_tokens / tokens_per_second if tokens_per_second > 0 else 0.0))
+    return JSONResponse({
+        "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant",
+        "model": body["model"], "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": _input_tokens(body), "output_tokens": output_tokens},
+    })
+
+
+app = Starlette(routes=[Route("/v1/messages", messages, methods=["POST"])])
+
+
+def main() -> None:
+    import uvicorn
+
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--port", type=int, default=9100)
+    arg_parser.add_argument("--ttft", type=float, default=0.3, help="Seconds before the first token")
+    arg_parser.add_argument("--tokens-per-second", type=float, default=400, help="Output token rate (0: no delay)")
+    args = arg_parser.parse_args()
+
+    os.environ["FAKE_TTFT"] = str(args.ttft)
+    os.environ["FAKE_TOKENS_PER_S"] = str(args.tokens_per_second)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
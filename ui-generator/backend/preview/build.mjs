@@ -0,0 +1,32 @@
+// Builds dist/: the esbuild binary, React UMD bundles and the precompiled
+// Tailwind stylesheet the backend inlines into previews. Run once at image
+// build time; rendering previews afterwards needs no network or Node.js.
+import { execFileSync } from "node:child_process"
+import { chmodSync, copyFileSync, mkdirSync } from "node:fs"
+import { createRequire } from "node:module"
+
+const require = createRequire(import.meta.url)
+const DIST = new URL("./dist/", import.meta.url).pathname
+
+mkdirSync(DIST, { recursive: true })
+
+// esbuild ships a standalone native binary per platform
+const arch = { x64: "x64", arm64: "arm64" }[process.arch]
+const esbuildBinary = require.resolve(`@esbuild/${process.platform}-${arch}/bin/esbuild`)
+copyFileSync(esbuildBinary, `${DIST}esbuild`)
+chmodSync(`${DIST}esbuild`, 0o755)
+
+copyFileSync(require.resolve("react/umd/react.production.min.js"), `${DIST}react.production.min.js`)
+copyFileSync(require.resolve("react-dom/umd/react-dom.production.min.js"), `${DIST}react-dom.production.min.js`)
+
+execFileSync(
+  process.execPath,
+  [
+    require.resolve("tailwindcss/lib/cli.js"),
+    "--config", "tailwind.config.cjs",
+    "--input", "tailwind.input.css",
+    "--output", `${DIST}tailwind.css`,
+    "--minify",
+  ],
+  { stdio: "inherit", cwd: new URL(".", import.meta.url).pathname }
+)
@@ -0,0 +1,218 @@
+/*
+ * Preview runtime: links transpiled CommonJS modules and renders the entry page.
+ *
+ * Expects window.React, window.ReactDOM and window.__PREVIEW__ =
+ * { entry, modules: { path: function (module, exports, require) }, errors: { path: message } }.
+ * Imports that are not generated files resolve to stubs so a page renders
+ * without its real dependencies.
+ */
+(function () {
+  "use strict";
+
+  var React = window.React;
+  var ReactDOM = window.ReactDOM;
+  var preview = window.__PREVIEW__;
+  var h = React.createElement;
+  var EXTENSIONS = ["", ".tsx", ".ts", ".jsx", ".js", "/index.tsx", "/index.ts", "/index.jsx", "/index.js"];
+  var cache = {};
+
+  function cx() {
+    return Array.prototype.filter.call(arguments, Boolean).join(" ");
+  }
+
+  // Common components, matching the variants documented in component-library.md
+  var BUTTON_VARIANTS = {
+    primary: "bg-primary text-primary-foreground hover:bg-primary/90",
+    secondary: "bg-secondary text-secondary-foreground hover:bg-secondary/80",
+    destructive: "bg-destructive text-destructive-foreground hover:bg-destructive/90",
+    outline: "border border-input bg-background hover:bg-accent hover:text-accent-foreground",
+    ghost: "hover:bg-accent hover:text-accent-foreground"
+  };
+  var BUTTON_SIZES = { sm: "h-8 px-3 text-sm", md: "h-10 px-4", lg: "h-12 px-6 text-lg" };
+
+  function Button(props) {
+    var rest = Object.assign({}, props);
+    var variant = rest.variant || "primary";
+    var size = rest.size || "md";
+    delete rest.variant;
+    delete rest.size;
+    rest.className = cx(
+      "inline-flex items-center justify-center gap-2 rounded-md font-medium transition-colors disabled:opacity-50",
+      BUTTON_VARIANTS[variant] || BUTTON_VARIANTS.primary,
+      BUTTON_SIZES[size] || BUTTON_SIZES.md,
+      props.className
+    );
+    return h("button", rest);
+  }
+
+  var Input = React.forwardRef(function Input(props, ref) {
+    var rest = Object.assign({ ref: ref }, props);
+    var error = rest.error;
+    delete rest.error;
+    rest.className = cx(
+      "flex h-10 w-full rounded-md border bg-background px-3 py-2 text-sm",
+      error ? "border-destructive" : "border-input",
+      props.className
+    );
+    return h("div", { className: "space-y-1" },
+      h("input", rest),
+      error ? h("p", { className: "text-sm text-destructive" }, String(error)) : null
+    );
+  });
+
+  function PageLayout(props) {
+    return h("div", { className: "min-h-screen bg-background" },
+      props.header || null,
+      h("div", { className: "flex" },
+        props.sidebar ? h("aside", { className: "w-64 border-r border-border p-4" }, props.sidebar) : null,
+        h("main", { className: cx("flex-1 container mx-auto p-6", props.className) }, props.children)
+      )
+    );
+  }
+
+  function placeholderComponent(name) {
+    function Placeholder(props) {
+      return h("div", { className: props.className, "data-component": name }, props.children);
+    }
+    Placeholder.displayName = name;
+    return Placeholder;
+  }
+
+  function iconComponent(name) {
+    function Icon(props) {
+      var size = props.size || 16;
+      return h("span", {
+        className: cx("inline-block rounded-sm bg-current opacity-40", props.className),
+        style: { width: size, height: size },
+        "aria-hidden": true,
+        "data-icon": name
+      });
+    }
+    Icon.displayName = name;
+    return Icon;
+  }
+
+  // Callable stand-in for hook results and helpers from unknown packages
+  var anything = new Proxy(function () {}, {
+    get: function (target, prop) {
+      if (prop === Symbol.toPrimitive) return function () { return ""; };
+      if (prop === "then" || prop === "$$typeof" || prop === "prototype") return undefined;
+      return anything;
+    },
+    apply: function () { return anything; }
+  });
+
+  // Exports are resolved through the prototype so esbuild's __toESM copies still find them
+  function stubModule(specifier, known) {
+    var made = {};
+    return Object.create(new Proxy({}, {
+      get: function (target, name) {
+        if (name === "__esModule") return true;
+        if (typeof name !== "string") return undefined;
+        if (known && known[name]) return known[name];
+        if (!made[name]) {
+          if (/^use[A-Z]/.test(name) || !/^[A-Z]/.test(name)) {
+            made[name] = anything;
+          } else if (specifier.indexOf("icons") >= 0 || specifier === "lucide-react") {
+            made[name] = iconComponent(name);
+          } else {
+            made[name] = placeholderComponent(name);
+          }
+        }
+        return made[name];
+      }
+    }));
+  }
+
+  var commonModule = stubModule("@/components/common", {
+    Button: Button,
+    Input: Input,
+    PageLayout: PageLayout
+  });
+
+  function dirname(path) {
+    var slash = path.lastIndexOf("/");
+    return slash < 0 ? "" : path.slice(0, slash);
+  }
+
+  function normalize(path) {
+    var parts = [];
+    path.split("/").forEach(function (part) {
+      if (part === "..") parts.pop();
+      else if (part && part !== ".") parts.push(part);
+    });
+    return parts.join("/");
+  }
+
+  function findModule(path) {
+    for (var i = 0; i < EXTENSIONS.length; i++) {
+      var candidate = path + EXTENSIONS[i];
+      if (preview.modules[candidate] || preview.errors[candidate]) return candidate;
+    }
+    return null;
+  }
+
+  function load(path) {
+    if (cache[path]) return cache[path].exports;
+    if (preview.errors[path]) throw new Error(path + ": " + preview.errors[path]);
+    var module = { exports: {} };
+    cache[path] = module;
+    preview.modules[path](module, module.exports, function (specifier) {
+      return requireFrom(path, specifier);
+    });
+    return module.exports;
+  }
+
+  function requireFrom(from, specifier) {
+    if (specifier === "react" || specifier === "react/jsx-runtime") return React;
+    if (specifier === "react-dom" || specifier === "react-dom/client") return ReactDOM;
+
+    var path = null;
+    if (specifier.indexOf("@/") === 0) path = "src/" + specifier.slice(2);
+    else if (specifier.charAt(0) === ".") path = normalize(dirname(from) + "/" + specifier);
+
+    var found = path === null ? null : findModule(path);
+    if (found) return load(found);
+    if (specifier.indexOf("@/components/common") === 0) return commonModule;
+    return stubModule(specifier);
+  }
+
+  function pickComponent(exports) {
+    if (typeof exports.default === "function") return exports.default;
+    var names = Object.keys(exports);
+    for (var i = 0; i < names.length; i++) {
+      if (typeof exports[names[i]] === "function" && /^[A-Z]/.test(names[i])) return exports[names[i]];
+    }
+    return null;
+  }
+
+  function ErrorPanel(props) {
+    return h("div", { className: "m-6 rounded-lg border border-destructive p-6" },
+      h("p", { className: "font-medium text-destructive" }, "Preview failed to render"),
+      h("pre", { className: "mt-2 whitespace-pre-wrap text-sm text-muted-foreground" }, props.message)
+    );
+  }
+
+  function ErrorBoundary(props) {
+    React.Component.call(this, props);
+    this.state = { error: null };
+  }
+  ErrorBoundary.prototype = Object.create(React.Component.prototype);
+  ErrorBoundary.prototype.constructor = ErrorBoundary;
+  ErrorBoundary.getDerivedStateFromError = function (error) {
+    return { error: error };
+  };
+  ErrorBoundary.prototype.render = function () {
+    if (this.state.error) return h(ErrorPanel, { message: String(this.state.error.message || this.state.error) });
+    return this.props.children;
+  };
+
+  var root = ReactDOM.createRoot(document.getElementById("preview"));
+  try {
+    var Component = pickComponent(load(preview.entry));
+    if (!Component) throw new Error(preview.entry + " does not export a component");
+    root.render(h(ErrorBoundary, null, h(Component)));
+  } catch (error) {
+    root.render(h(ErrorPanel, { message: String(error.message || error) }));
+  }
+})();
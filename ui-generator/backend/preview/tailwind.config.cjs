@@ -0,0 +1,104 @@
+/**
+ * Tailwind config for the precompiled preview stylesheet.
+ *
+ * Colors follow skill-data/design-system.md. Generated code is not known at
+ * build time, so the stylesheet is built from a broad safelist and the
+ * backend inlines only the rules for classes a preview actually uses.
+ */
+const TOKENS = [
+  "background", "foreground", "card", "card-foreground", "primary", "primary-foreground",
+  "secondary", "secondary-foreground", "muted", "muted-foreground", "accent", "accent-foreground",
+  "destructive", "destructive-foreground", "success", "success-foreground",
+  "warning", "warning-foreground", "border", "input", "ring",
+]
+const OPACITIES = [5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 95]
+const STATE_VARIANTS = ["hover", "focus", "focus-visible", "active", "disabled", "group-hover"]
+const RESPONSIVE_VARIANTS = ["sm", "md", "lg", "xl"]
+
+// Opacity modifiers (bg-primary/90) are not in Tailwind's class list, so list them explicitly
+const tokenOpacityClasses = ["bg", "text", "border", "ring"].flatMap((utility) =>
+  TOKENS.flatMap((token) => OPACITIES.map((opacity) => `${utility}-${token}/${opacity}`))
+)
+
+module.exports = {
+  content: ["./runtime.js"],
+  theme: {
+    extend: {
+      colors: {
+        border: "hsl(240 5.9% 90%)",
+        input: "hsl(240 5.9% 90%)",
+        ring: "hsl(262 83% 58%)",
+        background: "hsl(0 0% 100%)",
+        foreground: "hsl(240 10% 3.9%)",
+        card: {
+          DEFAULT: "hsl(0 0% 100%)",
+          foreground: "hsl(240 10% 3.9%)",
+        },
+        primary: {
+          DEFAULT: "hsl(262 83% 58%)",
+          foreground: "hsl(0 0% 100%)",
+        },
+        secondary: {
+          DEFAULT: "hsl(240 4.8% 95.9%)",
+          foreground: "hsl(240 5.9% 10%)",
+        },
+        muted: {
+          DEFAULT: "hsl(240 4.8% 95.9%)",
+          foreground: "hsl(240 3.8% 46.1%)",
+        },
+        accent: {
+          DEFAULT: "hsl(240 4.8% 95.9%)",
+          foreground: "hsl(240 5.9% 10%)",
+        },
+        destructive: {
+          DEFAULT: "hsl(0 84.2% 60.2%)",
+          foreground: "hsl(0 0% 100%)",
+        },
+        success: {
+          DEFAULT: "hsl(142 71% 45%)",
+          foreground: "hsl(0 0% 100%)",
+        },
+        warning: {
+          DEFAULT: "hsl(38 92% 50%)",
+          foreground: "hsl(240 10% 3.9%)",
+        },
+      },
+      borderRadius: {
+        lg: "0.5rem",
+        md: "calc(0.5rem - 2px)",
+        sm: "calc(0.5rem - 4px)",
+      },
+    },
+  },
+  safelist: [
+    ...tokenOpacityClasses,
+    {
+      // Design-token colors with interaction states
+      pattern: new RegExp(`^(bg|text|border|ring|ring-offset|outline|divide|placeholder|fill|stroke)-(${TOKENS.join("|")})$`),
+      variants: [...STATE_VARIANTS, ...RESPONSIVE_VARIANTS],
+    },
+    {
+      // Layout, spacing and sizing
+      pattern: /^(p|px|py|pt|pr|pb|pl|m|mx|my|mt|mr|mb|ml|-m|-mx|-my|-mt|-mr|-mb|-ml|gap|gap-x|gap-y|space-x|space-y|w|h|min-w|min-h|max-w|max-h|size|inset|inset-x|inset-y|top|right|bottom|left|basis)-.+$/,
+      variants: RESPONSIVE_VARIANTS,
+    },
+    {
+      pattern: /^(flex|grid|grid-cols|grid-rows|col-span|row-span|col-start|col-end|order|grow|shrink|items|justify|justify-items|self|content|place-items|place-content|overflow|overflow-x|overflow-y|z|columns)(-.+)?$/,
+      variants: RESPONSIVE_VARIANTS,
+    },
+    {
+      pattern: /^(block|inline-block|inline|inline-flex|inline-grid|hidden|contents|table|table-row|table-cell|static|fixed|absolute|relative|sticky|container|truncate|sr-only|visible|invisible|italic|underline|line-through|no-underline|uppercase|lowercase|capitalize|antialiased)$/,
+      variants: RESPONSIVE_VARIANTS,
+    },
+    {
+      // Typography, borders and effects
+      pattern: /^(text|font|leading|tracking|whitespace|break|line-clamp|list|align|rounded|rounded-t|rounded-b|rounded-l|rounded-r|rounded-tl|rounded-tr|rounded-bl|rounded-br|border|border-t|border-b|border-l|border-r|border-x|border-y|ring|ring-offset|outline|shadow|opacity|cursor|pointer-events|select|resize|transition|duration|ease|animate|object|aspect|backdrop-blur|blur|translate-x|translate-y|scale|rotate)(-.+)?$/,
+      variants: [...STATE_VARIANTS, ...RESPONSIVE_VARIANTS],
+    },
+    {
+      // Default palette, without variants, for code that strays from the tokens
+      pattern: /^(bg|text|border)-(slate|gray|zinc|red|orange|amber|yellow|green|emerald|blue|indigo|violet|purple|pink)-(50|100|200|300|400|500|600|700|800|900)$/,
+    },
+  ],
+  plugins: [],
+}
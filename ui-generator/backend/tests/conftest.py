@@ -0,0 +1,118 @@
+"""Shared pytest setup: run from the backend directory with ``python -m pytest``."""
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Set
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from anthropic import AsyncAnthropic  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.services import admission, claude_client, history_store, response_cache  # noqa: E402
+
+GENERATED = """Here is the page.
+
+FILE: src/pages/LoginPage.tsx
+```tsx
+import { LoginForm } from "@/components/LoginForm"
+
+export default function LoginPage() {
+  return <div className="container mx-auto p-6"><LoginForm /></div>
+}
+```
+
+FILE: src/components/LoginForm.tsx
+```tsx
+export function LoginForm() {
+  return <form className="space-y-4" />
+}
+```
+"""
+
+
+class FakeUpstream:
+    """Stand-in for the Messages API that records every request body.
+
+    Answers with ``text`` as a complete message, or as SSE events when the
+    request asks for a stream. Models in ``truncated_models`` report
+    ``max_tokens`` as their stop reason.
+    """
+
+    def __init__(self, text: str = GENERATED, delay: float = 0.0):
+        self.text = text
+        self.delay = delay
+        self.truncated_models: Set[str] = set()
+        self.calls: List[Dict] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.calls.append(body)
+        stop_reason = "max_tokens" if body["model"] in self.truncated_models else "end_turn"
+        if body.get("stream"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=self._events(body["model"], stop_reason)
+            )
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, json={
+            "id": "msg_test",
+            "type": "message",
+            "role": "assistant",
+            "model": body["model"],
+            "content": [{"type": "text", "text": self.text}],
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": 10, "output_tokens": 20}
+        })
+
+    async def _events(self, model: str, stop_reason: str) -> AsyncIterator[bytes]:
+        def event(data: Dict) -> bytes:
+            return f"event: {data['type']}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+        yield event({"type": "message_start", "message": {
+            "id": "msg_test", "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": 10, "output_tokens": 1}
+        }})
+        yield event({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+        chunks = [self.text[i:i + 16] for i in range(0, len(self.text), 16)]
+        for chunk in chunks:
+            await asyncio.sleep(self.delay / len(chunks))
+            yield event({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}})
+        yield event({"type": "content_block_stop", "index": 0})
+        yield event({
+            "type": "message_delta",
+            "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+            "usage": {"output_tokens": 20}
+        })
+        yield event({"type": "message_stop"})
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """Point the Claude client singleton at a FakeUpstream, with fresh stores in ``tmp_path``."""
+    monkeypatch.setattr(settings, "history_db_path", str(tmp_path / "history.db"))
+    monkeypatch.setattr(settings, "history_blob_dir", str(tmp_path / "blobs"))
+    monkeypatch.setattr(settings, "response_cache_path", "")
+    for module, name in (
+        (claude_client, "_claude_client"),
+        (response_cache, "_response_cache"),
+        (history_store, "_history_store"),
+        (admission, "_admission_controller"),
+    ):
+        monkeypatch.setattr(module, name, None)
+
+    fake = FakeUpstream()
+    client = claude_client.get_claude_client()
+    client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    client.client = AsyncAnthropic(api_key="test-key", http_client=client.http_client, max_retries=0)
+    yield fake
+
+    asyncio.run(claude_client.close_claude_client())
+    response_cache.close_response_cache()
+    history_store.close_history_store()
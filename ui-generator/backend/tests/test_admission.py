@@ -0,0 +1,54 @@
+"""Tests for admission control of streamed generations."""
+import asyncio
+from typing import AsyncGenerator, Dict, List
+
+from app.services.admission import AdmissionController
+
+
+def _produce(started: List[int], count: int = 3, delay: float = 0.01):
+    async def produce() -> AsyncGenerator[Dict, None]:
+        started.append(1)
+        for index in range(count):
+            await asyncio.sleep(delay)
+            yield {"type": "chunk", "index": index}
+
+    return produce
+
+
+def test_closing_an_unstarted_stream_cancels_the_job_and_frees_the_slot():
+    controller = AdmissionController(max_active=1, max_queue=4, max_queue_per_client=4)
+
+    async def scenario():
+        events, _ = controller.stream("a", "key", _produce([], delay=10))
+        job = controller._jobs["key"]
+        await asyncio.sleep(0)
+        await events.aclose()
+        await asyncio.sleep(0)
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job.waiters == 0
+    assert job.task.cancelled()
+    assert controller._active == 0
+    assert not controller._jobs
+
+
+def test_closing_an_unstarted_follower_keeps_the_shared_job_running():
+    controller = AdmissionController(max_active=1, max_queue=4, max_queue_per_client=4)
+    started: List[int] = []
+
+    async def scenario():
+        events, _ = controller.stream("a", "key", _produce(started))
+        joined, coalesced = controller.stream("b", "key", _produce(started))
+        await joined.aclose()
+        await joined.aclose()
+        received = [event async for event in events]
+        return received, coalesced
+
+    received, coalesced = asyncio.run(scenario())
+
+    assert coalesced
+    assert [event["index"] for event in received] == [0, 1, 2]
+    assert started == [1]
+    assert controller._active == 0
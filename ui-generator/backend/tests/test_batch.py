@@ -0,0 +1,170 @@
+"""Tests for batch generation through a stub provider and the Message Batches provider."""
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.main import app
+from app.services import batch
+from app.services.batch import AnthropicBatchProvider, BatchManager, BatchProvider
+from app.services.batch_store import BatchJobStore
+from app.services.claude_client import get_claude_client
+from tests.conftest import GENERATED
+
+REQUESTS = [{"prompt": "Login form"}, {"prompt": "fail"}, {"prompt": "User list"}]
+
+
+class StubBatchProvider(BatchProvider):
+    """Answers every item locally; items from ``hold_from`` on never finish."""
+
+    name = "stub"
+
+    def __init__(self, hold_from: Optional[int] = None):
+        self.hold_from = hold_from
+        self.runs: List[List[int]] = []
+
+    async def run(self, job_id: str, items: List[Dict]) -> AsyncIterator[Tuple[int, Dict]]:
+        self.runs.append([item["index"] for item in items])
+        for item in items:
+            if self.hold_from is not None and item["index"] >= self.hold_from:
+                await asyncio.Event().wait()
+            success = item["prompt"] != "fail"
+            yield item["index"], {
+                "success": success,
+                "files": [{"path": "src/pages/Page.tsx", "content": item["prompt"]}] if success else [],
+                "token_usage": {"input": 1, "output": 2, "cache_read": 0, "cache_write": 0},
+                "violations": [],
+                "error": None if success else "No valid files found in response.",
+            }
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "batch_results_poll_interval", 0.01)
+    monkeypatch.setattr(batch, "_batch_manager", None)
+    return str(tmp_path / "batches.db")
+
+
+def _use(manager: BatchManager, monkeypatch) -> BatchManager:
+    monkeypatch.setattr(batch, "_batch_manager", manager)
+    return manager
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def _results(client: httpx.AsyncClient, job_id: str) -> List[Dict]:
+    response = await client.get(f"/api/generate/batch/{job_id}/results")
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_submit_status_and_streamed_results(db_path, monkeypatch):
+    manager = _use(BatchManager(BatchJobStore(db_path), StubBatchProvider()), monkeypatch)
+
+    async def scenario():
+        async with _client() as client:
+            submitted = await client.post("/api/generate/batch", json={"requests": REQUESTS})
+            assert submitted.status_code == 202
+            job_id = submitted.json()["job_id"]
+            assert submitted.json()["total"] == 3
+
+            results = await _results(client, job_id)
+            status = (await client.get(f"/api/generate/batch/{job_id}")).json()
+            missing = await client.get("/api/generate/batch/unknown")
+        await manager.shutdown()
+        return results, status, missing
+
+    results, status, missing = asyncio.run(scenario())
+    manager.store.close()
+
+    assert sorted(result["index"] for result in results) == [0, 1, 2]
+    assert {result["index"]: result["success"] for result in results} == {0: True, 1: False, 2: True}
+    assert results[0]["files"][0]["content"] == "Login form"
+    assert (status["status"], status["succeeded"], status["failed"], status["pending"]) == ("completed", 2, 1, 0)
+    assert missing.status_code == 404
+
+
+def test_unfinished_job_resumes_after_restart(db_path, monkeypatch):
+    interrupted = StubBatchProvider(hold_from=1)
+    first = _use(BatchManager(BatchJobStore(db_path), interrupted), monkeypatch)
+
+    async def before_restart() -> str:
+        job_id = await first.submit(REQUESTS)
+        while (await first.get_job(job_id))["succeeded"] < 1:
+            await asyncio.sleep(0.01)
+        await first.shutdown()
+        return job_id
+
+    job_id = asyncio.run(before_restart())
+    first.store.close()
+
+    resumed = StubBatchProvider()
+    second = _use(BatchManager(BatchJobStore(db_path), resumed), monkeypatch)
+
+    async def after_restart() -> List[Dict]:
+        await second.resume()
+        async with _client() as client:
+            results = await _results(client, job_id)
+        await second.shutdown()
+        return results
+
+    results = asyncio.run(after_restart())
+    second.store.close()
+
+    assert resumed.runs == [[1, 2]]
+    assert [result["index"] for result in results] == [0, 1, 2]
+
+
+def _message(text: str) -> Dict:
+    return {
+        "id": "msg_test", "type": "message", "role": "assistant", "model": settings.claude_model,
+        "content": [{"type": "text", "text": text}], "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 20},
+    }
+
+
+def test_anthropic_resume_skips_stored_items_and_validates(upstream, db_path):
+    store = BatchJobStore(db_path)
+    job_id = store.create_job("anthropic", [{"prompt": "Login form", "page_type": "form"}] * 2)
+    store.set_provider_ref(job_id, "msgbatch_test")
+    store.save_result(job_id, 0, {"success": False, "files": [], "token_usage": {"input": 0, "output": 0}})
+
+    off_scale = GENERATED.replace("space-y-4", "space-y-3")
+    results_lines = "\n".join(
+        json.dumps({"custom_id": f"item-{index}", "result": {"type": "succeeded", "message": _message(off_scale)}})
+        for index in (0, 1)
+    )
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/v1/messages/batches/msgbatch_test":
+            return httpx.Response(200, json={
+                "id": "msgbatch_test", "processing_status": "ended",
+                "results_url": "https://api.anthropic.test/v1/messages/batches/msgbatch_test/results",
+            })
+        assert request.url.path.endswith("/results")
+        return httpx.Response(200, text=results_lines)
+
+    client = get_claude_client()
+    client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    manager = BatchManager(store, AnthropicBatchProvider(client, store, poll_interval=0.01))
+
+    async def scenario() -> List[Dict]:
+        await manager.resume()
+        results = [item async for item in manager.stream_results(job_id, 0.01)]
+        await manager.shutdown()
+        return results
+
+    results = asyncio.run(scenario())
+    seqs = [item["seq"] for item in store.completed_items(job_id)]
+    store.close()
+
+    assert [result["index"] for result in results] == [0, 1]
+    assert seqs == [1, 2]
+    assert results[0]["success"] is False
+    assert results[1]["success"]
+    assert [violation["rule"] for violation in results[1]["violations"]] == ["spacing-scale"]
@@ -0,0 +1,80 @@
+"""Tests for model routing and the response cache in the Claude client."""
+import asyncio
+import logging
+
+import httpx
+from anthropic import AsyncAnthropic
+
+import app.main  # noqa: F401  (configures logging as the server does)
+from app.services.claude_client import get_claude_client
+from app.services.response_cache import get_response_cache
+
+PROMPT = "Login form with email and password"
+
+
+def test_routing_decision_is_logged(upstream, caplog):
+    result = asyncio.run(get_claude_client().generate_code(PROMPT, "form"))
+
+    assert result["success"]
+    messages = [
+        record.getMessage() for record in caplog.records
+        if record.name == "app.services.claude_client" and record.levelno == logging.INFO
+    ]
+    routed = [message for message in messages if message.startswith("Routed generation:")]
+    assert len(routed) == 1
+    assert "tier=fast" in routed[0]
+    assert "outcome=ok" in routed[0]
+
+
+def test_escalated_result_is_cached_under_the_main_route(upstream):
+    client = get_claude_client()
+    upstream.truncated_models.add(client.router.fast_model)
+
+    async def scenario():
+        first = await client.generate_code(PROMPT, "form")
+        second = await client.generate_code(PROMPT, "form")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert [call["model"] for call in upstream.calls] == [client.router.fast_model, client.router.main.model]
+    assert first["model"] == second["model"] == client.router.main.model
+    assert not first["cached"] and second["cached"]
+
+    cache = get_response_cache()
+    fast_key = client._cache_key(PROMPT, "form", client.router.choose(PROMPT, "form"))
+    main_key = client._cache_key(PROMPT, "form", client.router.main)
+    assert asyncio.run(cache.get(fast_key)) is None
+    assert asyncio.run(cache.get(main_key))["model"] == client.router.main.model
+
+
+def test_retry_backoff_does_not_hold_a_concurrency_slot(upstream):
+    client = get_claude_client()
+    client._semaphore = asyncio.Semaphore(1)
+    attempts = []
+
+    async def rate_limit_first(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            return httpx.Response(
+                429,
+                headers={"retry-after": "0.3"},
+                json={"type": "error", "error": {"type": "rate_limit_error", "message": "Slow down"}}
+            )
+        return await upstream.handle(request)
+
+    client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(rate_limit_first))
+    client.client = AsyncAnthropic(api_key="test-key", http_client=client.http_client, max_retries=0)
+
+    async def scenario():
+        retried = asyncio.create_task(client.generate_code(PROMPT, "form"))
+        await asyncio.sleep(0.05)
+        other = await client.generate_code("Product list with filters", "list")
+        return other, retried.done(), await retried
+
+    other, retried_done, retried = asyncio.run(scenario())
+
+    assert other["success"] and retried["success"]
+    # The second request ran while the first was backing off
+    assert not retried_done
+    assert len(attempts) == 3
@@ -0,0 +1,56 @@
+"""Tests for the single-pass code parser."""
+import time
+from pathlib import Path
+
+from app.services.code_parser import StreamingCodeParser, parse_generated_code
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+
+def _feed_in_chunks(text: str, size: int) -> StreamingCodeParser:
+    parser = StreamingCodeParser()
+    for start in range(0, len(text), size):
+        parser.feed(text[start:start + size])
+    parser.finish()
+    return parser
+
+
+def test_chunked_feed_matches_single_feed():
+    for fixture in sorted(FIXTURES_DIR.glob("*.txt")):
+        text = fixture.read_text(encoding="utf-8")
+        expected = parse_generated_code(text)
+        for size in (1, 7, 64):
+            assert _feed_in_chunks(text, size).files == expected, (fixture.name, size)
+
+
+def test_file_edit_and_delete_blocks():
+    text = (
+        "FILE: src/pages/A.tsx\n```tsx\nconst a = `x`\n```\n"
+        "EDIT: src/pages/B.tsx\n```\n<<<<<<< SEARCH\nold\n=======\nnew\n>>>>>>> REPLACE\n```\n"
+        "DELETE: src/pages/C.tsx\n"
+        "FILE: src/pages/D.tsx\n```tsx\nexport default function D() {}```\n"
+    )
+    for size in (1, 5, len(text)):
+        parser = _feed_in_chunks(text, size)
+        assert parser.files == [
+            {"path": "src/pages/A.tsx", "content": "const a = `x`"},
+            {"path": "src/pages/D.tsx", "content": "export default function D() {}"},
+        ]
+        assert [edit["path"] for edit in parser.edits] == ["src/pages/B.tsx"]
+        assert parser.deleted == ["src/pages/C.tsx"]
+
+
+def test_unmarked_blocks_get_inferred_names():
+    text = "Here:\n```tsx\nexport function Card() {}\n```\n"
+    assert parse_generated_code(text) == [{"path": "src/components/Card.tsx", "content": "export function Card() {}"}]
+
+
+def test_long_line_in_one_byte_chunks_is_linear():
+    # Backticks mid-line used to force a rescan of the whole pending line on every chunk
+    code = "const s = `" + "a`b" * 150_000 + "`"
+    text = f"FILE: src/pages/Long.tsx\n```tsx\n{code}\n```\n"
+    started = time.perf_counter()
+    parser = _feed_in_chunks(text, 1)
+    elapsed = time.perf_counter() - started
+    assert parser.files == [{"path": "src/pages/Long.tsx", "content": code}]
+    assert elapsed < 5.0
@@ -0,0 +1,86 @@
+"""Tests for response compression."""
+import asyncio
+import gzip
+import zlib
+from typing import Dict, List
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.services.compression import CompressionMiddleware
+
+EVENTS = [b'{"type":"delta","text":"' + b"x" * 50 + b'"}\n' for _ in range(3)]
+
+
+async def _events(request):
+    async def lines():
+        for line in EVENTS:
+            yield line
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def _archive(request):
+    return StreamingResponse(iter([b"PK" * 1000, b"PK" * 1000]), media_type="application/zip")
+
+
+async def _json(request):
+    return JSONResponse({"content": "y" * 4096})
+
+
+def _request(path: str) -> List[Dict]:
+    """Call the wrapped app directly and return every message it sends."""
+    app = CompressionMiddleware(Starlette(routes=[
+        Route("/events", _events), Route("/archive", _archive), Route("/json", _json)
+    ]))
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "scheme": "http", "server": ("test", 80), "http_version": "1.1",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    messages = []
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def _headers(start: Dict) -> Dict[str, str]:
+    return {name.decode(): value.decode() for name, value in start["headers"]}
+
+
+def test_ndjson_stream_is_compressed_event_by_event():
+    start, *bodies = _request("/events")
+
+    headers = _headers(start)
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert "Accept-Encoding" in headers["vary"]
+    decoder = zlib.decompressobj(31)
+    # Every event can be decoded as soon as its chunk arrives
+    for body, line in zip(bodies, EVENTS):
+        assert body["more_body"]
+        assert decoder.decompress(body["body"]) == line
+    assert not bodies[-1]["more_body"]
+    assert gzip.decompress(b"".join(body["body"] for body in bodies)) == b"".join(EVENTS)
+
+
+def test_other_streams_pass_through():
+    start, *bodies = _request("/archive")
+
+    assert "content-encoding" not in _headers(start)
+    assert b"".join(body["body"] for body in bodies) == b"PK" * 2000
+
+
+def test_complete_bodies_are_compressed_whole():
+    start, body = _request("/json")
+
+    headers = _headers(start)
+    assert headers["content-encoding"] == "gzip"
+    assert int(headers["content-length"]) == len(body["body"])
+    assert gzip.decompress(body["body"]) == b'{"content":"' + b"y" * 4096 + b'"}'
@@ -0,0 +1,75 @@
+"""Tests for the generation endpoints."""
+import asyncio
+import hashlib
+import json
+from typing import List
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.services import admission
+from app.services.admission import AdmissionController
+
+PROMPT = "Login form with email and password"
+
+
+def _events(response: httpx.Response) -> List[dict]:
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+async def _post_streams(*bodies: dict, client_ids=None) -> List[httpx.Response]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await asyncio.gather(*(
+            client.post(
+                "/api/generate/stream",
+                json=body,
+                headers={"X-Client-Id": client_ids[i] if client_ids else f"client-{i}"}
+            )
+            for i, body in enumerate(bodies)
+        ))
+
+
+def test_identical_concurrent_streams_share_one_upstream_call(upstream, monkeypatch):
+    # Without the response cache, only coalescing can serve the second stream
+    monkeypatch.setattr(settings, "response_cache_enabled", False)
+    upstream.delay = 0.2
+
+    first, second = asyncio.run(_post_streams({"prompt": PROMPT}, {"prompt": PROMPT}))
+
+    assert len(upstream.calls) == 1
+    assert first.status_code == second.status_code == 200
+    first_events, second_events = _events(first), _events(second)
+    assert [event for event in first_events if event["type"] != "done"] == \
+        [event for event in second_events if event["type"] != "done"]
+    done = [first_events[-1], second_events[-1]]
+    assert all(event["type"] == "done" and event["success"] for event in done)
+    assert sorted(event["cached"] for event in done) == [False, True]
+
+
+def test_stream_rejected_before_streaming_when_queue_is_full(upstream, monkeypatch):
+    monkeypatch.setattr(admission, "_admission_controller", AdmissionController(1, 0, 0))
+    upstream.delay = 0.2
+
+    running, rejected = asyncio.run(_post_streams({"prompt": PROMPT}, {"prompt": "Signup form"}))
+
+    assert running.status_code == 200
+    assert _events(running)[-1]["success"]
+    assert rejected.status_code == 429
+    assert rejected.headers["content-type"] == "application/json"
+    body = rejected.json()
+    assert body["queue_position"] == 1
+    assert body["eta_seconds"] > 0
+    assert rejected.headers["retry-after"] == str(body["eta_seconds"])
+
+
+def test_stream_file_events_omit_known_content(upstream):
+    first, = asyncio.run(_post_streams({"prompt": PROMPT}))
+    files = [event["file"] for event in _events(first) if event["type"] == "file"]
+    assert files and all(file["hash"] == hashlib.sha256(file["content"].encode()).hexdigest() for file in files)
+
+    known = files[0]["hash"]
+    second, = asyncio.run(_post_streams({"prompt": PROMPT, "known_hashes": [known]}))
+    resent = {event["file"]["hash"]: event["file"] for event in _events(second) if event["type"] == "file"}
+    assert resent[known]["content"] is None
+    assert all(file["content"] for digest, file in resent.items() if digest != known)
@@ -0,0 +1,27 @@
+"""Tests for the generation history zip export."""
+import io
+import zipfile
+
+from app.services.history_store import HistoryStore, make_generation_id
+
+
+def test_zip_entries_stay_inside_the_archive(tmp_path):
+    store = HistoryStore(":memory:", str(tmp_path / "blobs"))
+    files = [
+        {"path": "/etc/passwd.tsx", "content": "absolute"},
+        {"path": "../../outside.tsx", "content": "parent"},
+        {"path": "src\\..\\..\\win.tsx", "content": "backslash"},
+        {"path": "src/./components/Button.tsx", "content": "button"},
+    ]
+    generation_id = make_generation_id(files)
+    store.save_generation(generation_id, files)
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(store.iter_zip(generation_id))))
+    assert archive.namelist() == [
+        "etc/passwd.tsx",
+        "outside.tsx",
+        "src/win.tsx",
+        "src/components/Button.tsx",
+    ]
+    assert archive.read("outside.tsx") == b"parent"
+    store.close()
@@ -0,0 +1,19 @@
+"""Tests for worker start-up logging."""
+import logging
+
+import app.main  # noqa: F401  (configures logging as the server does)
+from app.services import lifecycle
+
+
+def test_prompt_token_savings_are_logged(caplog):
+    assert logging.getLogger("app.services.lifecycle").isEnabledFor(logging.INFO)
+
+    lifecycle._compile_prompts()
+
+    messages = [
+        record.getMessage() for record in caplog.records
+        if record.name == "app.services.lifecycle" and record.levelno == logging.INFO
+    ]
+    savings = [message for message in messages if message.startswith("System prompt tokens by page type")]
+    assert savings, "prompt token savings were not logged"
+    assert "form " in savings[-1]
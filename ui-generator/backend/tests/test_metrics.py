@@ -0,0 +1,46 @@
+"""Tests for the metrics middleware's request timing log."""
+import asyncio
+import json
+import logging
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+import app.main  # noqa: F401  (configures logging as the server does)
+from app.services import metrics
+
+
+async def _timed(request):
+    metrics.record_stage("parse", 0.012, "form", "test-model")
+    return PlainTextResponse("ok")
+
+
+def _get(path: str) -> httpx.Response:
+    test_app = metrics.MetricsMiddleware(Starlette(routes=[Route("/timed", _timed)]))
+
+    async def request() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=test_app), base_url="http://test") as client:
+            return await client.get(path)
+
+    return asyncio.run(request())
+
+
+def test_app_loggers_emit_info():
+    assert logging.getLogger("app.services.metrics").isEnabledFor(logging.INFO)
+    assert logging.getLogger("app").handlers
+
+
+def test_request_timing_is_logged(caplog):
+    response = _get("/timed")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("parse;dur=12")
+    records = [record for record in caplog.records if record.name == "app.services.metrics"]
+    assert records, "request timing line was not emitted"
+    line = json.loads(records[-1].getMessage())
+    assert line["event"] == "request_timing"
+    assert line["path"] == "/timed"
+    assert line["status"] == 200
+    assert line["stages_ms"]["parse"] == 12.0
@@ -0,0 +1,188 @@
+"""Tests for retries, the circuit breaker, the token bucket and hedging."""
+import asyncio
+import time
+
+import httpx
+import pytest
+from anthropic import BadRequestError, RateLimitError
+
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    TokenBucket,
+    UpstreamUnavailableError,
+    call_with_retries,
+    hedged,
+    retry_after_seconds,
+)
+
+
+def _status_error(cls, status: int, headers=None):
+    request = httpx.Request("POST", "https://api.anthropic.test/v1/messages")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("upstream error", response=response, body=None)
+
+
+def _open_breaker(reset_timeout: float = 0.01) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_local_error_does_not_close_half_open_circuit():
+    breaker = _open_breaker()
+    time.sleep(breaker.reset_timeout)
+
+    async def broken():
+        raise TypeError("bug in the caller")
+
+    with pytest.raises(TypeError):
+        asyncio.run(call_with_retries(broken, RetryPolicy(3, 0, 0), breaker))
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # The probe slot is free again for a call that can prove upstream health
+    breaker.before_call()
+
+
+def test_upstream_client_error_closes_half_open_circuit():
+    breaker = _open_breaker()
+    time.sleep(breaker.reset_timeout)
+
+    async def bad_request():
+        raise _status_error(BadRequestError, 400)
+
+    with pytest.raises(BadRequestError):
+        asyncio.run(call_with_retries(bad_request, RetryPolicy(3, 0, 0), breaker))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retry_after_overrides_backoff_up_to_max_delay():
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=10.0)
+    assert policy.delay(1, retry_after=4.0) == 4.0
+    assert policy.delay(1, retry_after=60.0) == 10.0
+    for attempt in range(1, 8):
+        assert 0 <= policy.delay(attempt) <= min(10.0, 2 ** (attempt - 1))
+
+
+def test_retry_after_seconds_reads_header():
+    assert retry_after_seconds(_status_error(RateLimitError, 429, {"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(_status_error(RateLimitError, 429)) is None
+    assert retry_after_seconds(TypeError()) is None
+
+
+def test_circuit_opens_probes_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(breaker.reset_timeout)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_circuit():
+    breaker = _open_breaker(reset_timeout=0.05)
+    time.sleep(breaker.reset_timeout)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_retries_then_gives_up_with_retry_after():
+    calls = []
+    retried = []
+
+    async def rate_limited():
+        calls.append(1)
+        raise _status_error(RateLimitError, 429, {"retry-after": "0"})
+
+    breaker = CircuitBreaker(failure_threshold=10, reset_timeout=30)
+    with pytest.raises(UpstreamUnavailableError) as excinfo:
+        asyncio.run(call_with_retries(rate_limited, RetryPolicy(3, 0, 0), breaker, retried.append))
+    assert len(calls) == 3
+    assert len(retried) == 2
+    assert excinfo.value.retry_after == 0.0
+
+
+def test_token_bucket_waits_for_refill_and_settles():
+    async def scenario():
+        bucket = TokenBucket(tokens_per_minute=600)  # 10 tokens per second
+        assert await bucket.acquire(600) == 0.0
+        # Reserved 600 but used only 100: 500 come back at once
+        bucket.settle(600, 100)
+        assert await bucket.acquire(500) == 0.0
+        waited = await bucket.acquire(2)
+        assert 0.1 <= waited < 1.0
+
+    asyncio.run(scenario())
+
+
+def test_hedge_wins_and_slow_attempt_is_cancelled():
+    cancelled = []
+    discarded = []
+    hedges = []
+
+    async def scenario():
+        started = 0
+
+        async def attempt():
+            nonlocal started
+            started += 1
+            if started == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(1)
+                    raise
+                return "slow"
+            return "fast"
+
+        async def discard(result):
+            discarded.append(result)
+
+        return await hedged(attempt, 0.01, discard, lambda: hedges.append(1))
+
+    assert asyncio.run(scenario()) == "fast"
+    assert hedges == [1]
+    assert cancelled == [1]
+    assert discarded == []
+
+
+def test_hedge_discards_loser_that_already_succeeded():
+    discarded = []
+
+    async def scenario():
+        gate = asyncio.Event()
+        started = 0
+
+        async def attempt():
+            nonlocal started
+            started += 1
+            number = started
+            if number == 1:
+                await gate.wait()
+                return "first"
+            # Wakes the first attempt, so both can finish before either is cancelled
+            gate.set()
+            return "second"
+
+        async def discard(result):
+            discarded.append(result)
+
+        return await hedged(attempt, 0.01, discard)
+
+    winner = asyncio.run(scenario())
+    assert sorted([winner] + discarded) == ["first", "second"]
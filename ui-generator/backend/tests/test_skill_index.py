@@ -0,0 +1,108 @@
+"""Tests for per-page-type selection of skill sections."""
+from pathlib import Path
+
+from app.services.skill_index import SkillIndex, parse_sections
+from app.services.skill_loader import CHARS_PER_TOKEN, SkillLoader
+
+TEMPLATES = """# Page Template Specifications
+
+Pick the template that matches the page.
+
+## 1. List Page Template
+
+```tsx
+import { Button } from "@/components/common/button"
+# not a heading
+<PageLayout><Button>New</Button></PageLayout>
+```
+
+## 2. Form Page Template
+
+```tsx
+<PageLayout><Input /><Button>Save</Button></PageLayout>
+```
+
+## Template Selection Guide
+
+Lists show many records; forms edit one.
+"""
+
+COMPONENTS = """# Common Component Library
+
+## Button
+
+```tsx
+import { Button } from "@/components/common/button"
+```
+
+## Input
+
+```tsx
+import { Input } from "@/components/common/input"
+```
+
+## Badge
+
+```tsx
+import { Badge } from "@/components/common/badge"
+```
+
+## Component Import Rules
+
+Import from @/components/common, never from @/components/ui.
+"""
+
+
+def test_parse_sections_round_trips_and_skips_fenced_headings():
+    root = parse_sections(TEMPLATES)
+
+    assert root.render() == TEMPLATES
+    assert [section.title for section in root.children[0].children] == [
+        "1. List Page Template", "2. Form Page Template", "Template Selection Guide",
+    ]
+
+
+def test_page_templates_keep_only_the_requested_template():
+    index = SkillIndex(TEMPLATES, COMPONENTS)
+
+    form = index.page_templates("form")
+
+    assert index.page_types == {"list", "form"}
+    assert "Form Page Template" in form
+    assert "List Page Template" not in form
+    assert "Pick the template that matches the page." in form
+    assert "Template Selection Guide" in form
+
+
+def test_component_library_keeps_used_components_and_required_sections():
+    index = SkillIndex(TEMPLATES, COMPONENTS)
+
+    form = index.component_library("form")
+    listing = index.component_library("list")
+
+    assert "## Button" in form and "## Input" in form
+    assert "## Input" not in listing
+    assert "## Badge" not in form and "## Badge" not in listing
+    assert "## Component Import Rules" in form and "## Component Import Rules" in listing
+
+
+def test_unknown_or_missing_page_type_gets_full_documents():
+    index = SkillIndex(TEMPLATES, COMPONENTS)
+
+    assert index.page_templates(None) == TEMPLATES
+    assert index.page_templates("wizard") == TEMPLATES
+    assert index.component_library("wizard") == COMPONENTS
+    assert SkillIndex(None, None).page_templates("form") is None
+
+
+def test_prompt_savings_reports_tokens_saved_per_page_type():
+    loader = SkillLoader(str(Path(__file__).parent.parent / "skill-data"))
+
+    savings = loader.prompt_savings()
+
+    full = len(loader.load_skill_instructions(None)) // CHARS_PER_TOKEN
+    assert set(savings) == {"list", "detail", "form", "dashboard"}
+    for page_type, figures in savings.items():
+        tokens = len(loader.load_skill_instructions(page_type)) // CHARS_PER_TOKEN
+        assert figures == {"tokens": tokens, "full_tokens": full, "saved_tokens": full - tokens}
+        assert figures["saved_tokens"] > 0
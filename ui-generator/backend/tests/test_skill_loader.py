@@ -0,0 +1,51 @@
+"""Tests for skill loading and prompt caching."""
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.services.skill_loader import SkillLoader
+
+SKILL_DATA = Path(__file__).parent.parent / "skill-data"
+
+
+@pytest.fixture
+def skill_dir(tmp_path):
+    shutil.copytree(SKILL_DATA, tmp_path / "skill-data")
+    return tmp_path / "skill-data"
+
+
+def test_editing_a_skill_file_invalidates_cached_prompt(skill_dir):
+    loader = SkillLoader(str(skill_dir), check_interval=0)
+    static_prompt, _ = loader.load_skill_sections("form")
+    content_hash = loader.content_hash
+    assert loader.load_skill_sections("form")[0] is static_prompt
+
+    rules = skill_dir / "consistency-rules.md"
+    rules.write_text(rules.read_text(encoding="utf-8") + "\n- Never nest cards.\n", encoding="utf-8")
+
+    edited, _ = loader.load_skill_sections("form")
+    assert "Never nest cards." in edited
+    assert loader.content_hash != content_hash
+
+
+def test_same_size_edit_is_detected_by_mtime(skill_dir):
+    loader = SkillLoader(str(skill_dir), check_interval=0)
+    loader.load_skill_sections(None)
+
+    rules = skill_dir / "consistency-rules.md"
+    edited = rules.read_text(encoding="utf-8").replace("#", "%", 1)
+    rules.write_text(edited, encoding="utf-8")
+    stat = rules.stat()
+    os.utime(rules, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert edited in loader.load_skill_sections(None)[0]
+
+
+def test_content_hash_covers_built_in_prompts(skill_dir, monkeypatch):
+    content_hash = SkillLoader(str(skill_dir)).content_hash
+
+    monkeypatch.setattr(SkillLoader, "_load_base_instructions", lambda self: "You write Vue components.")
+
+    assert SkillLoader(str(skill_dir)).content_hash != content_hash
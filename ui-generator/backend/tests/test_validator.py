@@ -0,0 +1,30 @@
+"""Tests for design-system validation and its fixes."""
+from app.config import Settings
+from app.services.validator import get_design_validator
+
+PAGE = "src/pages/ProfilePage.tsx"
+
+
+def _check(content: str):
+    return get_design_validator().check(PAGE, content, fix=True)
+
+
+def test_off_scale_spacing_is_reported_without_a_fix():
+    for text in ("p-3", "gap-5", "p-0.5", "-mt-3"):
+        content = f'<div className="{text} flex" />'
+        fixed, violations = _check(content)
+        assert fixed == content
+        assert [(v["rule"], v["fixed"]) for v in violations] == [("spacing-scale", False)]
+
+
+def test_exact_token_equivalents_are_fixed():
+    fixed, violations = _check('<div className="p-[16px] text-gray-500 gap-4" />')
+
+    assert fixed == '<div className="p-4 text-muted-foreground gap-4" />'
+    assert [(v["rule"], v["fixed"]) for v in violations] == [
+        ("arbitrary-value", True), ("palette-color", True)
+    ]
+
+
+def test_autofix_is_opt_in():
+    assert Settings.model_fields["validation_autofix"].default is False
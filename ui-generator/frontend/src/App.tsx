@@ -3,7 +3,7 @@ import PromptInput from './components/PromptInput';
 import GenerateButton from './components/GenerateButton';
 import CodePreview from './components/CodePreview';
 import DownloadButton from './components/DownloadButton';
-import { generateUI } from './services/api';
+import { generateUIStream, refineUI } from './services/api';
 import type { GenerateResponse } from './types';
 
 function App() {
@@ -11,6 +11,7 @@ function App() {
   const [loading, setLoading] = useState(false);
   const [result, setResult] = useState<GenerateResponse | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [instruction, setInstruction] = useState('');
 
   const handleGenerate = async () => {
     if (!prompt.trim()) {
@@ -18,11 +19,27 @@ function App() {
       return;
     }
 
+    // Files from the last result are not sent again if they come back unchanged
+    const previousFiles = result?.files ?? [];
     setLoading(true);
     setError(null);
+    setResult(null);
 
     try {
-      const response = await generateUI({ prompt });
+      const response = await generateUIStream({ prompt }, (event) => {
+        // Show each file as soon as the backend finishes parsing it
+        if (event.type === 'file') {
+          setResult((prev) => ({
+            success: true,
+            files: [
+              ...(prev?.files ?? []).filter((file) => file.path !== event.file.path),
+              event.file,
+            ],
+            preview_html: prev?.preview_html,
+            token_usage: prev?.token_usage ?? { input: 0, output: 0 },
+          }));
+        }
+      }, undefined, previousFiles);
       setResult(response);
     } catch (err) {
       setError(err instanceof Error ? err.message : '생성에 실패했습니다.');
@@ -32,6 +49,29 @@ function App() {
     }
   };
 
+  const handleRefine = async () => {
+    if (!result || !instruction.trim()) return;
+
+    setLoading(true);
+    setError(null);
+
+    try {
+      // Fall back to sending the files if the generation id is unavailable
+      const response = await refineUI(
+        result.generation_id
+          ? { instruction, generation_id: result.generation_id }
+          : { instruction, files: result.files }
+      );
+      setResult(response);
+      setInstruction('');
+    } catch (err) {
+      setError(err instanceof Error ? err.message : '수정에 실패했습니다.');
+      console.error('Refine error:', err);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   return (
     <div className="min-h-screen bg-background">
       {/* Header */}
@@ -60,6 +100,32 @@ function App() {
                 </div>
               )}
 
+              {/* Refine */}
+              {result && !loading && result.files.length > 0 && (
+                <div className="space-y-2">
+                  <label htmlFor="instruction" className="block text-sm font-medium text-foreground">
+                    수정 요청
+                  </label>
+                  <div className="flex gap-2">
+                    <input
+                      id="instruction"
+                      value={instruction}
+                      onChange={(e) => setInstruction(e.target.value)}
+                      onKeyDown={(e) => e.key === 'Enter' && handleRefine()}
+                      placeholder="예시: 저장 버튼을 primary로 바꿔주세요"
+                      className="flex-1 h-10 px-3 text-sm border border-border rounded-lg focus:outline-none focus:ring-2 focus:ring-primary"
+                    />
+                    <button
+                      onClick={handleRefine}
+                      disabled={!instruction.trim()}
+                      className="px-4 h-10 text-sm font-medium border border-border rounded-lg hover:bg-muted disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
+                    >
+                      수정하기
+                    </button>
+                  </div>
+                </div>
+              )}
+
               {/* Token Usage */}
               {result && (
                 <div className="p-4 bg-muted rounded-lg">
@@ -100,9 +166,13 @@ function App() {
               <div className="bg-white rounded-lg border border-border p-6 space-y-4">
                 <div className="flex items-center justify-between">
                   <h3 className="text-lg font-semibold text-foreground">생성된 코드</h3>
-                  <DownloadButton files={result.files} />
+                  <DownloadButton files={result.files} generationId={result.generation_id} />
                 </div>
-                <CodePreview files={result.files} previewHtml={result.preview_html} />
+                <CodePreview
+                  files={result.files}
+                  previewHtml={result.preview_html}
+                  previewUrl={result.preview_url}
+                />
               </div>
             ) : (
               <div className="bg-white rounded-lg border border-border p-6 h-full flex items-center justify-center">
@@ -2,14 +2,17 @@ import { useState } from 'react';
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
 import { vscDarkPlus } from 'react-syntax-highlighter/dist/esm/styles/prism';
 import { Code, Eye } from 'lucide-react';
+import { apiUrl } from '@/services/api';
 import type { GeneratedFile } from '@/types';
 
 interface CodePreviewProps {
   files: GeneratedFile[];
-  previewHtml: string;
+  previewHtml?: string | null;
+  /** Rendered on demand by the backend when previewHtml was not sent */
+  previewUrl?: string;
 }
 
-export default function CodePreview({ files, previewHtml }: CodePreviewProps) {
+export default function CodePreview({ files, previewHtml, previewUrl }: CodePreviewProps) {
   const [activeTab, setActiveTab] = useState<'code' | 'preview'>('code');
   const [selectedFileIndex, setSelectedFileIndex] = useState(0);
 
@@ -18,6 +21,7 @@ export default function CodePreview({ files, previewHtml }: CodePreviewProps) {
   }
 
   const selectedFile = files[selectedFileIndex];
+  const previewSrc = !previewHtml && previewUrl ? apiUrl(previewUrl) : undefined;
 
   return (
     <div className="space-y-4">
@@ -84,20 +88,25 @@ export default function CodePreview({ files, previewHtml }: CodePreviewProps) {
                   fontSize: '0.875rem',
                 }}
               >
-                {selectedFile.content}
+                {selectedFile.content ?? '// 파일 내용을 받지 못했습니다.'}
               </SyntaxHighlighter>
             </div>
           </div>
         </div>
-      ) : (
+      ) : previewHtml || previewSrc ? (
         <div className="rounded-lg border border-border overflow-hidden">
           <iframe
             sandbox="allow-scripts"
-            srcDoc={previewHtml}
+            srcDoc={previewHtml || undefined}
+            src={previewSrc}
             className="w-full h-[600px] bg-white"
             title="UI Preview"
           />
         </div>
+      ) : (
+        <div className="rounded-lg border border-border h-[600px] flex items-center justify-center">
+          <p className="text-sm text-muted-foreground">미리보기가 아직 없습니다</p>
+        </div>
       )}
     </div>
   );
@@ -1,20 +1,35 @@
 import { Download } from 'lucide-react';
 import JSZip from 'jszip';
+import { historyDownloadUrl } from '@/services/api';
 import type { GeneratedFile } from '@/types';
 
 interface DownloadButtonProps {
   files: GeneratedFile[];
+  generationId?: string;
 }
 
-export default function DownloadButton({ files }: DownloadButtonProps) {
+export default function DownloadButton({ files, generationId }: DownloadButtonProps) {
   const handleDownload = async () => {
     if (!files || files.length === 0) return;
 
+    if (generationId) {
+      // Stored generations are zipped and streamed by the backend
+      const link = document.createElement('a');
+      link.href = historyDownloadUrl(generationId);
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+      return;
+    }
+
     try {
       const zip = new JSZip();
 
       // Add each file to the zip
       files.forEach((file) => {
+        if (file.content == null) {
+          throw new Error(`No content for ${file.path}`);
+        }
         zip.file(file.path, file.content);
       });
 
@@ -1,9 +1,52 @@
-import type { GenerateRequest, GenerateResponse } from '@/types';
+import type {
+  GenerateRequest,
+  GenerateResponse,
+  GenerateStreamEvent,
+  GeneratedFile,
+  RefineRequest,
+  RefineResponse,
+} from '@/types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+const CLIENT_ID_KEY = 'ui-generator-client-id';
+
+/**
+ * Stable per-browser id. The backend queues generations per client, so
+ * users behind one address are not queued as a single client.
+ */
+function clientId(): string {
+  let id = localStorage.getItem(CLIENT_ID_KEY);
+  if (!id) {
+    id = crypto.randomUUID();
+    localStorage.setItem(CLIENT_ID_KEY, id);
+  }
+  return id;
+}
 
 export async function generateUI(request: GenerateRequest): Promise<GenerateResponse> {
   const response = await fetch(`${API_URL}/api/generate`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'X-Client-Id': clientId(),
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
+    throw new Error(error.detail || `HTTP error! status: ${response.status}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Apply a change to an earlier generation. Only the changed files are
+ * regenerated; the response carries the full merged file set.
+ */
+export async function refineUI(request: RefineRequest): Promise<RefineResponse> {
+  const response = await fetch(`${API_URL}/api/refine`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -19,6 +62,114 @@ export async function generateUI(request: GenerateRequest): Promise<GenerateResp
   return response.json();
 }
 
+/**
+ * Stream a generation from the backend, invoking `onEvent` for every NDJSON
+ * event as it arrives. Resolves with the assembled response once the final
+ * `done` event is received.
+ *
+ * The hashes of `knownFiles` are sent as `known_hashes`; files the server
+ * then sends without content get it back from `knownFiles`.
+ */
+export async function generateUIStream(
+  request: GenerateRequest,
+  onEvent: (event: GenerateStreamEvent) => void,
+  signal?: AbortSignal,
+  knownFiles: GeneratedFile[] = []
+): Promise<GenerateResponse> {
+  const knownContent = new Map<string, string>();
+  for (const file of knownFiles) {
+    if (file.hash && file.content != null) {
+      knownContent.set(file.hash, file.content);
+    }
+  }
+
+  const response = await fetch(`${API_URL}/api/generate/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'X-Client-Id': clientId(),
+    },
+    body: JSON.stringify({
+      ...request,
+      known_hashes: [...(request.known_hashes ?? []), ...knownContent.keys()],
+    }),
+    signal,
+  });
+
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
+    throw new Error(error.detail || `HTTP error! status: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  const files: GeneratedFile[] = [];
+  let buffer = '';
+  // Assigned inside handleLine; cast keeps TS from narrowing it to null
+  let result = null as GenerateResponse | null;
+
+  const handleLine = (line: string) => {
+    if (!line.trim()) return;
+    const event = JSON.parse(line) as GenerateStreamEvent;
+    if (event.type === 'file') {
+      if (event.file.content == null && event.file.hash) {
+        event.file.content = knownContent.get(event.file.hash) ?? null;
+      }
+      // A repeated path replaces the earlier version of that file
+      const existing = files.findIndex((file) => file.path === event.file.path);
+      if (existing >= 0) {
+        files[existing] = event.file;
+      } else {
+        files.push(event.file);
+      }
+    } else if (event.type === 'done') {
+      result = {
+        success: event.success,
+        files,
+        preview_html: event.preview_html,
+        preview_url: event.preview_url,
+        token_usage: event.token_usage,
+        cached: event.cached,
+        generation_id: event.generation_id,
+        error: event.error ?? undefined,
+      };
+    }
+    onEvent(event);
+  };
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let newline = buffer.indexOf('\n');
+    while (newline >= 0) {
+      handleLine(buffer.slice(0, newline));
+      buffer = buffer.slice(newline + 1);
+      newline = buffer.indexOf('\n');
+    }
+  }
+  handleLine(buffer + decoder.decode());
+
+  if (!result) {
+    throw new Error('Stream ended before generation completed');
+  }
+  if (!result.success) {
+    throw new Error(result.error || 'Generation failed');
+  }
+  return result;
+}
+
+/** Absolute URL of a path returned by the backend, such as a preview_url. */
+export function apiUrl(path: string): string {
+  return `${API_URL}${path}`;
+}
+
+/** URL of the server-built zip archive of a stored generation. */
+export function historyDownloadUrl(generationId: string): string {
+  return `${API_URL}/api/history/${encodeURIComponent(generationId)}/download`;
+}
+
 export async function healthCheck(): Promise<{ status: string; service: string }> {
   const response = await fetch(`${API_URL}/api/health`);
 
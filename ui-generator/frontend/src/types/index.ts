@@ -1,22 +1,75 @@
-export interface GenerateRequest {
+export interface ResponseOptions {
+  /** omit drops preview_html; lazy returns preview_url instead */
+  preview?: 'inline' | 'omit' | 'lazy';
+  /** Hashes of files the client already has; those come back without content */
+  known_hashes?: string[];
+}
+
+export interface GenerateRequest extends ResponseOptions {
   prompt: string;
   page_type?: 'form' | 'list' | 'detail' | 'dashboard';
 }
 
 export interface GeneratedFile {
   path: string;
-  content: string;
+  /** null when the request listed the file's hash in known_hashes */
+  content?: string | null;
+  /** SHA-256 of the content, on files returned by the backend */
+  hash?: string;
 }
 
 export interface TokenUsage {
   input: number;
   output: number;
+  cache_read?: number;
+  cache_write?: number;
+}
+
+export interface Violation {
+  path: string;
+  line: number;
+  rule: string;
+  severity: 'error' | 'warning';
+  message: string;
+  fixed: boolean;
 }
 
 export interface GenerateResponse {
   success: boolean;
   files: GeneratedFile[];
-  preview_html: string;
+  /** null unless the request asked for an inline preview (the default) */
+  preview_html?: string | null;
+  preview_url?: string;
   token_usage: TokenUsage;
+  cached?: boolean;
+  model?: string;
+  violations?: Violation[];
+  generation_id?: string;
   error?: string;
 }
+
+export interface RefineRequest extends ResponseOptions {
+  instruction: string;
+  generation_id?: string;
+  files?: GeneratedFile[];
+  page_type?: GenerateRequest['page_type'];
+}
+
+export interface RefineResponse extends GenerateResponse {
+  changed_files: string[];
+  deleted_files: string[];
+}
+
+export type GenerateStreamEvent =
+  | { type: 'delta'; text: string }
+  | { type: 'file'; file: GeneratedFile }
+  | {
+      type: 'done';
+      success: boolean;
+      preview_html?: string | null;
+      preview_url?: string;
+      token_usage: TokenUsage;
+      cached?: boolean;
+      error?: string | null;
+      generation_id?: string;
+    };